@@ -0,0 +1,302 @@
+"""
+Local HTTP/JSON analysis server.
+
+Other programs (a web front end, training scripts) can ask for moves without
+pygame. Searches run in a process pool; results are kept in an LRU cache
+keyed by (position, depth, time limit), and identical requests that arrive
+while a search is running share that search instead of starting another.
+
+Usage:
+    python analysis_server.py --port 8765 --workers 4
+
+    POST /analyze
+        {"board": [[0, 0, ...], ...],   5x5, 0 = Empty, 1 = Goat, -1 = Tiger
+         "turn": "T", "goats_placed": 3, "goats_captured": 0,
+         "depth": 4, "time_limit_ms": null}
+        or {"position": "<16 hex digits of Position.to_bytes()>", "depth": 4}
+    ->  {"move": [[r, c] or null, [r, c]], "score": ..., "pv": [...],
+         "stats": {...}, "cached": false}
+
+    GET /health
+    ->  {"status": "ok", "cache": {...}, "in_flight": 0}
+
+Depth-limited searches are seeded, so a cached answer is the answer a new
+search would give. Searches with a time limit depend on machine load and
+give different answers from run to run, so they are never cached (identical
+ones running at the same time are still shared).
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from game_logic import (CAPTURES_TO_WIN, NUM_POINTS, SQUARE_COORDS, TIGER_START, TOTAL_GOATS,
+                        BaghChal)
+from goat_bot import GoatBot
+from position import Position
+from tiger_bot import TigerBot
+
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_SIZE = 10000
+MAX_DEPTH = 12
+MAX_BODY_BYTES = 1 << 16
+SERVER_TT_SIZE = 1 << 16 # Fresh table per request keeps results reproducible
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class LRUCache:
+    """Least-recently-used mapping with hit/miss counters."""
+
+    def __init__(self, size=DEFAULT_CACHE_SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        if key not in self.entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def info(self):
+        return {'size': len(self.entries), 'capacity': self.size,
+                'hits': self.hits, 'misses': self.misses}
+
+
+# --- Worker side ---
+_worker_tablebase = None
+_worker_book = None
+
+
+def _init_worker(tablebase_path, book_path):
+    global _worker_tablebase, _worker_book
+    if tablebase_path:
+        from tablebase import Tablebase
+        _worker_tablebase = Tablebase(tablebase_path)
+    if book_path:
+        from opening_book import OpeningBook
+        _worker_book = OpeningBook(book_path)
+
+
+def analyze(packed, depth, time_limit_ms):
+    """Searches one position in a pool worker and returns the JSON-ready result."""
+    game = Position.from_packed(packed).to_game()
+    if game.winner:
+        return {'move': None, 'score': None, 'pv': [], 'winner': game.winner, 'stats': {}}
+    bot_class = TigerBot if game.turn == 'T' else GoatBot
+    bot = bot_class(depth=depth, time_limit_ms=time_limit_ms, tt_size=SERVER_TT_SIZE, seed=0,
+                    tablebase=_worker_tablebase, book=_worker_book)
+    move = bot.get_best_move(game)
+    stats = bot.stats.as_dict()
+    pv = [[None if frm is None else SQUARE_COORDS[frm], SQUARE_COORDS[to]]
+          for frm, to in stats.pop('pv')]
+    stats.pop('best_move')
+    return {'move': move, 'score': stats.pop('score'), 'pv': pv, 'winner': None,
+            'stats': stats}
+
+
+# --- Server side ---
+
+def check_position(position):
+    """Raises ValueError unless `position` could occur in a game."""
+    if position.packed >> (2 * NUM_POINTS + 9): # Past the turn bit
+        raise ValueError("unused bits are set")
+    placed, captured = position.goats_placed, position.goats_captured
+    if placed > TOTAL_GOATS or captured > CAPTURES_TO_WIN or captured > placed:
+        raise ValueError("goat counters out of range")
+    if position.goats & position.tigers:
+        raise ValueError("a point holds both a goat and a tiger")
+    if bin(position.tigers).count('1') != len(TIGER_START):
+        raise ValueError(f"there must be {len(TIGER_START)} tigers")
+    if bin(position.goats).count('1') != placed - captured:
+        raise ValueError("goats on the board must equal goats_placed - goats_captured")
+
+
+def parse_request(body):
+    """Validates an /analyze body; returns (packed position, depth, time_limit_ms)."""
+    try:
+        request = json.loads(body or b'{}')
+    except ValueError:
+        raise HTTPError(400, "Body is not valid JSON")
+    if not isinstance(request, dict):
+        raise HTTPError(400, "Body must be a JSON object")
+
+    depth = request.get('depth', 4)
+    time_limit_ms = request.get('time_limit_ms')
+    if not isinstance(depth, int) or not 1 <= depth <= MAX_DEPTH:
+        raise HTTPError(400, f"depth must be an integer from 1 to {MAX_DEPTH}")
+    if time_limit_ms is not None and (not isinstance(time_limit_ms, int) or time_limit_ms <= 0):
+        raise HTTPError(400, "time_limit_ms must be a positive integer")
+
+    try:
+        if 'position' in request:
+            position = Position.from_bytes(bytes.fromhex(request['position']))
+        else:
+            board = request['board']
+            if len(board) != 5 or any(len(row) != 5 for row in board):
+                raise ValueError("board must be 5x5")
+            if any(cell not in (-1, 0, 1) or isinstance(cell, bool)
+                   for row in board for cell in row):
+                raise ValueError("board cells must be -1, 0 or 1")
+            if request.get('turn', 'G') not in ('G', 'T'):
+                raise ValueError("turn must be 'G' or 'T'")
+            placed = int(request.get('goats_placed', 0))
+            captured = int(request.get('goats_captured', 0))
+            if not 0 <= placed <= TOTAL_GOATS or not 0 <= captured <= CAPTURES_TO_WIN:
+                raise ValueError("goat counters out of range")
+            game = BaghChal.from_board(board, request.get('turn', 'G'), placed, captured)
+            position = Position.from_game(game)
+        check_position(position)
+    except (KeyError, TypeError, ValueError) as exc:
+        raise HTTPError(400, f"Bad position: {exc}")
+    return position.packed, depth, time_limit_ms
+
+
+class AnalysisServer:
+    def __init__(self, workers=None, cache_size=DEFAULT_CACHE_SIZE, tablebase=None, book=None):
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                        initargs=(tablebase, book))
+        self.cache = LRUCache(cache_size)
+        self.in_flight = {} # Request key -> asyncio.Future shared by identical requests
+        self.deduplicated = 0
+
+    async def analyze(self, key):
+        """
+        Algorithm: Cache + Request Coalescing
+        1. Answer from the LRU cache if possible.
+        2. If the same search is already running, await its future.
+        3. Otherwise start it in the pool; everyone waiting gets its result.
+        """
+        result = self.cache.get(key) if key[2] is None else None # Timed searches vary
+        if result is not None:
+            return result, True
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.deduplicated += 1
+            return await asyncio.shield(future), False
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.pool, analyze, *key)
+        self.in_flight[key] = future
+        # Bookkeeping does not depend on this requester staying connected
+        future.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(future), False
+
+    def _finished(self, key, future):
+        del self.in_flight[key]
+        if key[2] is None and not future.cancelled() and future.exception() is None:
+            self.cache.put(key, future.result())
+
+    async def route(self, method, path, body):
+        if method == 'GET' and path == '/health':
+            return {'status': 'ok', 'cache': self.cache.info(), 'in_flight': len(self.in_flight),
+                    'deduplicated': self.deduplicated}
+        if path == '/analyze':
+            if method != 'POST':
+                raise HTTPError(405, "Use POST")
+            result, cached = await self.analyze(parse_request(body))
+            return dict(result, cached=cached)
+        raise HTTPError(404, f"No route for {method} {path}")
+
+    async def handle(self, reader, writer):
+        """One connection; HTTP/1.1 keep-alive, so several requests may follow."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                keep_alive = headers.get('connection', '').lower() != 'close'
+
+                try:
+                    if length > MAX_BODY_BYTES:
+                        raise HTTPError(413, "Request body too large")
+                    body = await reader.readexactly(length) if length else b''
+                    status, payload = 200, await self.route(method, path, body)
+                except HTTPError as exc:
+                    status, payload = exc.status, {'error': str(exc)}
+                except Exception as exc: # Keep serving other requests
+                    status, payload = 500, {'error': f"{type(exc).__name__}: {exc}"}
+
+                data = json.dumps(payload).encode()
+                writer.write(f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                             f"Content-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                             f"\r\n".encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        """Serves until SIGTERM or SIGINT; the caller then shuts the pool down."""
+        server = await asyncio.start_server(self.handle, host, port)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except NotImplementedError: # Windows: Ctrl+C still raises KeyboardInterrupt
+                pass
+        print(f"Analysis server listening on http://{host}:{port}", file=sys.stderr, flush=True)
+        async with server:
+            await stop.wait()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bagh-Chal HTTP/JSON analysis server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE)
+    parser.add_argument('--tablebase', default=None, help="movement-phase table for the bots")
+    parser.add_argument('--book', default=None, help="placement-phase opening book")
+    args = parser.parse_args()
+
+    server = AnalysisServer(args.workers, args.cache_size, args.tablebase, args.book)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
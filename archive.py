@@ -0,0 +1,481 @@
+"""
+Compact binary archive of finished games, with a position index.
+
+Every move is stored in one byte, and every game carries a small header
+with its result and free-form JSON metadata (agents, seed, end reason).
+Games are appended to a memory-mapped file. Readers stream game records
+and replay them through one BaghChal, so a million-game archive never has
+to be held in memory. A side index maps the Zobrist hash of every
+position reached to the offsets of the games that reached it.
+
+Usage:
+    python archive.py import games.jsonl --archive games.bca   # self_play.py output
+    python archive.py index --archive games.bca                # builds games.bca.idx
+    python archive.py info --archive games.bca
+    python archive.py find --archive games.bca --position 0100000011000000
+
+File layout: header (magic, version, end of data, game count) followed by
+games: result (1 byte), flags (1 byte), plies (2 bytes), metadata length
+(2 bytes), the start Position when it is not the initial one (8 bytes),
+the UTF-8 JSON metadata and one byte per move.
+
+A move byte is 200 + the point for a goat placement, otherwise
+8 * from + direction. A tiger moving in a direction steps when the next
+point is empty and jumps when it holds a goat, so one code covers both.
+"""
+import argparse
+import heapq
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from bisect import bisect_left
+
+from game_logic import (ADJACENT, BOARD_SIZE, DRAW, JUMP_OVER, NUM_POINTS, SQUARE_COORDS,
+                        BaghChal, square)
+from position import POSITION_BYTES, Position
+
+MAGIC = b'BCGA'
+VERSION = 1
+HEADER = struct.Struct('<4sIQQ')
+GAME_HEADER = struct.Struct('<cBHH')
+UNFINISHED = b'-' # Result byte of a game with no winner (stopped or adjourned)
+FLAG_START = 1    # The game starts from a stored Position
+
+INITIAL_CAPACITY = 1 << 20 # Bytes mapped when an archive is created; doubled as it fills
+
+INDEX_SUFFIX = '.idx'
+INDEX_MAGIC = b'BCGI'
+INDEX_ENTRY = struct.Struct('<QQ') # Position hash, game offset
+INDEX_RUN_ENTRIES = 1 << 20 # Index entries sorted in memory before spilling a run to disk
+READ_BLOCK = INDEX_ENTRY.size * 4096
+
+# Move directions as (dr, dc); DIRECTIONS.index gives the code
+DIRECTIONS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+PLACEMENT_BASE = 8 * NUM_POINTS # 200: first placement code
+
+
+def _step(sq, direction):
+    """The point one step from `sq` in `direction`, or None off the board."""
+    r, c = SQUARE_COORDS[sq]
+    dr, dc = DIRECTIONS[direction]
+    r, c = r + dr, c + dc
+    return square(r, c) if 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE else None
+
+
+# NEIGHBOUR[8 * sq + direction] -> point one step away, or None
+NEIGHBOUR = [_step(sq, direction) for sq in range(NUM_POINTS) for direction in range(8)]
+
+
+def encode_move(move):
+    """One byte for a (from_sq or None, to_sq) move; needs no position."""
+    frm, to = move
+    if frm is None:
+        return PLACEMENT_BASE + to
+    (r1, c1), (r2, c2) = SQUARE_COORDS[frm], SQUARE_COORDS[to]
+    dr, dc = r2 - r1, c2 - c1
+    direction = DIRECTIONS.index(((dr > 0) - (dr < 0), (dc > 0) - (dc < 0)))
+    return 8 * frm + direction
+
+
+def decode_move(game, code):
+    """
+    The (from_sq or None, to_sq) move that `code` stands for in `game`.
+    Raises ValueError if it is not a legal move there (a corrupt record).
+    """
+    occupied = game.goats | game.tigers
+    if code >= PLACEMENT_BASE:
+        to = code - PLACEMENT_BASE
+        if (to >= NUM_POINTS or game.turn != 'G' or game.phase != 'PLACEMENT'
+                or (occupied >> to) & 1):
+            raise ValueError(f"Bad placement code {code}")
+        return None, to
+    frm = code >> 3
+    own = game.tigers if game.turn == 'T' else game.goats
+    to = NEIGHBOUR[code]
+    if to is not None and game.turn == 'T' and (game.goats >> to) & 1:
+        to = NEIGHBOUR[8 * to + (code & 7)] # Jump over the goat
+        if to is None or JUMP_OVER[frm * NUM_POINTS + to] < 0:
+            to = None
+    elif to is not None and not (ADJACENT[frm] >> to) & 1: # No diagonal line here
+        to = None
+    if (to is None or not (own >> frm) & 1 or (occupied >> to) & 1
+            or (game.turn == 'G' and game.phase == 'PLACEMENT')):
+        raise ValueError(f"Bad move code {code}")
+    return frm, to
+
+
+def result_code(winner):
+    """Result byte for a BaghChal `winner` ('T', 'G', DRAW or None)."""
+    return UNFINISHED if winner is None else winner.encode()
+
+
+class GameRecord:
+    """One archived game; `moves` holds the raw move bytes."""
+    __slots__ = ('offset', 'result', 'metadata', 'start', 'moves')
+
+    def __init__(self, offset, result, metadata, start, moves):
+        self.offset = offset     # Byte offset in the archive; the game's id
+        self.result = result     # 'T', 'G', DRAW or None
+        self.metadata = metadata # dict
+        self.start = start       # Position, or None for the initial position
+        self.moves = moves
+
+    @property
+    def plies(self):
+        return len(self.moves)
+
+    def __repr__(self):
+        return f"GameRecord(offset={self.offset}, result={self.result!r}, plies={self.plies})"
+
+
+class GameArchive:
+    """
+    A game archive file, opened for reading ('r') or appending ('a',
+    created if missing). Usable as a context manager.
+    """
+
+    def __init__(self, path, mode='r'):
+        if mode not in ('r', 'a'):
+            raise ValueError(f"mode must be 'r' or 'a', not {mode!r}")
+        self.path = path
+        self.writable = mode == 'a'
+        if self.writable and not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, VERSION, HEADER.size, 0))
+        self._file = open(path, 'r+b' if self.writable else 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0,
+                             access=mmap.ACCESS_WRITE if self.writable else mmap.ACCESS_READ)
+        magic, version, self.end, self.count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a Bagh-Chal game archive (version {VERSION})")
+        self._index = None
+
+    # --- Writing ---
+
+    def append(self, moves, winner, metadata=None, start=None):
+        """
+        Algorithm: Memory-Mapped Append
+        Encodes the game and copies it into the mapping after the last
+        game, growing the file (doubling) when it is full. The header's end
+        offset is only moved once the game is in place, so readers never
+        see a half-written game.
+        moves: (from_sq or None, to_sq) moves from the start position
+        winner: 'T', 'G', DRAW, or None for an unfinished game
+        start: Position the game started from (None: the initial position)
+        Returns the game's offset.
+        """
+        if not self.writable:
+            raise ValueError(f"{self.path} was opened read-only")
+        meta = json.dumps(metadata or {}, separators=(',', ':')).encode()
+        flags = FLAG_START if start is not None else 0
+        data = GAME_HEADER.pack(result_code(winner), flags, len(moves), len(meta))
+        if start is not None:
+            data += start.to_bytes()
+        data += meta + bytes(encode_move(move) for move in moves)
+
+        offset = self.end
+        needed = offset + len(data)
+        if needed > len(self._mm):
+            self._mm.resize(max(needed, 2 * len(self._mm), INITIAL_CAPACITY))
+        self._mm[offset:needed] = data
+        self.end = needed
+        self.count += 1
+        HEADER.pack_into(self._mm, 0, MAGIC, VERSION, self.end, self.count)
+        return offset
+
+    def flush(self):
+        if self.writable:
+            self._mm.flush()
+
+    # --- Reading ---
+
+    def read_game(self, offset):
+        """The GameRecord stored at `offset`."""
+        return self._read(offset)[0]
+
+    def _read(self, offset):
+        result, flags, plies, meta_length = GAME_HEADER.unpack_from(self._mm, offset)
+        pos = offset + GAME_HEADER.size
+        start = None
+        if flags & FLAG_START:
+            start = Position.from_bytes(self._mm[pos:pos + POSITION_BYTES])
+            pos += POSITION_BYTES
+        metadata = json.loads(self._mm[pos:pos + meta_length]) if meta_length else {}
+        pos += meta_length
+        moves = self._mm[pos:pos + plies]
+        winner = None if result == UNFINISHED else result.decode()
+        return GameRecord(offset, winner, metadata, start, moves), pos + plies
+
+    def records(self, start=HEADER.size):
+        """Yields every GameRecord from offset `start` on, one at a time."""
+        offset = start
+        while offset < self.end:
+            record, offset = self._read(offset)
+            yield record
+
+    def __iter__(self):
+        return self.records()
+
+    def __len__(self):
+        return self.count
+
+    @staticmethod
+    def replay(record):
+        """
+        Yields the game after each of its positions, start position first.
+        The same BaghChal is yielded every time, moved on in place, so take
+        what is needed (hash, Position.from_game, ...) before advancing.
+        Repetition draws are not applied on replay; the stored result is
+        authoritative.
+        """
+        game = BaghChal(None) if record.start is None else record.start.to_game(None)
+        yield game
+        for code in record.moves:
+            game.apply(decode_move(game, code))
+            yield game
+
+    @staticmethod
+    def decoded_moves(record):
+        """The record's moves as (from_sq or None, to_sq), decoded by replaying it."""
+        return [decode_move(game, code)
+                for code, game in zip(record.moves, GameArchive.replay(record))]
+
+    # --- Position lookup ---
+
+    def games_reaching(self, game):
+        """
+        Offsets of every game that reached `game`'s position (same Zobrist
+        hash), in archive order. Games covered by the index are found by
+        binary search; games appended since the index was built are
+        replayed.
+        """
+        index = self.index()
+        covered = index.covered_end if index else HEADER.size
+        offsets = index.lookup(game.hash) if index else []
+        for record in self.records(covered):
+            if any(position.hash == game.hash for position in self.replay(record)):
+                offsets.append(record.offset)
+        return sorted(set(offsets))
+
+    def index(self):
+        """The side index (`path` + '.idx') if it has been built, else None."""
+        if self._index is None and os.path.exists(self.path + INDEX_SUFFIX):
+            index = GameIndex(self.path + INDEX_SUFFIX)
+            if index.covered_end <= self.end:
+                self._index = index
+            else: # Built for another archive
+                index.close()
+        return self._index
+
+    def close(self):
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+        if self._mm is not None:
+            if self.writable: # Give back the unused part of the last growth step
+                self._mm.flush()
+                self._mm.resize(self.end)
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GameIndex:
+    """Read-only, memory-mapped index file: sorted (position hash, game offset) pairs."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.covered_end, self.count = HEADER.unpack_from(self._mm, 0)
+        if magic != INDEX_MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a Bagh-Chal game index (version {VERSION})")
+        self._hashes = _HashColumn(self._mm, self.count)
+
+    def lookup(self, key):
+        """Offsets of the games whose positions include hash `key`."""
+        i = bisect_left(self._hashes, key)
+        offsets = []
+        while i < self.count:
+            found, offset = INDEX_ENTRY.unpack_from(self._mm, HEADER.size + i * INDEX_ENTRY.size)
+            if found != key:
+                break
+            offsets.append(offset)
+            i += 1
+        return offsets
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+
+class _HashColumn:
+    """Sequence view of the index's hash column, for bisect."""
+
+    def __init__(self, mm, count):
+        self._mm = mm
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        return struct.unpack_from('<Q', self._mm, HEADER.size + i * INDEX_ENTRY.size)[0]
+
+
+def _read_entries(f):
+    """Yields (hash, offset) pairs from an open index or run file, block by block."""
+    while True:
+        block = f.read(READ_BLOCK)
+        if not block:
+            return
+        yield from INDEX_ENTRY.iter_unpack(block)
+
+
+def build_index(archive, run_entries=INDEX_RUN_ENTRIES):
+    """
+    Algorithm: External Merge Sort
+    Replays the games that the current index does not cover yet and
+    collects one (position hash, offset) pair per distinct position of
+    each game. Pairs are sorted in runs of `run_entries` and spilled to
+    temporary files, then merged with the old index in a single streaming
+    pass, so memory stays bounded however large the archive is.
+    Returns the number of games added.
+    """
+    path = archive.path + INDEX_SUFFIX
+    old = archive.index()
+    covered = old.covered_end if old else HEADER.size
+    archive._index = None
+
+    runs = []
+    pending = []
+    added = 0
+    for record in archive.records(covered):
+        hashes = {game.hash for game in archive.replay(record)}
+        pending.extend((key, record.offset) for key in hashes)
+        added += 1
+        if len(pending) >= run_entries:
+            runs.append(_spill(pending))
+            pending = []
+    pending.sort()
+
+    sources = [iter(pending)]
+    old_file = None
+    if old:
+        old.close()
+        old_file = open(path, 'rb')
+        old_file.seek(HEADER.size)
+        sources.append(_read_entries(old_file))
+    for run in runs:
+        run.seek(0)
+        sources.append(_read_entries(run))
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as out:
+        out.write(HEADER.pack(INDEX_MAGIC, VERSION, archive.end, 0))
+        total = 0
+        for entry in heapq.merge(*sources):
+            out.write(INDEX_ENTRY.pack(*entry))
+            total += 1
+        out.seek(0)
+        out.write(HEADER.pack(INDEX_MAGIC, VERSION, archive.end, total))
+    if old_file:
+        old_file.close()
+    for run in runs:
+        run.close()
+    os.replace(temp_path, path)
+    return added
+
+
+def _spill(entries):
+    entries.sort()
+    run = tempfile.TemporaryFile()
+    for start in range(0, len(entries), 4096):
+        run.write(b''.join(INDEX_ENTRY.pack(*entry) for entry in entries[start:start + 4096]))
+    return run
+
+
+# --- Command line ---
+
+def append_self_play(archive, record):
+    """Appends one self_play.py game record (moves in (r, c) coordinates); returns its offset."""
+    moves = [(None if start is None else square(*start), square(*end))
+             for start, end in record['moves']]
+    winner = record['result']
+    if winner == 'draw': # Games stopped by an agent with no move stay unfinished
+        winner = DRAW if record['reason'] in ('repetition', 'max-plies') else None
+    metadata = {key: record[key] for key in ('tiger', 'goat', 'seed', 'reason') if key in record}
+    return archive.append(moves, winner, metadata)
+
+
+def import_jsonl(archive, lines):
+    """Appends self_play.py JSONL records; returns the number of games added."""
+    added = 0
+    for line in lines:
+        if line.strip():
+            append_self_play(archive, json.loads(line))
+            added += 1
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bagh-Chal binary game archive")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_import = sub.add_parser('import', help="append games from self_play.py JSONL files")
+    p_import.add_argument('files', nargs='+')
+    p_index = sub.add_parser('index', help="build or update the position index")
+    p_info = sub.add_parser('info', help="game count, size and results")
+    p_find = sub.add_parser('find', help="games that reached a position")
+    p_find.add_argument('--position', required=True, help="hex-encoded Position")
+    for p in (p_import, p_index, p_info, p_find):
+        p.add_argument('--archive', default='games.bca')
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        with GameArchive(args.archive, 'a') as archive:
+            for name in args.files:
+                with open(name) as f:
+                    added = import_jsonl(archive, f)
+                print(f"{name}: {added} games")
+            print(f"{len(archive)} games in {args.archive}")
+    elif args.command == 'index':
+        with GameArchive(args.archive) as archive:
+            added = build_index(archive)
+            print(f"{added} games indexed; {archive.index().count} positions in "
+                  f"{args.archive}{INDEX_SUFFIX}")
+    elif args.command == 'info':
+        with GameArchive(args.archive) as archive:
+            results = {}
+            plies = 0
+            for record in archive:
+                results[record.result] = results.get(record.result, 0) + 1
+                plies += record.plies
+            size = archive.end - HEADER.size
+            print(f"{len(archive)} games, {plies} moves, {size} bytes: one per move, "
+                  f"{(size - plies) / max(len(archive), 1):.1f} per game for header and metadata")
+            print(', '.join(f"{'unfinished' if result is None else result}: {n}"
+                            for result, n in sorted(results.items(), key=str)))
+    elif args.command == 'find':
+        game = Position.from_bytes(bytes.fromhex(args.position)).to_game()
+        with GameArchive(args.archive) as archive:
+            offsets = archive.games_reaching(game)
+            for offset in offsets:
+                record = archive.read_game(offset)
+                print(f"{offset}: result {record.result}, {record.plies} plies, "
+                      f"{json.dumps(record.metadata)}")
+            print(f"{len(offsets)} games", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
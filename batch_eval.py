@@ -0,0 +1,135 @@
+"""
+Vectorised evaluation of many positions at once (requires NumPy).
+
+Boards use the same encoding as `BaghChal.board`, flattened to one row per
+position: an (N, 25) int8 array with 0 = Empty, 1 = Goat, -1 = Tiger.
+Each move rule becomes one gather over precomputed index arrays, so a
+batch is scored with a handful of array operations instead of a Python
+loop per position.
+
+    boards, captured = boards_from_games(games)     # or boards_from_packed(array)
+    result = evaluate_batch(boards, captured)
+    result['tiger_score']   # == TigerBot().evaluate(game) for every game
+    result['goat_score']    # == GoatBot().evaluate(game)
+"""
+import numpy as np
+
+from game_logic import ADJACENT, JUMPS, NUM_POINTS, iter_bits
+from goat_bot import WEIGHTS as GOAT_WEIGHTS
+from tiger_bot import tuned_weights
+
+DEFAULT_CHUNK = 4096 # Positions per block; keeps the temporaries in cache
+
+
+def _build_index_tables():
+    """
+    Algorithm: Move Rules as Index Arrays
+    STEP_FROM/STEP_TO list every directed edge of the board graph and
+    JUMP_FROM/JUMP_OVER/JUMP_TO every (from, over, land) jump triple.
+    MOVE_MATRIX turns the per-move flags into per-point sums with one
+    matmul: rows 0-24 count the moves starting at each point, rows 25-49
+    count the jumps over each point. float32 is exact for these small
+    counts and runs through BLAS, unlike integer matmul.
+    """
+    step_from, step_to = [], []
+    for sq in range(NUM_POINTS):
+        for to in iter_bits(ADJACENT[sq]):
+            step_from.append(sq)
+            step_to.append(to)
+    jump_from, jump_over, jump_to = [], [], []
+    for sq in range(NUM_POINTS):
+        for over, land in JUMPS[sq]:
+            jump_from.append(sq)
+            jump_over.append(over)
+            jump_to.append(land)
+
+    num_steps = len(step_from)
+    matrix = np.zeros((2 * NUM_POINTS, num_steps + len(jump_from)), dtype=np.float32)
+    for i, sq in enumerate(step_from):
+        matrix[sq, i] = 1
+    for i, (sq, over) in enumerate(zip(jump_from, jump_over)):
+        matrix[sq, num_steps + i] = 1
+        matrix[NUM_POINTS + over, num_steps + i] = 1
+    return (np.array(step_from), np.array(step_to), np.array(jump_from), np.array(jump_over),
+            np.array(jump_to), matrix)
+
+
+STEP_FROM, STEP_TO, JUMP_FROM, JUMP_OVER, JUMP_TO, MOVE_MATRIX = _build_index_tables()
+NUM_STEPS = len(STEP_FROM)
+
+
+def boards_from_games(games):
+    """Packs BaghChal games into an (N, 25) int8 board array and an (N,) capture count array."""
+    goats = np.array([game.goats for game in games], dtype=np.int64)
+    tigers = np.array([game.tigers for game in games], dtype=np.int64)
+    bits = np.arange(NUM_POINTS, dtype=np.int64)
+    boards = ((goats[:, None] >> bits) & 1).astype(np.int8)
+    boards -= ((tigers[:, None] >> bits) & 1).astype(np.int8)
+    captured = np.array([game.goats_captured for game in games], dtype=np.int16)
+    return boards, captured
+
+
+def boards_from_packed(packed):
+    """Same as boards_from_games, for an (N,) array of packed Positions (see position.py)."""
+    packed = np.asarray(packed, dtype=np.uint64)
+    bits = np.arange(2 * NUM_POINTS, dtype=np.uint64)
+    planes = ((packed[:, None] >> bits) & np.uint64(1)).astype(np.int8)
+    boards = planes[:, :NUM_POINTS] - planes[:, NUM_POINTS:]
+    captured = ((packed >> np.uint64(2 * NUM_POINTS + 5)) & np.uint64(7)).astype(np.int16)
+    return boards, captured
+
+
+def _evaluate_chunk(boards, captured, weights):
+    # Point-major layout: every gather below reads whole contiguous rows
+    points = np.ascontiguousarray(boards.T)
+    tiger = points == -1
+    goat = points == 1
+    empty = points == 0
+
+    moves = np.empty(MOVE_MATRIX.shape[1:] + points.shape[1:], dtype=np.float32)
+    np.logical_and(tiger[STEP_FROM], empty[STEP_TO], out=moves[:NUM_STEPS], casting='unsafe')
+    np.logical_and(tiger[JUMP_FROM] & goat[JUMP_OVER], empty[JUMP_TO], out=moves[NUM_STEPS:],
+                   casting='unsafe')
+    sums = MOVE_MATRIX @ moves
+
+    per_point = sums[:NUM_POINTS]
+    mobility = per_point.sum(axis=0).astype(np.int32)
+    trapped = (tiger & (per_point == 0)).sum(axis=0, dtype=np.int32)
+    # A goat is threatened once, however many jumps reach it
+    threats = (sums[NUM_POINTS:] > 0).sum(axis=0, dtype=np.int32)
+    goats_on_board = goat.sum(axis=0, dtype=np.int32)
+
+    captured = captured.astype(np.int32)
+    tiger_score = (captured * weights['capture'] + mobility * weights['mobility']
+                   + threats * weights['threat'] + trapped * weights['trapped'])
+    goat_score = (captured * GOAT_WEIGHTS['capture'] + threats * GOAT_WEIGHTS['threat']
+                  + trapped * GOAT_WEIGHTS['trapped'] + mobility * GOAT_WEIGHTS['mobility']
+                  + (goats_on_board - threats) * GOAT_WEIGHTS['safe'])
+    return mobility, threats, trapped, tiger_score, goat_score
+
+
+def evaluate_batch(boards, captured, chunk_size=DEFAULT_CHUNK, tiger_weights=None):
+    """
+    Scores N positions at once.
+    boards: (N, 25) int8 array (0 = Empty, 1 = Goat, -1 = Tiger)
+    captured: (N,) goats captured so far
+    tiger_weights: TigerBot weights for tiger_score (default: the ones TigerBot loads)
+
+    Returns a dict of (N,) int32 arrays:
+    mobility    -> tiger steps + jumps (game.tiger_move_total)
+    threats     -> goats some tiger can jump right now
+    trapped     -> tigers with no move
+    tiger_score -> TigerBot(weights=tiger_weights).evaluate
+    goat_score  -> GoatBot.evaluate
+    """
+    weights = tuned_weights() if tiger_weights is None else tiger_weights
+    boards = np.asarray(boards, dtype=np.int8)
+    captured = np.asarray(captured)
+    names = ('mobility', 'threats', 'trapped', 'tiger_score', 'goat_score')
+    result = {name: np.empty(len(boards), dtype=np.int32) for name in names}
+    for start in range(0, len(boards), chunk_size):
+        end = start + chunk_size
+        chunk = _evaluate_chunk(boards[start:end], captured[start:end], weights)
+        for name, values in zip(names, chunk):
+            result[name][start:end] = values
+    return result
@@ -0,0 +1,527 @@
+"""
+Performance benchmarks for the Bagh-Chal engine.
+
+Usage:
+    python benchmark.py perft --depth 4
+    python benchmark.py undo-check --sequences 2000
+    python benchmark.py tt --depths 3 4 5 6
+    python benchmark.py parallel --depth 6 --workers 1 2 4 8
+    python benchmark.py batch-eval --positions 100000
+    python benchmark.py pvs --depths 5 6 7 8 --time-limit-ms 2000
+    python benchmark.py repetition --depths 8 12 16
+    python benchmark.py suite --out results.json --baseline baseline.json
+"""
+import argparse
+import copy
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+from benchmarks.legacy_game_logic import BaghChal as LegacyBaghChal
+from game_logic import BaghChal
+from goat_bot import GoatBot
+from tiger_bot import TigerBot
+from transposition import TranspositionTable
+
+# Known leaf counts from the start position (also a move-generation check)
+PERFT_START = {1: 21, 2: 252, 3: 5052, 4: 68204}
+
+# Reference positions: (rows, turn, goats_placed, goats_captured)
+FIXTURES = {
+    'opening': ([
+        "T...T",
+        ".....",
+        "..G..",
+        ".....",
+        "T...T",
+    ], 'T', 1, 0),
+    'midgame': ([
+        "T.G.T",
+        ".G...",
+        "G.G.G",
+        "...G.",
+        "T.G.T",
+    ], 'T', 7, 0),
+    'movement': ([
+        "GGTGG",
+        "GG.GG",
+        "TG.GT",
+        "GGGG.",
+        ".GGTG",
+    ], 'T', 20, 3),
+}
+
+
+# Movement-phase positions where both sides can only shuffle back and forth
+CYCLIC_FIXTURES = {
+    'fortress': ([
+        "TGGGT",
+        "GGGG.",
+        "GGGG.",
+        "GGGT.",
+        "GTGGG",
+    ], 'G', 20, 2),
+    'shuffle': ([
+        "GGGGG",
+        "GGGGG",
+        "GGTGG",
+        "GT.TG",
+        "GTGGG",
+    ], 'T', 20, 0),
+}
+
+
+def load_fixture(name):
+    rows, turn, placed, captured = FIXTURES.get(name) or CYCLIC_FIXTURES[name]
+    symbols = {'.': 0, 'G': 1, 'T': -1}
+    board = [[symbols[ch] for ch in row] for row in rows]
+    return BaghChal.from_board(board, turn, placed, captured)
+
+
+def perft(game, depth):
+    """
+    Algorithm: Perft (performance test)
+    Counts the leaf nodes of the full game tree to `depth` plies using the
+    bitboard generator and apply/undo. Decided games have no moves and
+    contribute 0. Every leaf is played, as in `perft_facade`, so nodes/sec
+    compare like for like.
+    """
+    if depth == 0:
+        return 1
+    nodes = 0
+    for move in game.legal_moves():
+        token = game.apply(move)
+        nodes += perft(game, depth - 1)
+        game.undo(token)
+    return nodes
+
+
+def perft_facade(game, depth):
+    """
+    Same count as `perft`, but only through the original public API
+    (get_valid_moves / make_move / place_goat with deepcopy). Works on both
+    the bitboard engine and the list-of-lists engine in benchmarks/.
+    """
+    if depth == 0:
+        return 1
+    if game.winner:
+        return 0
+    nodes = 0
+    if game.phase == 'PLACEMENT' and game.turn == 'G':
+        for r, c in game.get_valid_placements():
+            child = copy.deepcopy(game)
+            child.place_goat(r, c)
+            nodes += perft_facade(child, depth - 1)
+    else:
+        for r in range(5):
+            for c in range(5):
+                for dest in game.get_valid_moves(r, c):
+                    child = copy.deepcopy(game)
+                    child.make_move((r, c), dest)
+                    nodes += perft_facade(child, depth - 1)
+    return nodes
+
+
+def incremental_ok(game):
+    """Compares the incrementally tracked tiger data and position history with a rescan."""
+    fresh = copy.deepcopy(game)
+    fresh._rescan_tigers()
+    return (fresh.tiger_mobility() == game.tiger_mobility()
+            and fresh.tiger_move_counts == game.tiger_move_counts
+            and fresh.tiger_threats == game.tiger_threats
+            and game.history[-1] == game.hash
+            and game.position_counts == dict(Counter(game.history)))
+
+
+def undo_check(sequences, max_length, seed):
+    """
+    Plays random move sequences with `apply`, then unwinds them with `undo`
+    and verifies that every intermediate state is restored exactly, and that
+    the hash and tiger bookkeeping always match a full recomputation.
+    Returns the number of mismatches found.
+    """
+    rng = random.Random(seed)
+    failures = 0
+    for _ in range(sequences):
+        game = BaghChal()
+        states, tokens = [], []
+        for _ in range(rng.randint(1, max_length)):
+            moves = game.legal_moves()
+            if not moves:
+                break
+            if game.hash != game.compute_hash() or not incremental_ok(game):
+                failures += 1
+                break
+            states.append(game.state())
+            tokens.append(game.apply(rng.choice(moves)))
+        while tokens:
+            game.undo(tokens.pop())
+            if game.state() != states.pop() or not incremental_ok(game):
+                failures += 1
+                break
+    return failures
+
+
+def random_positions(count, seed):
+    """Positions reached by random play, spread over both phases."""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        game = BaghChal()
+        for _ in range(rng.randint(0, 80)):
+            moves = game.legal_moves()
+            if not moves:
+                break
+            game.apply(rng.choice(moves))
+        positions.append(game)
+    return positions
+
+
+def run_perft(max_depth):
+    engines = [('legacy', perft_facade, LegacyBaghChal), ('facade', perft_facade, BaghChal),
+               ('bitboard', perft, BaghChal)]
+    print(f"{'mode':<10}{'depth':>6}{'nodes':>12}{'seconds':>10}{'nodes/s':>12}")
+    for name, fn, engine in engines:
+        for depth in range(1, max_depth + 1):
+            start = time.perf_counter()
+            nodes = fn(engine(), depth)
+            elapsed = time.perf_counter() - start
+            expected = PERFT_START.get(depth)
+            flag = '' if expected in (None, nodes) else f'  MISMATCH (expected {expected})'
+            nps = nodes / max(elapsed, 1e-9)
+            print(f"{name:<10}{depth:>6}{nodes:>12}{elapsed:>10.3f}{nps:>12.0f}{flag}")
+
+
+def run_tt_comparison(depths, seed):
+    """Node counts with and without the transposition table at each depth."""
+    print(f"{'fixture':<10}{'depth':>6}{'nodes (no TT)':>15}{'nodes (TT)':>12}"
+          f"{'saved':>8}{'hit rate':>10}{'s (no TT)':>11}{'s (TT)':>9}")
+    for name in FIXTURES:
+        for depth in depths:
+            row = []
+            for tt_size in (0, 1 << 18):
+                bot = TigerBot(depth=depth, tt_size=tt_size, seed=seed)
+                game = load_fixture(name)
+                start = time.perf_counter()
+                bot.get_best_move(game)
+                row.append((bot.nodes, time.perf_counter() - start,
+                            bot.tt.hit_rate() if bot.tt else 0.0))
+            (plain, plain_s, _), (tt, tt_s, hit_rate) = row
+            saved = 1 - tt / plain if plain else 0.0
+            print(f"{name:<10}{depth:>6}{plain:>15}{tt:>12}{saved:>8.0%}"
+                  f"{hit_rate:>10.1%}{plain_s:>11.2f}{tt_s:>9.2f}")
+
+
+def run_parallel_speedup(depth, worker_counts, seed):
+    """Wall time of a fixed-depth search for each worker count."""
+    print(f"{'fixture':<10}{'workers':>8}{'seconds':>10}{'speedup':>9}{'nodes':>10}  move")
+    for name in FIXTURES:
+        baseline = None
+        for workers in worker_counts:
+            bot = TigerBot(depth=2, workers=workers, seed=seed)
+            bot.get_best_move(load_fixture(name)) # Starts worker processes outside the timing
+            bot.depth = depth
+            bot.tt = TranspositionTable(bot.tt_size) # Same cold table for every run
+            start = time.perf_counter()
+            move = bot.get_best_move(load_fixture(name))
+            elapsed = time.perf_counter() - start
+            bot.close()
+            baseline = baseline or elapsed
+            print(f"{name:<10}{workers:>8}{elapsed:>10.2f}{baseline / elapsed:>8.2f}x"
+                  f"{bot.stats.nodes:>10}  {move}")
+
+
+def run_pvs_comparison(depths, time_limit_ms, seed):
+    """
+    Plain alpha-beta against PVS + aspiration + LMR, without and with
+    quiescence, on every fixture: nodes at each fixed depth, then the
+    deepest completed iteration within the same time budget.
+    """
+    variants = (('plain', {}), ('pvs', {'pruning': True}),
+                ('pvs+q', {'pruning': True, 'quiescence': True}))
+    names = [name for name, _ in variants]
+    print(f"{'fixture':<10}{'depth':>6}" + ''.join(f"{f'nodes ({name})':>15}" for name in names)
+          + ''.join(f"{f'score ({name})':>15}" for name in names) + f"{'q-nodes':>9}")
+    for name in FIXTURES:
+        bot_class = TigerBot if load_fixture(name).turn == 'T' else GoatBot
+        for depth in depths:
+            row = []
+            for _, options in variants:
+                bot = bot_class(depth=depth, seed=seed, **options)
+                bot.get_best_move(load_fixture(name))
+                row.append(bot.stats)
+            print(f"{name:<10}{depth:>6}" + ''.join(f"{stats.nodes:>15}" for stats in row)
+                  + ''.join(f"{stats.score:>15}" for stats in row)
+                  + f"{row[-1].quiescence_nodes:>9}")
+
+    print(f"\nDeepest completed iteration in {time_limit_ms} ms")
+    print(f"{'fixture':<10}" + ''.join(f"{name:>7}" for name in names))
+    for name in FIXTURES:
+        bot_class = TigerBot if load_fixture(name).turn == 'T' else GoatBot
+        reached = []
+        for _, options in variants:
+            bot = bot_class(time_limit_ms=time_limit_ms, seed=seed, **options)
+            bot.get_best_move(load_fixture(name))
+            reached.append(bot.stats.depth)
+        print(f"{name:<10}" + ''.join(f"{depth:>7}" for depth in reached))
+
+
+def run_repetition_comparison(depths, seed):
+    """
+    Nodes and scores on the cyclic fixtures with the search's repetition
+    check off and on. With it on, a line that returns to an earlier
+    position scores 0 at once instead of being searched round the cycle,
+    but nothing above such a draw is stored in the transposition table.
+    """
+    print(f"{'fixture':<10}{'depth':>6}{'nodes (off)':>13}{'nodes (on)':>12}{'change':>8}"
+          f"{'score (off)':>13}{'score (on)':>12}")
+    for name in CYCLIC_FIXTURES:
+        bot_class = TigerBot if load_fixture(name).turn == 'T' else GoatBot
+        for depth in depths:
+            row = []
+            for repetition in (False, True):
+                bot = bot_class(depth=depth, seed=seed, repetition=repetition)
+                bot.get_best_move(load_fixture(name))
+                row.append(bot.stats)
+            off, on = row
+            change = on.nodes / off.nodes - 1 if off.nodes else 0.0
+            print(f"{name:<10}{depth:>6}{off.nodes:>13}{on.nodes:>12}{change:>+8.0%}"
+                  f"{off.score:>13}{on.score:>12}")
+
+
+def run_batch_eval(count, seed):
+    """
+    Checks the NumPy batch evaluator against the bots' evaluate on random
+    positions and compares throughput. The scalar path is what a job that
+    holds boards must do: build a BaghChal from each board, then evaluate.
+    """
+    from batch_eval import boards_from_games, evaluate_batch # Optional NumPy dependency
+
+    positions = random_positions(count, seed)
+    tiger_bot, goat_bot = TigerBot(), GoatBot()
+    boards, captured = boards_from_games(positions)
+
+    start = time.perf_counter()
+    result = evaluate_batch(boards, captured)
+    batch_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for game in positions:
+        fresh = BaghChal.from_board(game.board, game.turn, game.goats_placed, game.goats_captured)
+        tiger_bot.evaluate(fresh)
+    scalar_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for game in positions:
+        tiger_bot.evaluate(game)
+    ready_s = time.perf_counter() - start
+
+    mismatches = 0
+    for i, game in enumerate(positions):
+        moves, trapped, vulnerable = game.tiger_mobility()
+        expected = (moves, bin(vulnerable).count('1'), trapped,
+                    tiger_bot.evaluate(game), goat_bot.evaluate(game))
+        got = tuple(int(result[name][i]) for name in
+                    ('mobility', 'threats', 'trapped', 'tiger_score', 'goat_score'))
+        mismatches += got != expected
+
+    print(f"{count} positions, {mismatches} mismatches")
+    print(f"batch (NumPy):              {batch_s:8.3f}s  {count / batch_s:12.0f} positions/s")
+    print(f"board -> BaghChal + eval:   {scalar_s:8.3f}s  {count / scalar_s:12.0f} positions/s"
+          f"  ({scalar_s / batch_s:.0f}x slower)")
+    print(f"evaluate on a live game:    {ready_s:8.3f}s  {count / ready_s:12.0f} positions/s"
+          f"  ({batch_s / ready_s:.1f}x the batch rate: incremental counters,"
+          f" no board decoding)")
+    return mismatches
+
+
+MIN_COMPARED_SECONDS = 0.01 # Faster rows are only checked for node counts
+
+
+def _measure(fn, *args, min_seconds=0.2):
+    """
+    Times fn(*args), repeating it until `min_seconds` have passed and keeping
+    the fastest run, then runs it once more under tracemalloc for the peak
+    Python allocation (tracing slows the code down, so it is kept out of
+    the timed runs). Returns (result, seconds, peak_kib).
+    """
+    elapsed = float('inf')
+    total = 0.0
+    while total < min_seconds:
+        start = time.perf_counter()
+        result = fn(*args)
+        run = time.perf_counter() - start
+        elapsed = min(elapsed, run)
+        total += run
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024
+
+
+def _search_fixture(bot_class, name, depth):
+    bot = bot_class(depth=depth, seed=0)
+    move = bot.get_best_move(load_fixture(name))
+    return bot.nodes, move
+
+
+def run_suite(perft_depth, search_depth):
+    """
+    Perft to depths 1..perft_depth from the start position and every
+    fixture, plus a fixed-depth search per fixture with the bot of the side
+    to move. Node counts are deterministic (seeded bots), so they double
+    as a correctness check against a baseline.
+    """
+    results = {
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'cpus': os.cpu_count()},
+        'perft': [],
+        'search': [],
+    }
+    positions = [('start', BaghChal)] + [(name, lambda name=name: load_fixture(name))
+                                          for name in FIXTURES]
+    for name, make in positions:
+        for depth in range(1, perft_depth + 1):
+            nodes, elapsed, peak = _measure(lambda: perft(make(), depth))
+            expected = PERFT_START.get(depth) if name == 'start' else None
+            if expected is not None and nodes != expected:
+                raise SystemExit(f"perft start depth {depth}: {nodes} nodes, expected {expected}")
+            results['perft'].append({'position': name, 'depth': depth, 'nodes': nodes,
+                                     'seconds': elapsed, 'nps': nodes / max(elapsed, 1e-9),
+                                     'peak_kib': peak})
+    for name in FIXTURES:
+        bot_class = TigerBot if load_fixture(name).turn == 'T' else GoatBot
+        (nodes, move), elapsed, peak = _measure(_search_fixture, bot_class, name, search_depth)
+        results['search'].append({'position': name, 'bot': bot_class.__name__,
+                                  'depth': search_depth, 'nodes': nodes,
+                                  'move': [list(pos) if pos else None for pos in move],
+                                  'seconds': elapsed, 'nps': nodes / max(elapsed, 1e-9),
+                                  'peak_kib': peak})
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    Returns a list of regressions: changed node counts or moves (a behaviour
+    change), nodes/sec more than `tolerance` below the baseline, or peak
+    memory more than `tolerance` above it.
+    """
+    problems = []
+    for kind, key in (('perft', ('position', 'depth')), ('search', ('position', 'bot', 'depth'))):
+        old_rows = {tuple(row[k] for k in key): row for row in baseline.get(kind, [])}
+        for row in results[kind]:
+            ident = tuple(row[k] for k in key)
+            old = old_rows.get(ident)
+            if old is None:
+                continue
+            label = f"{kind} {' '.join(map(str, ident))}"
+            if row['nodes'] != old['nodes']:
+                problems.append(f"{label}: nodes {row['nodes']} != baseline {old['nodes']}")
+            if kind == 'search' and row['move'] != old['move']:
+                problems.append(f"{label}: move {row['move']} != baseline {old['move']}")
+            if old['seconds'] < MIN_COMPARED_SECONDS:
+                continue # Too short to time reliably; node counts are still checked
+            if row['nps'] < old['nps'] * (1 - tolerance):
+                problems.append(f"{label}: {row['nps']:.0f} nodes/s, baseline {old['nps']:.0f}")
+            if row['peak_kib'] > old['peak_kib'] * (1 + tolerance) + 64:
+                problems.append(f"{label}: peak {row['peak_kib']:.0f} KiB, "
+                                f"baseline {old['peak_kib']:.0f} KiB")
+    return problems
+
+
+def print_suite(results):
+    print(f"{'kind':<8}{'position':<10}{'depth':>6}{'nodes':>10}{'seconds':>9}"
+          f"{'nodes/s':>10}{'peak KiB':>10}")
+    for kind in ('perft', 'search'):
+        for row in results[kind]:
+            print(f"{kind:<8}{row['position']:<10}{row['depth']:>6}{row['nodes']:>10}"
+                  f"{row['seconds']:>9.3f}{row['nps']:>10.0f}{row['peak_kib']:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bagh-Chal engine benchmarks")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_perft = sub.add_parser('perft', help="perft node counts and nodes/sec")
+    p_perft.add_argument('--depth', type=int, default=4)
+
+    p_undo = sub.add_parser('undo-check', help="random apply/undo round trips")
+    p_undo.add_argument('--sequences', type=int, default=2000)
+    p_undo.add_argument('--length', type=int, default=80)
+    p_undo.add_argument('--seed', type=int, default=0)
+
+    p_tt = sub.add_parser('tt', help="TigerBot node counts with/without the transposition table")
+    p_tt.add_argument('--depths', type=int, nargs='+', default=[3, 4, 5, 6])
+    p_tt.add_argument('--seed', type=int, default=0)
+
+    p_par = sub.add_parser('parallel', help="parallel root search speedup by worker count")
+    p_par.add_argument('--depth', type=int, default=6)
+    p_par.add_argument('--workers', type=int, nargs='+',
+                       default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    p_par.add_argument('--seed', type=int, default=0)
+
+    p_batch = sub.add_parser('batch-eval', help="NumPy batch evaluator: exactness and throughput")
+    p_batch.add_argument('--positions', type=int, default=100000)
+    p_batch.add_argument('--seed', type=int, default=0)
+
+    p_pvs = sub.add_parser('pvs', help="plain alpha-beta vs PVS/LMR with and without quiescence")
+    p_pvs.add_argument('--depths', type=int, nargs='+', default=[5, 6, 7, 8])
+    p_pvs.add_argument('--time-limit-ms', type=int, default=2000)
+    p_pvs.add_argument('--seed', type=int, default=0)
+
+    p_rep = sub.add_parser('repetition', help="cyclic fixtures with/without repetition draws")
+    p_rep.add_argument('--depths', type=int, nargs='+', default=[8, 12, 16])
+    p_rep.add_argument('--seed', type=int, default=0)
+
+    p_suite = sub.add_parser('suite', help="perft + search suite with baseline comparison")
+    p_suite.add_argument('--perft-depth', type=int, default=5)
+    p_suite.add_argument('--search-depth', type=int, default=5)
+    p_suite.add_argument('--out', default=None, help="write results as JSON")
+    p_suite.add_argument('--baseline', default=None, help="fail on regressions against this JSON")
+    p_suite.add_argument('--tolerance', type=float, default=0.25,
+                         help="allowed relative drop in nodes/sec or growth in peak memory")
+
+    args = parser.parse_args()
+    if args.command == 'perft':
+        run_perft(args.depth)
+    elif args.command == 'undo-check':
+        failures = undo_check(args.sequences, args.length, args.seed)
+        print(f"{args.sequences} sequences, {failures} mismatches")
+        if failures:
+            raise SystemExit(1)
+    elif args.command == 'tt':
+        run_tt_comparison(args.depths, args.seed)
+    elif args.command == 'parallel':
+        run_parallel_speedup(args.depth, args.workers, args.seed)
+    elif args.command == 'pvs':
+        run_pvs_comparison(args.depths, args.time_limit_ms, args.seed)
+    elif args.command == 'repetition':
+        run_repetition_comparison(args.depths, args.seed)
+    elif args.command == 'batch-eval':
+        if run_batch_eval(args.positions, args.seed):
+            raise SystemExit(1)
+    elif args.command == 'suite':
+        results = run_suite(args.perft_depth, args.search_depth)
+        print_suite(results)
+        if args.out:
+            with open(args.out, 'w') as f:
+                json.dump(results, f, indent=2)
+        if args.baseline:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+            problems = compare_to_baseline(results, baseline, args.tolerance)
+            for problem in problems:
+                print(f"REGRESSION {problem}", file=sys.stderr)
+            if problems:
+                raise SystemExit(1)
+            print(f"No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,493 @@
+import random
+
+# --- Board Geometry ---
+# Points are numbered 0..24, row by row: index = r * 5 + c.
+# A bitboard is an int where bit `index` is set when that point is occupied.
+BOARD_SIZE = 5
+NUM_POINTS = BOARD_SIZE * BOARD_SIZE
+FULL_MASK = (1 << NUM_POINTS) - 1
+
+TOTAL_GOATS = 20      # Goats to place before the MOVEMENT phase starts
+CAPTURES_TO_WIN = 5   # Goats the tigers must eat to win
+REPETITION_LIMIT = 3  # Occurrences of one position that draw the game (threefold)
+DRAW = 'D'            # `winner` of a game drawn by repetition
+
+TIGER_START = [(0, 0), (0, 4), (4, 0), (4, 4)]
+
+# Square index <-> (r, c) lookups
+SQUARE_COORDS = [(i // BOARD_SIZE, i % BOARD_SIZE) for i in range(NUM_POINTS)]
+
+
+def square(r, c):
+    return r * BOARD_SIZE + c
+
+
+def iter_bits(mask):
+    """Yields the square index of every set bit, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _build_tables():
+    """
+    Algorithm: Precomputed Board Graph
+    For every point, store the bitmask of its neighbours and the list of
+    (over, land) jump pairs a tiger could use from it. Diagonal lines exist
+    only on points where (r + c) is even.
+    """
+    adjacent = [0] * NUM_POINTS
+    jumps = [() for _ in range(NUM_POINTS)]
+    jump_over = [-1] * (NUM_POINTS * NUM_POINTS)
+    reach = [0] * NUM_POINTS
+
+    for r in range(BOARD_SIZE):
+        for c in range(BOARD_SIZE):
+            directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+            if (r + c) % 2 == 0:
+                directions += [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+            sq = square(r, c)
+            pairs = []
+            for dr, dc in directions:
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < BOARD_SIZE and 0 <= nc < BOARD_SIZE:
+                    adjacent[sq] |= 1 << square(nr, nc)
+                lr, lc = r + 2 * dr, c + 2 * dc
+                if 0 <= lr < BOARD_SIZE and 0 <= lc < BOARD_SIZE:
+                    over, land = square(nr, nc), square(lr, lc)
+                    pairs.append((over, land))
+                    jump_over[sq * NUM_POINTS + land] = over
+                    reach[sq] |= 1 << land
+            jumps[sq] = tuple(pairs)
+            reach[sq] |= adjacent[sq]
+
+    # A tiger at t is affected by a change at x when x is in reach[t]
+    reached_by = [0] * NUM_POINTS
+    for t in range(NUM_POINTS):
+        for x in iter_bits(reach[t]):
+            reached_by[x] |= 1 << t
+
+    return adjacent, jumps, jump_over, reached_by
+
+
+# ADJACENT[sq]   -> bitmask of points one step away from sq
+# JUMPS[sq]      -> tuple of (over, land) squares for a tiger jump from sq
+# JUMP_OVER[f*25 + t] -> square jumped over when moving f -> t, or -1
+# REACHED_BY[sq] -> bitmask of points whose tiger moves depend on sq
+ADJACENT, JUMPS, JUMP_OVER, REACHED_BY = _build_tables()
+
+TIGER_START_MASK = 0
+for _r, _c in TIGER_START:
+    TIGER_START_MASK |= 1 << square(_r, _c)
+
+
+def _build_symmetries():
+    """
+    Algorithm: Dihedral Symmetries of the Board
+    The board graph is invariant under the 8 rotations/reflections of the
+    square. SYMMETRIES[s][sq] is the image of point sq under symmetry s
+    (s = 0 is the identity). To transform a whole bitboard quickly, each
+    row's 5 bits are looked up in a 32-entry table per (symmetry, row).
+    """
+    n = BOARD_SIZE - 1
+    maps = [
+        lambda r, c: (r, c),
+        lambda r, c: (c, n - r),      # Rotate 90
+        lambda r, c: (n - r, n - c),  # Rotate 180
+        lambda r, c: (n - c, r),      # Rotate 270
+        lambda r, c: (r, n - c),      # Mirror left/right
+        lambda r, c: (n - r, c),      # Mirror top/bottom
+        lambda r, c: (c, r),          # Main diagonal
+        lambda r, c: (n - c, n - r),  # Anti-diagonal
+    ]
+    perms = [[square(*f(*SQUARE_COORDS[sq])) for sq in range(NUM_POINTS)] for f in maps]
+
+    row_tables = []
+    for perm in perms:
+        tables = []
+        for row in range(BOARD_SIZE):
+            table = []
+            for bits in range(1 << BOARD_SIZE):
+                out = 0
+                for c in range(BOARD_SIZE):
+                    if bits >> c & 1:
+                        out |= 1 << perm[row * BOARD_SIZE + c]
+                table.append(out)
+            tables.append(table)
+        row_tables.append(tables)
+    return perms, row_tables
+
+
+SYMMETRIES, _SYMMETRY_ROWS = _build_symmetries()
+
+
+def transform_mask(mask, sym):
+    """Image of a bitboard under symmetry index `sym`."""
+    t0, t1, t2, t3, t4 = _SYMMETRY_ROWS[sym]
+    return (t0[mask & 31] | t1[(mask >> 5) & 31] | t2[(mask >> 10) & 31]
+            | t3[(mask >> 15) & 31] | t4[mask >> 20])
+
+
+def _build_zobrist(seed=0x8A6C):
+    """
+    Algorithm: Zobrist Hashing
+    One random 64-bit key per (piece, point), per goats-placed count and per
+    goats-captured count, plus one for "tiger to move". A position's hash is
+    the XOR of the keys that apply, so a move updates it with a few XORs.
+    A fixed seed keeps hashes stable across runs (opening books, caches).
+    """
+    rng = random.Random(seed)
+    goat = [rng.getrandbits(64) for _ in range(NUM_POINTS)]
+    tiger = [rng.getrandbits(64) for _ in range(NUM_POINTS)]
+    placed = [rng.getrandbits(64) for _ in range(TOTAL_GOATS + 1)]
+    captured = [rng.getrandbits(64) for _ in range(TOTAL_GOATS + 1)]
+    turn = rng.getrandbits(64)
+    return goat, tiger, placed, captured, turn
+
+
+ZOBRIST_GOAT, ZOBRIST_TIGER, ZOBRIST_PLACED, ZOBRIST_CAPTURED, ZOBRIST_TIGER_TURN = _build_zobrist()
+
+
 class BaghChal:
-    def __init__(self):
-        # Board representation: 5x5 grid
-        # 0 = Empty, 1 = Goat (G), -1 = Tiger (T)
-        self.board = [[0 for _ in range(5)] for _ in range(5)]
-        
+    def __init__(self, repetition_limit=REPETITION_LIMIT):
+        # Board representation: two 25-bit bitboards
+        # self.goats has bit (r * 5 + c) set for every Goat (G)
+        # self.tigers has bit (r * 5 + c) set for every Tiger (T)
+        self.goats = 0
+        self.tigers = TIGER_START_MASK  # Tigers start at the four corners
+
         # Game State
         self.goats_placed = 0  # Count of goats placed on board (max 20)
         self.goats_captured = 0 # Count of goats eaten by tigers
         self.turn = 'G'  # 'G' for Goat, 'T' for Tiger. Goat starts first (placement).
         self.phase = 'PLACEMENT' # 'PLACEMENT' or 'MOVEMENT'
-        self.winner = None # 'G', 'T', or None
-        
-        # Initialize Tigers at the four corners
-        for r, c in [(0,0),(0,4),(4,0),(4,4)]:
-            self.board[r][c] = -1
+        self.winner = None # 'G', 'T', DRAW, or None
+
+        # Zobrist hash of the position, kept up to date by apply/undo
+        self.hash = self.compute_hash()
+
+        # Position history for repetition detection: a stack of hashes
+        # (pushed by apply, popped by undo) and a count per hash, so both
+        # operations and the repetition test are O(1).
+        # repetition_limit = 0 / None never draws the game.
+        self.repetition_limit = repetition_limit
+        self.history = [self.hash]
+        self.position_counts = {self.hash: 1}
+
+        # Incremental tiger bookkeeping, refreshed only around each move:
+        # per point: number of moves of the tiger there (-1 = no tiger) and
+        # the goats it can jump; totals are read in O(1) by evaluations.
+        self.tiger_move_counts = [-1] * NUM_POINTS
+        self.tiger_threats = [0] * NUM_POINTS
+        self.tiger_move_total = 0
+        self.trapped_tigers = 0
+        self._rescan_tigers()
+
+    @classmethod
+    def from_board(cls, board, turn='G', goats_placed=0, goats_captured=0,
+                   repetition_limit=REPETITION_LIMIT):
+        """
+        Builds a game from a 5x5 grid (0 = Empty, 1 = Goat, -1 = Tiger) and
+        counters. Phase, hash and winner are derived from them; the position
+        history starts at this position.
+        """
+        goats = tigers = 0
+        for r in range(BOARD_SIZE):
+            for c in range(BOARD_SIZE):
+                if board[r][c] == 1:
+                    goats |= 1 << square(r, c)
+                elif board[r][c] == -1:
+                    tigers |= 1 << square(r, c)
+        return cls.from_bitboards(goats, tigers, turn, goats_placed, goats_captured,
+                                  repetition_limit)
+
+    @classmethod
+    def from_bitboards(cls, goats, tigers, turn='G', goats_placed=0, goats_captured=0,
+                       repetition_limit=REPETITION_LIMIT):
+        """
+        Builds a game from goat and tiger bitboards and counters, like
+        `from_board`: phase, hash, tiger data and winner are derived, and the
+        position history starts at this position.
+        """
+        game = cls(repetition_limit)
+        game.goats = goats
+        game.tigers = tigers
+        game.turn = turn
+        game.goats_placed = goats_placed
+        game.goats_captured = goats_captured
+        game.phase = 'MOVEMENT' if goats_placed >= TOTAL_GOATS else 'PLACEMENT'
+        game.hash = game.compute_hash()
+        game.history = [game.hash]
+        game.position_counts = {game.hash: 1}
+        game._rescan_tigers()
+        game.check_win_condition()
+        return game
+
+    @property
+    def board(self):
+        """
+        Compatibility view of the bitboards as a 5x5 grid.
+        0 = Empty, 1 = Goat (G), -1 = Tiger (T)
+        The grid is rebuilt on every access, so writes to it are not kept.
+        """
+        return [[self.piece_at(r, c) for c in range(BOARD_SIZE)] for r in range(BOARD_SIZE)]
+
+    def piece_at(self, r, c):
+        bit = 1 << square(r, c)
+        if self.goats & bit:
+            return 1
+        if self.tigers & bit:
+            return -1
+        return 0
+
+    def compute_hash(self):
+        """Full Zobrist hash recomputed from scratch (apply/undo keep it incrementally)."""
+        h = ZOBRIST_PLACED[self.goats_placed] ^ ZOBRIST_CAPTURED[self.goats_captured]
+        for sq in iter_bits(self.goats):
+            h ^= ZOBRIST_GOAT[sq]
+        for sq in iter_bits(self.tigers):
+            h ^= ZOBRIST_TIGER[sq]
+        if self.turn == 'T':
+            h ^= ZOBRIST_TIGER_TURN
+        return h
+
+    def empty_mask(self):
+        return FULL_MASK ^ (self.goats | self.tigers)
+
+    # --- Bitboard Move Generation ---
+    # Moves are (from_sq, to_sq) pairs of square indices.
+    # Goat placements use from_sq = None.
+
+    def tiger_moves(self):
+        """All tiger steps and jumps, ignoring whose turn it is."""
+        empty = FULL_MASK ^ (self.goats | self.tigers)
+        goats = self.goats
+        moves = []
+        for sq in iter_bits(self.tigers):
+            for to in iter_bits(ADJACENT[sq] & empty):
+                moves.append((sq, to))
+            for over, land in JUMPS[sq]:
+                if (goats >> over) & 1 and (empty >> land) & 1:
+                    moves.append((sq, land))
+        return moves
+
+    def tiger_captures(self):
+        """Tiger jumps only, read from the incremental threat masks."""
+        empty = FULL_MASK ^ (self.goats | self.tigers)
+        goats, threats = self.goats, self.tiger_threats
+        moves = []
+        for sq in iter_bits(self.tigers):
+            if threats[sq]:
+                for over, land in JUMPS[sq]:
+                    if (goats >> over) & 1 and (empty >> land) & 1:
+                        moves.append((sq, land))
+        return moves
+
+    def goat_moves(self):
+        """Placements during PLACEMENT, single steps during MOVEMENT."""
+        empty = FULL_MASK ^ (self.goats | self.tigers)
+        if self.phase == 'PLACEMENT':
+            return [(None, to) for to in iter_bits(empty)]
+        moves = []
+        for sq in iter_bits(self.goats):
+            for to in iter_bits(ADJACENT[sq] & empty):
+                moves.append((sq, to))
+        return moves
+
+    def legal_moves(self):
+        """Moves for the side to move, or [] once the game is decided."""
+        if self.winner:
+            return []
+        return self.tiger_moves() if self.turn == 'T' else self.goat_moves()
+
+    def symmetries(self):
+        """Indices of the non-identity symmetries that leave this position unchanged."""
+        goats, tigers = self.goats, self.tigers
+        return [sym for sym in range(1, len(SYMMETRIES))
+                if transform_mask(tigers, sym) == tigers and transform_mask(goats, sym) == goats]
+
+    def tiger_mobility(self):
+        """
+        Tiger summary for the evaluation functions, read in O(1).
+        Returns (moves, trapped, vulnerable):
+        moves      -> number of tiger steps + jumps
+        trapped    -> number of tigers with no move at all
+        vulnerable -> bitmask of goats that some tiger can jump right now
+        """
+        threats = self.tiger_threats
+        vulnerable = 0
+        for sq in iter_bits(self.tigers): # Always 4 tigers
+            vulnerable |= threats[sq]
+        return self.tiger_move_total, self.trapped_tigers, vulnerable
+
+    def tigers_can_move(self):
+        return self.tiger_move_total > 0
+
+    def _refresh_tigers(self, mask):
+        """
+        Algorithm: Incremental Mobility Update
+        Recomputes the move count and threats of every point in `mask` (tiger
+        or not) against the current bitboards and adjusts the totals.
+        Returns the overwritten (point, count, threats) entries for undo.
+        """
+        empty = FULL_MASK ^ (self.goats | self.tigers)
+        goats, tigers = self.goats, self.tigers
+        counts, threats = self.tiger_move_counts, self.tiger_threats
+        total, trapped = self.tiger_move_total, self.trapped_tigers
+        changes = []
+        while mask:
+            low = mask & -mask
+            mask ^= low
+            sq = low.bit_length() - 1
+            old = counts[sq]
+            if tigers & low:
+                count = bin(ADJACENT[sq] & empty).count('1')
+                threat = 0
+                for over, land in JUMPS[sq]:
+                    if (goats >> over) & 1 and (empty >> land) & 1:
+                        count += 1
+                        threat |= 1 << over
+            else:
+                count, threat = -1, 0
+            if count == old and threat == threats[sq]:
+                continue
+            changes.append((sq, old, threats[sq]))
+            counts[sq] = count
+            threats[sq] = threat
+            if old > 0:
+                total -= old
+            elif old == 0:
+                trapped -= 1
+            if count > 0:
+                total += count
+            elif count == 0:
+                trapped += 1
+        self.tiger_move_total, self.trapped_tigers = total, trapped
+        return changes
+
+    def _rescan_tigers(self):
+        """Full recomputation of the tiger bookkeeping (construction / restore)."""
+        self.tiger_move_counts = [-1] * NUM_POINTS
+        self.tiger_threats = [0] * NUM_POINTS
+        self.tiger_move_total = self.trapped_tigers = 0
+        self._refresh_tigers(self.tigers)
+
+    def apply(self, move):
+        """
+        Executes an already-validated (from_sq, to_sq) move for the side to
+        move, including captures, turn switch, win detection and the draw by
+        repetition (the position history is pushed here and popped by undo).
+        Returns an undo token that `undo` uses to restore the exact prior state.
+        """
+        state = (self.goats, self.tigers, self.goats_placed, self.goats_captured,
+                 self.turn, self.phase, self.winner, self.hash,
+                 self.tiger_move_total, self.trapped_tigers)
+
+        frm, to = move
+        to_bit = 1 << to
+        h = self.hash
+        touched = REACHED_BY[to] | to_bit
+        vacated = 0 # Point a tiger left, whose entry must be cleared
+        if frm is None:
+            self.goats |= to_bit
+            h ^= ZOBRIST_GOAT[to] ^ ZOBRIST_PLACED[self.goats_placed]
+            self.goats_placed += 1
+            h ^= ZOBRIST_PLACED[self.goats_placed]
+            if self.goats_placed == TOTAL_GOATS:
+                self.phase = 'MOVEMENT'
+        elif self.turn == 'T':
+            self.tigers ^= (1 << frm) | to_bit
+            h ^= ZOBRIST_TIGER[frm] ^ ZOBRIST_TIGER[to]
+            touched |= REACHED_BY[frm]
+            vacated = 1 << frm
+            over = JUMP_OVER[frm * NUM_POINTS + to]
+            if over >= 0: # Distance 2 means a jump
+                self.goats ^= 1 << over # Remove Goat
+                h ^= ZOBRIST_GOAT[over] ^ ZOBRIST_CAPTURED[self.goats_captured]
+                self.goats_captured += 1
+                h ^= ZOBRIST_CAPTURED[self.goats_captured]
+                touched |= REACHED_BY[over]
+        else:
+            self.goats ^= (1 << frm) | to_bit
+            h ^= ZOBRIST_GOAT[frm] ^ ZOBRIST_GOAT[to]
+            touched |= REACHED_BY[frm]
+        self.hash = h
+
+        # Only tigers around the changed points can gain or lose moves
+        changes = self._refresh_tigers(touched & self.tigers | vacated)
+
+        self.switch_turn()
+        self.check_win_condition()
+
+        h = self.hash
+        self.history.append(h)
+        seen = self.position_counts.get(h, 0) + 1
+        self.position_counts[h] = seen
+        limit = self.repetition_limit
+        if limit and seen >= limit and not self.winner:
+            self.winner = DRAW
+        return state, changes
+
+    def undo(self, token):
+        """Reverts the move that produced `token` (tokens must be undone LIFO)."""
+        state, changes = token
+        (self.goats, self.tigers, self.goats_placed, self.goats_captured,
+         self.turn, self.phase, self.winner, self.hash,
+         self.tiger_move_total, self.trapped_tigers) = state
+        counts, threats = self.tiger_move_counts, self.tiger_threats
+        for sq, count, threat in changes:
+            counts[sq] = count
+            threats[sq] = threat
+        self._pop_history()
+
+    def _pop_history(self):
+        h = self.history.pop()
+        seen = self.position_counts[h] - 1
+        if seen:
+            self.position_counts[h] = seen
+        else:
+            del self.position_counts[h]
+
+    def repetitions(self):
+        """How often the current position has occurred in this game (1 = first time)."""
+        return self.position_counts.get(self.hash, 0)
+
+    def load_history(self, hashes):
+        """
+        Replaces the position history with `hashes` (oldest first, ending
+        with the current position), e.g. to give a rebuilt copy of a game
+        the repetitions of the original.
+        """
+        self.history = list(hashes)
+        self.position_counts = {}
+        for key in self.history:
+            self.position_counts[key] = self.position_counts.get(key, 0) + 1
+
+    def state(self):
+        """Tuple of every field that defines the game, for equality checks."""
+        return (self.goats, self.tigers, self.goats_placed, self.goats_captured,
+                self.turn, self.phase, self.winner, self.hash)
+
+    def restore(self, state, history_length=None):
+        """
+        Resets the game to a `state()` snapshot.
+        history_length: unwinding an aborted search, keep the first N
+        entries of the position history (len(game.history) at the snapshot);
+        None starts a new history at the restored position.
+        """
+        (self.goats, self.tigers, self.goats_placed, self.goats_captured,
+         self.turn, self.phase, self.winner, self.hash) = state
+        if history_length is None:
+            self.history = [self.hash]
+            self.position_counts = {self.hash: 1}
+        else:
+            while len(self.history) > history_length:
+                self._pop_history()
+        self._rescan_tigers()
+
+    # --- Compatibility Facade (UI / TigerBot) ---
 
     def get_valid_moves(self, r, c, check_turn=True):
         """
@@ -24,49 +498,31 @@ class BaghChal:
         if self.winner:
             return []
 
-        piece = self.board[r][c]
-        if piece == 0:
-            return[]
-        moves = []
+        sq = square(r, c)
+        bit = 1 << sq
+        is_goat = self.goats & bit
+        if not is_goat and not self.tigers & bit:
+            return []
 
-        # If it's Goat's turn but we are still in PLACEMENT phase, 
+        # If it's Goat's turn but we are still in PLACEMENT phase,
         # goats on board cannot move yet.
-        if piece == 1 and self.phase == 'PLACEMENT':
+        if is_goat and self.phase == 'PLACEMENT':
             return []
-        
+
         # If it's not the piece's turn, no moves.
         if check_turn:
-            if (piece == 1 and self.turn != 'G') or (piece == -1 and self.turn != 'T'):
+            if (is_goat and self.turn != 'G') or (not is_goat and self.turn != 'T'):
                 return []
 
-        # 1. Check adjacent moves (distance 1)
-        # Directions: Up, Down, Left, Right
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        
-        # Add Diagonals if the position allows it
-        # In Baghchal, diagonals are valid only on specific squares.
-        # Logic: If (r + c) is even, diagonals are available.
-        if (r + c) % 2 == 0:
-            directions += [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-
-        for dr, dc in directions:
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < 5 and 0 <= nc < 5:
-                if self.board[nr][nc] == 0:
-                    moves.append((nr, nc))
-
-        # 2. Check Tiger Jumps (Captures)
-        # Only Tigers (-1) can jump over Goats (1)
-        if piece == -1:
-            for dr, dc in directions:
-                # Mid point (potential goat)
-                mr, mc = r + dr, c + dc
-                # Landing point (must be empty)
-                lr, lc = r + 2*dr, c + 2*dc
-                
-                if 0 <= lr < 5 and 0 <= lc < 5:
-                    if self.board[mr][mc] == 1 and self.board[lr][lc] == 0:
-                        moves.append((lr, lc))
+        # 1. Adjacent moves: neighbours that are empty
+        empty = self.empty_mask()
+        moves = [SQUARE_COORDS[to] for to in iter_bits(ADJACENT[sq] & empty)]
+
+        # 2. Tiger Jumps (Captures): goat in between, empty landing point
+        if not is_goat:
+            for over, land in JUMPS[sq]:
+                if (self.goats >> over) & 1 and (empty >> land) & 1:
+                    moves.append(SQUARE_COORDS[land])
 
         return moves
 
@@ -81,37 +537,15 @@ class BaghChal:
             return False
 
         r1, c1 = start_pos
-        r2, c2 = end_pos
-        
-        if self.board[r1][c1] == 0:
+        if self.piece_at(r1, c1) == 0:
             return False
 
         # Validate move is in allowed list
         valid_moves = self.get_valid_moves(r1, c1)
-        if end_pos not in valid_moves:
+        if tuple(end_pos) not in valid_moves:
             return False
 
-        piece = self.board[r1][c1]
-        
-        # Execute Move
-        self.board[r1][c1] = 0
-        self.board[r2][c2] = piece
-        
-        # Handle Capture (Tiger Jump)
-        captured = False
-        if piece == -1:
-            # Check if distance is 2 (Jump)
-            if abs(r2 - r1) == 2 or abs(c2 - c1) == 2:
-                # Calculate mid point to remove goat
-                mr, mc = (r1 + r2) // 2, (c1 + c2) // 2
-                self.board[mr][mc] = 0 # Remove Goat
-                self.goats_captured += 1
-                captured = True
-        
-        # Switch Turn
-        self.switch_turn()
-        self.check_win_condition()
-        
+        self.apply((square(r1, c1), square(*end_pos)))
         return True
 
     def place_goat(self, r, c):
@@ -120,60 +554,45 @@ class BaghChal:
         """
         if self.winner:
             return False
-            
+
         if self.phase != 'PLACEMENT' or self.turn != 'G':
             return False
-        
-        if self.board[r][c] != 0:
+
+        if self.piece_at(r, c) != 0:
             return False # Occupied
-            
-        self.board[r][c] = 1 # Place Goat
-        self.goats_placed += 1
-        
-        if self.goats_placed == 20:
-            self.phase = 'MOVEMENT'
-            
-        self.switch_turn()
-        self.check_win_condition()
-        
+
+        self.apply((None, square(r, c)))
         return True
 
     def switch_turn(self):
         self.turn = 'T' if self.turn == 'G' else 'G'
+        self.hash ^= ZOBRIST_TIGER_TURN
 
     def check_win_condition(self):
         """
         Algorithm: State Analysis
         1. Tiger Win: Captured 5 goats.
         2. Goat Win: Tigers have NO valid moves (Stalemate for tigers).
+        3. Tiger Win: Goats to move in MOVEMENT have no valid step.
         """
         # Condition 1: Tiger Win
-        if self.goats_captured >= 5:
+        if self.goats_captured >= CAPTURES_TO_WIN:
             self.winner = 'T'
             return
 
-        # Condition 2: Goat Win (Trap Tigers)
-        # Check if ANY tiger has ANY valid move.
-        tiger_can_move = False
-        for r in range(5):
-            for c in range(5):
-                if self.board[r][c] == -1: # Found a tiger
-                    moves = self.get_valid_moves(r, c, check_turn=False)
-                    if len(moves) > 0:
-                        tiger_can_move = True
-                        break
-            if tiger_can_move:
-                break
-        
-        if not tiger_can_move:
+        # Condition 2: Goat Win (Trap Tigers), tracked incrementally
+        if self.tiger_move_total == 0:
             self.winner = 'G'
+            return
+
+        # Condition 3: Tiger Win (goats blocked); at most 5 empty points to check
+        if self.turn == 'G' and self.phase == 'MOVEMENT':
+            goats = self.goats
+            for sq in iter_bits(self.empty_mask()):
+                if ADJACENT[sq] & goats:
+                    return
+            self.winner = 'T'
 
     def get_valid_placements(self):
         """Helper for UI to highlight empty spots during placement phase"""
-        placements = []
-        for r in range(5):
-            for c in range(5):
-                if self.board[r][c] == 0:
-                    placements.append((r, c))
-        return placements
-
+        return [SQUARE_COORDS[sq] for sq in iter_bits(self.empty_mask())]
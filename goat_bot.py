@@ -0,0 +1,48 @@
+from search import SearchBot
+
+# Evaluation terms and their weights (batch_eval.py scores with the same ones)
+WEIGHTS = {
+    'capture': -1000, # per goat captured
+    'threat': -80,    # per goat that a tiger can jump right now
+    'trapped': 150,   # per tiger with no move
+    'mobility': -10,  # per tiger step or jump available
+    'safe': 5,        # per goat on the board that cannot be jumped
+}
+
+
+class GoatBot(SearchBot):
+    """Alpha-beta bot for the goats (see search.SearchBot for the options)."""
+
+    side = 'G'
+
+    def capture_value(self):
+        return -WEIGHTS['capture']
+
+    def evaluate(self, game):
+        """
+        Heuristic Evaluation Function.
+        Positive is good for Goat.
+        """
+        tiger_moves, trapped, vulnerable = game.tiger_mobility()
+        vulnerable_goats = bin(vulnerable).count('1')
+        safe_goats = bin(game.goats).count('1') - vulnerable_goats
+
+        weights = WEIGHTS
+        score = 0
+
+        # 1. Captures lost (Most Important)
+        score += game.goats_captured * weights['capture']
+
+        # 2. Goats that a tiger can jump next turn
+        score += vulnerable_goats * weights['threat']
+
+        # 3. Tigers with no move at all: trapping all four wins the game
+        score += trapped * weights['trapped']
+
+        # 4. Restrict the tigers' remaining mobility
+        score += tiger_moves * weights['mobility']
+
+        # 5. Goats standing safely on the board
+        score += safe_goats * weights['safe']
+
+        return score
@@ -0,0 +1,142 @@
+"""
+Load test for analysis_server.py, entirely against localhost.
+
+Sends `--requests` /analyze requests over `--concurrency` keep-alive
+connections. Positions are drawn from `--distinct` random positions, so
+repeats exercise the server's cache and request coalescing. Reports
+latency percentiles, throughput and the server's cache counters.
+
+Usage:
+    python load_test.py --spawn --workers 4 --requests 500 --concurrency 16
+    python load_test.py --port 8765            # against a running server
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+from analysis_server import DEFAULT_PORT
+from benchmark import random_positions
+from position import Position
+
+
+async def request(reader, writer, method, path, payload=None):
+    """One HTTP/1.1 request on an open keep-alive connection; returns (status, JSON body)."""
+    body = json.dumps(payload).encode() if payload is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+                 .encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(host, port, jobs, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while jobs:
+            payload = jobs.pop()
+            start = time.perf_counter()
+            status, body = await request(reader, writer, 'POST', '/analyze', payload)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if status != 200:
+                errors.append(body.get('error', status))
+    finally:
+        writer.close()
+
+
+async def run(host, port, total, concurrency, distinct, depth, seed):
+    rng = random.Random(seed)
+    positions = [Position.from_game(game).to_bytes().hex()
+                 for game in random_positions(distinct, seed) if not game.winner]
+    jobs = [{'position': rng.choice(positions), 'depth': depth} for _ in range(total)]
+    latencies, errors = [], []
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, jobs, latencies, errors)
+                           for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    _, health = await request(reader, writer, 'GET', '/health')
+    writer.close()
+    return latencies, errors, elapsed, health
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def wait_for_server(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the analysis server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--distinct', type=int, default=100, help="distinct positions to draw from")
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--spawn', action='store_true', help="start a server for the test")
+    parser.add_argument('--workers', type=int, default=None, help="server workers with --spawn")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'analysis_server.py')
+        command = [sys.executable, script, '--host', args.host,
+                   '--port', str(args.port)]
+        if args.workers:
+            command += ['--workers', str(args.workers)]
+        server = subprocess.Popen(command)
+    try:
+        asyncio.run(wait_for_server(args.host, args.port))
+        latencies, errors, elapsed, health = asyncio.run(
+            run(args.host, args.port, args.requests, args.concurrency, args.distinct,
+                args.depth, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(f"Requests: {len(latencies)} in {elapsed:.2f}s ({len(latencies) / elapsed:.1f}/s), "
+          f"{len(errors)} errors")
+    print(f"Latency ms: p50 {percentile(latencies, 0.50):.1f}  p90 {percentile(latencies, 0.90):.1f}"
+          f"  p99 {percentile(latencies, 0.99):.1f}  max {max(latencies):.1f}"
+          f"  mean {statistics.mean(latencies):.1f}")
+    cache = health['cache']
+    print(f"Server cache: {cache['hits']} hits, {cache['misses']} misses, "
+          f"{health['deduplicated']} coalesced, {cache['size']} entries")
+    if errors:
+        print(f"First error: {errors[0]}", file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,14 @@
+import argparse
+import copy
+import os
 import pygame
 import sys
-from game_logic import BaghChal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from archive import GameArchive
+from game_logic import DRAW, BaghChal, square
 from tiger_bot import TigerBot
+from goat_bot import GoatBot
 
 # --- Constants ---
 SCREEN_WIDTH = 600
@@ -10,6 +17,13 @@ BOARD_SIZE = 500
 MARGIN = 50
 GRID_SIZE = 5
 CELL_SIZE = BOARD_SIZE // (GRID_SIZE - 1)
+AI_TIME_LIMIT_MS = 1000 # Per-move thinking budget for the bot
+AI_MIN_DELAY_MS = 500   # Minimum time before the bot's move is shown (UX)
+# Data files live next to this module, not in the working directory
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+TABLEBASE_PATH = os.path.join(DATA_DIR, 'baghchal.tb') # From tablebase.py build; used if present
+BOOK_PATH = os.path.join(DATA_DIR, 'opening.book')     # From opening_book.py build; used if present
+ARCHIVE_PATH = os.path.join(DATA_DIR, 'games.bca')     # Default for --archive (see archive.py)
 
 # Colors
 WHITE = (255, 255, 255)
@@ -21,7 +35,7 @@ CREAM = (255, 253, 208)   # Background
 GRAY = (200, 200, 200)
 
 class BaghChalUI:
-    def __init__(self):
+    def __init__(self, archive_path=None):
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Baghchal - Tiger and Goat Game")
@@ -30,87 +44,219 @@ class BaghChalUI:
         self.title_font = pygame.font.SysFont('Arial', 40, bold=True)
         
         self.game = BaghChal()
-        self.bot = TigerBot(depth=3)
+        self.moves = [] # (from_sq or None, to_sq) moves of the current game, for the archive
+        self.archive_path = archive_path # Finished games are appended here; None keeps no record
+        tablebase = TABLEBASE_PATH if os.path.exists(TABLEBASE_PATH) else None
+        book = BOOK_PATH if os.path.exists(BOOK_PATH) else None
+        self.tiger_bot = TigerBot(depth=3, time_limit_ms=AI_TIME_LIMIT_MS, tablebase=tablebase,
+                                  book=book)
+        self.goat_bot = GoatBot(depth=3, time_limit_ms=AI_TIME_LIMIT_MS, tablebase=tablebase,
+                                book=book)
+        self.bot = None # Bot for the current game, if any
+        self.ai_side = None # 'T' or 'G': the side the bot plays
         
         # UI State
         self.state = 'MENU' # 'MENU' or 'GAME'
-        self.game_mode = None # 'PvP' or 'PvAI'
+        self.game_mode = None # 'PvP', 'PvAI' (bot tigers) or 'PvAI-Goat' (bot goats)
         
         self.selected_pos = None # (r, c) of selected piece
         self.valid_moves_cache = [] # List of valid moves for selected piece
 
+        # Background AI search: runs on a snapshot in a worker thread
+        self.ai_executor = ThreadPoolExecutor(max_workers=1)
+        self.ai_future = None
+        self.ai_stop = None # threading.Event that cancels the running search
+        self.ai_started = 0 # pygame ticks when the search was submitted
+        # Pondering: the bot searches the human's likely replies meanwhile
+        self.ponder_future = None
+        self.ponder_stop = None
+
         # Menu Buttons
         self.btn_pvp = pygame.Rect(150, 250, 300, 60)
         self.btn_pvai = pygame.Rect(150, 350, 300, 60)
+        self.btn_pvai_goat = pygame.Rect(150, 450, 300, 60)
+
+        # Rendering caches: only what changed since the last frame is redrawn
+        self.board_surface = self.build_board_surface() # Background + lines, drawn once
+        self.text_cache = {} # (font, text, color) -> rendered surface
+        self.full_redraw = True # Repaint the whole window on the next frame
+        self.drawn_points = {} # (r, c) -> (piece, selected, move target) on screen
+        self.drawn_lines = {} # Info line slot -> (text, color, rect) on screen
+
+    def bot_is_busy(self):
+        """True while the bot is to move, i.e. a search is pending or running."""
+        return self.state == 'GAME' and self.ai_side == self.game.turn and not self.game.winner
 
     def run(self):
         running = True
         while running:
             # 1. Event Handling
-            for event in pygame.event.get():
+            # Nothing can change without input unless the bot is thinking,
+            # so the loop sleeps in event.wait() instead of polling at 30 FPS.
+            events = pygame.event.get()
+            if not events and not self.bot_is_busy():
+                events = [pygame.event.wait()]
+            for event in events:
                 if event.type == pygame.QUIT:
                     running = False
+                elif event.type == pygame.VIDEOEXPOSE: # Window contents were lost
+                    self.full_redraw = True
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     if self.state == 'MENU':
                         self.handle_menu_click(event.pos)
                     elif self.state == 'GAME':
-                        # Only handle clicks if it's NOT the AI's turn (in PvAI mode)
-                        if self.game_mode == 'PvAI' and self.game.turn == 'T':
+                        # Only handle clicks if it's NOT the AI's turn (in PvAI modes)
+                        if self.ai_side == self.game.turn:
                             pass
                         else:
                             self.handle_click(event.pos)
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_r and self.state == 'GAME': # Reset
-                        self.game = BaghChal()
+                        self.cancel_ai_search()
+                        self.new_game()
                         self.selected_pos = None
                         self.valid_moves_cache = []
                     elif event.key == pygame.K_m: # Return to Menu
+                        self.cancel_ai_search()
                         self.state = 'MENU'
-                        self.game = BaghChal()
+                        self.new_game()
+                        self.full_redraw = True
 
             # 2. Game Logic
             if self.state == 'GAME':
                 # AI Turn Logic
-                if self.game_mode == 'PvAI' and self.game.turn == 'T' and not self.game.winner:
-                    # Small delay for better UX
-                    pygame.time.wait(500)
-                    
-                    # Get AI Move
-                    move = self.bot.get_best_move(self.game)
-                    if move:
-                        start, end = move
-                        self.game.make_move(start, end)
-                        print(f"Tiger AI moved from {start} to {end}")
+                if self.ai_side == self.game.turn and not self.game.winner:
+                    if self.ai_future is None:
+                        self.start_ai_search()
+                    elif self.ai_future.done() and \
+                            pygame.time.get_ticks() - self.ai_started >= AI_MIN_DELAY_MS:
+                        self.finish_ai_search()
+
+                # Human's turn against the bot: think on their time
+                if self.ai_side and self.ai_side != self.game.turn and not self.game.winner \
+                        and self.ponder_future is None:
+                    self.start_pondering()
 
                 self.draw()
             
             elif self.state == 'MENU':
                 self.draw_menu()
-            
-            # 3. Update Display
-            pygame.display.flip()
-            self.clock.tick(30) # 30 FPS
 
+            # 3. While the bot thinks, poll at 30 FPS for its result
+            if self.bot_is_busy():
+                self.clock.tick(30)
+
+        self.cancel_ai_search()
+        self.ai_executor.shutdown(wait=True)
         pygame.quit()
         sys.exit()
 
+    def start_pondering(self):
+        """Lets the bot search the human's likely replies on a copy of the game."""
+        snapshot = copy.deepcopy(self.game)
+        self.ponder_stop = threading.Event()
+        self.ponder_future = self.ai_executor.submit(self.bot.ponder, snapshot, self.ponder_stop)
+
+    def stop_pondering(self):
+        """
+        Ends pondering. The executor has one thread, so a search submitted
+        afterwards only starts once the ponder call has returned.
+        """
+        if self.ponder_stop:
+            self.ponder_stop.set()
+        self.ponder_future = None
+        self.ponder_stop = None
+
+    def start_ai_search(self):
+        """Submits the bot search on a copy of the game so the UI keeps drawing."""
+        self.stop_pondering() # A ponder hit makes this search return at once
+        snapshot = copy.deepcopy(self.game)
+        self.ai_stop = threading.Event()
+        self.ai_started = pygame.time.get_ticks()
+        self.ai_future = self.ai_executor.submit(self.bot.get_best_move, snapshot,
+                                                 stop_event=self.ai_stop)
+
+    def finish_ai_search(self):
+        """Applies the resolved search result to the live game."""
+        move = self.ai_future.result()
+        self.ai_future = None
+        self.ai_stop = None
+        if move:
+            start, end = move
+            if start is None:
+                self.game.place_goat(*end)
+                print(f"Goat AI placed at {end} ({self.bot.stats})")
+            else:
+                self.game.make_move(start, end)
+                name = 'Tiger' if self.ai_side == 'T' else 'Goat'
+                print(f"{name} AI moved from {start} to {end} ({self.bot.stats})")
+            self.record_move(start, end)
+
+    def new_game(self):
+        """Fresh board, with an empty move record."""
+        self.game = BaghChal()
+        self.moves = []
+
+    def record_move(self, start, end):
+        """Notes a move played on the board; a game that just ended goes to the archive, if any."""
+        self.moves.append((None if start is None else square(*start), square(*end)))
+        if self.game.winner and self.archive_path:
+            with GameArchive(self.archive_path, 'a') as archive:
+                archive.append(self.moves, self.game.winner, {'mode': self.game_mode})
+            print(f"Game saved to {self.archive_path}", file=sys.stderr)
+
+    def cancel_ai_search(self):
+        """Stops a running search or ponder and drops its result (Reset / Menu / Quit)."""
+        self.stop_pondering()
+        if self.ai_stop:
+            self.ai_stop.set()
+        self.ai_future = None
+        self.ai_stop = None
+
     def handle_menu_click(self, pos):
+        self.cancel_ai_search()
         if self.btn_pvp.collidepoint(pos):
             self.state = 'GAME'
             self.game_mode = 'PvP'
-            self.game = BaghChal() # Reset game
+            self.bot, self.ai_side = None, None
+            self.new_game()
+            self.full_redraw = True
             print("Starting PvP Game")
         elif self.btn_pvai.collidepoint(pos):
             self.state = 'GAME'
             self.game_mode = 'PvAI'
-            self.game = BaghChal() # Reset game
+            self.bot, self.ai_side = self.tiger_bot, 'T'
+            self.new_game()
+            self.full_redraw = True
             print("Starting PvAI Game")
+        elif self.btn_pvai_goat.collidepoint(pos):
+            self.state = 'GAME'
+            self.game_mode = 'PvAI-Goat'
+            self.bot, self.ai_side = self.goat_bot, 'G'
+            self.new_game()
+            self.full_redraw = True
+            print("Starting PvAI (Goat) Game")
+
+    def render_text(self, text, color, font=None):
+        """font.render with a cache: a string is rendered again only when it changes."""
+        font = font or self.font
+        key = (id(font), text, color)
+        surface = self.text_cache.get(key)
+        if surface is None:
+            if len(self.text_cache) > 256: # Counters and dots produce few distinct strings
+                self.text_cache.clear()
+            surface = self.text_cache[key] = font.render(text, True, color)
+        return surface
 
     def draw_menu(self):
+        """The menu is static: it is drawn once when shown and then left alone."""
+        if not self.full_redraw:
+            return
+        self.full_redraw = False
         self.screen.fill(CREAM)
         
         # Title
-        title = self.title_font.render("Bagh Chal", True, BLACK)
+        title = self.render_text("Bagh Chal", BLACK, self.title_font)
         title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, 150))
         self.screen.blit(title, title_rect)
         
@@ -119,16 +265,22 @@ class BaghChalUI:
         pygame.draw.rect(self.screen, RED, self.btn_pvai, border_radius=10)
         pygame.draw.rect(self.screen, BLACK, self.btn_pvp, 2, border_radius=10)
         pygame.draw.rect(self.screen, BLACK, self.btn_pvai, 2, border_radius=10)
+        pygame.draw.rect(self.screen, BLUE, self.btn_pvai_goat, border_radius=10)
+        pygame.draw.rect(self.screen, BLACK, self.btn_pvai_goat, 2, border_radius=10)
         
         # Button Text
-        t1 = self.font.render("Player vs Player", True, WHITE)
-        t2 = self.font.render("Player vs Bot (Tiger)", True, WHITE)
+        t1 = self.render_text("Player vs Player", WHITE)
+        t2 = self.render_text("Player vs Bot (Tiger)", WHITE)
+        t3 = self.render_text("Player vs Bot (Goat)", WHITE)
         
         r1 = t1.get_rect(center=self.btn_pvp.center)
         r2 = t2.get_rect(center=self.btn_pvai.center)
+        r3 = t3.get_rect(center=self.btn_pvai_goat.center)
         
         self.screen.blit(t1, r1)
         self.screen.blit(t2, r2)
+        self.screen.blit(t3, r3)
+        pygame.display.flip()
 
     def handle_click(self, pos):
         """
@@ -163,6 +315,7 @@ class BaghChalUI:
             # Try to place goat at clicked position
             if self.game.place_goat(r, c):
                 print(f"Goat placed at {r}, {c}")
+                self.record_move(None, clicked_pos)
                 # Check for instant win/loss logic updates if any
             return
 
@@ -186,6 +339,7 @@ class BaghChalUI:
                 success = self.game.make_move(self.selected_pos, clicked_pos)
                 if success:
                     print(f"Moved from {self.selected_pos} to {clicked_pos}")
+                    self.record_move(self.selected_pos, clicked_pos)
                     # Reset selection after move
                     self.selected_pos = None
                     self.valid_moves_cache = []
@@ -195,60 +349,102 @@ class BaghChalUI:
                 self.selected_pos = None
                 self.valid_moves_cache = []
 
-    def draw(self):
-        self.screen.fill(CREAM)
-        
+    def build_board_surface(self):
+        """Pre-renders the background and board lines once; frames copy from it."""
+        surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        surface.fill(CREAM)
+
         # 1. Draw Grid Lines
         # Horizontal & Vertical
         for i in range(5):
             start = MARGIN + i * CELL_SIZE
             # Vertical
-            pygame.draw.line(self.screen, BLACK, (start, MARGIN), (start, MARGIN + BOARD_SIZE), 2)
+            pygame.draw.line(surface, BLACK, (start, MARGIN), (start, MARGIN + BOARD_SIZE), 2)
             # Horizontal
-            pygame.draw.line(self.screen, BLACK, (MARGIN, start), (MARGIN + BOARD_SIZE, start), 2)
-            
+            pygame.draw.line(surface, BLACK, (MARGIN, start), (MARGIN + BOARD_SIZE, start), 2)
+
         # Diagonals
         # Main diagonals
-        pygame.draw.line(self.screen, BLACK, (MARGIN, MARGIN), (MARGIN + BOARD_SIZE, MARGIN + BOARD_SIZE), 2)
-        pygame.draw.line(self.screen, BLACK, (MARGIN + BOARD_SIZE, MARGIN), (MARGIN, MARGIN + BOARD_SIZE), 2)
-        
+        pygame.draw.line(surface, BLACK, (MARGIN, MARGIN), (MARGIN + BOARD_SIZE, MARGIN + BOARD_SIZE), 2)
+        pygame.draw.line(surface, BLACK, (MARGIN + BOARD_SIZE, MARGIN), (MARGIN, MARGIN + BOARD_SIZE), 2)
+
         # Diamond (rotated square)
         mid = MARGIN + BOARD_SIZE // 2
-        pygame.draw.line(self.screen, BLACK, (mid, MARGIN), (MARGIN + BOARD_SIZE, mid), 2)
-        pygame.draw.line(self.screen, BLACK, (MARGIN + BOARD_SIZE, mid), (mid, MARGIN + BOARD_SIZE), 2)
-        pygame.draw.line(self.screen, BLACK, (mid, MARGIN + BOARD_SIZE), (MARGIN, mid), 2)
-        pygame.draw.line(self.screen, BLACK, (MARGIN, mid), (mid, MARGIN), 2)
+        pygame.draw.line(surface, BLACK, (mid, MARGIN), (MARGIN + BOARD_SIZE, mid), 2)
+        pygame.draw.line(surface, BLACK, (MARGIN + BOARD_SIZE, mid), (mid, MARGIN + BOARD_SIZE), 2)
+        pygame.draw.line(surface, BLACK, (mid, MARGIN + BOARD_SIZE), (MARGIN, mid), 2)
+        pygame.draw.line(surface, BLACK, (MARGIN, mid), (mid, MARGIN), 2)
+        return surface
 
-        # 2. Draw Connections / Highlights
-        if self.selected_pos:
-            sr, sc = self.selected_pos
-            sx = MARGIN + sc * CELL_SIZE
-            sy = MARGIN + sr * CELL_SIZE
-            pygame.draw.circle(self.screen, BLUE, (sx, sy), 25, 4) # Selection Ring
-            
-            # Draw Valid Moves
-            for (mr, mc) in self.valid_moves_cache:
-                mx = MARGIN + mc * CELL_SIZE
-                my = MARGIN + mr * CELL_SIZE
-                pygame.draw.circle(self.screen, BLUE, (mx, my), 10) # Small dot for valid move
-
-        # 3. Draw Pieces
-        for r in range(5):
-            for c in range(5):
-                piece = self.game.board[r][c]
-                x = MARGIN + c * CELL_SIZE
-                y = MARGIN + r * CELL_SIZE
-                
-                if piece == 1: # Goat
-                    pygame.draw.circle(self.screen, GREEN, (x, y), 20)
-                elif piece == -1: # Tiger
-                    pygame.draw.circle(self.screen, RED, (x, y), 22)
-                    pygame.draw.circle(self.screen, BLACK, (x, y), 22, 2) # Border
-
-        # 4. Draw UI / Info
-        self.draw_info()
-
-    def draw_info(self):
+    def draw(self):
+        """
+        Algorithm: Dirty Rectangles
+        Every board point and info line remembers what was last drawn. The
+        rects of items that changed (old and new extent) are restored from
+        the cached board surface, then everything overlapping each rect is
+        drawn again, clipped to it, in the usual order (points, then text).
+        Only those rects are sent to display.update().
+        """
+        points = {(r, c): (self.game.piece_at(r, c), self.selected_pos == (r, c),
+                           (r, c) in self.valid_moves_cache)
+                  for r in range(5) for c in range(5)}
+        lines = {slot: (text, color, self.render_text(text, color).get_rect(topleft=pos))
+                 for slot, (text, color, pos) in self.info_lines().items() if text}
+
+        if self.full_redraw:
+            dirty = [self.screen.get_rect()]
+        else:
+            dirty = [self.point_rect(*point) for point, content in points.items()
+                     if self.drawn_points.get(point) != content]
+            for slot in set(lines) | set(self.drawn_lines):
+                old, new = self.drawn_lines.get(slot), lines.get(slot)
+                if old != new:
+                    dirty.extend(line[2] for line in (old, new) if line)
+        if not dirty:
+            return
+
+        for rect in dirty:
+            self.screen.set_clip(rect)
+            self.screen.blit(self.board_surface, rect, rect)
+            for (r, c), content in points.items():
+                if self.point_rect(r, c).colliderect(rect):
+                    self.draw_point(r, c, *content)
+            for text, color, text_rect in lines.values():
+                if text_rect.colliderect(rect):
+                    self.screen.blit(self.render_text(text, color), text_rect)
+        self.screen.set_clip(None)
+        self.drawn_points = points
+        self.drawn_lines = lines
+
+        if self.full_redraw:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
+        self.full_redraw = False
+
+    def point_rect(self, r, c):
+        """Screen area a board point's piece or highlight can cover (ring radius 25)."""
+        return pygame.Rect(MARGIN + c * CELL_SIZE - 28, MARGIN + r * CELL_SIZE - 28, 56, 56)
+
+    def draw_point(self, r, c, piece, selected, target):
+        x = MARGIN + c * CELL_SIZE
+        y = MARGIN + r * CELL_SIZE
+
+        # Connections / Highlights
+        if selected:
+            pygame.draw.circle(self.screen, BLUE, (x, y), 25, 4) # Selection Ring
+        if target:
+            pygame.draw.circle(self.screen, BLUE, (x, y), 10) # Small dot for valid move
+
+        # Pieces
+        if piece == 1: # Goat
+            pygame.draw.circle(self.screen, GREEN, (x, y), 20)
+        elif piece == -1: # Tiger
+            pygame.draw.circle(self.screen, RED, (x, y), 22)
+            pygame.draw.circle(self.screen, BLACK, (x, y), 22, 2) # Border
+
+    def info_lines(self):
+        """Text shown below the board: slot -> (text, color, top-left); '' hides a slot."""
         # Stats area below board
         y_offset = MARGIN + BOARD_SIZE + 20
         
@@ -258,25 +454,35 @@ class BaghChalUI:
         mode_text = f"Mode: {self.game_mode}"
         
         color = BLACK
-        if self.game.winner:
+        if self.game.winner == DRAW:
+            turn_text = "GAME OVER! Draw by repetition"
+        elif self.game.winner:
             turn_text = f"GAME OVER! Winner: {'Goat' if self.game.winner == 'G' else 'Tiger'}"
             color = RED if self.game.winner == 'T' else GREEN
 
-        t1 = self.font.render(turn_text, True, color)
-        t2 = self.font.render(phase_text, True, BLACK)
-        t3 = self.font.render(goats_info, True, BLACK)
-        t4 = self.font.render(mode_text, True, BLUE)
-        
-        self.screen.blit(t1, (MARGIN, y_offset))
-        self.screen.blit(t2, (MARGIN, y_offset + 30))
-        self.screen.blit(t3, (MARGIN, y_offset + 60))
-        self.screen.blit(t4, (MARGIN + 300, y_offset + 60)) # Mode on right
+        thinking_text = ''
+        if self.ai_future:
+            dots = '.' * (1 + pygame.time.get_ticks() // 400 % 3)
+            name = 'Tiger' if self.ai_side == 'T' else 'Goat'
+            thinking_text = f"{name} is thinking{dots}"
 
-        if self.game.winner:
-            restart_text = self.font.render("Press 'R' to Restart | 'M' for Menu", True, BLUE)
-            self.screen.blit(restart_text, (MARGIN, y_offset + 90))
+        restart_text = "Press 'R' to Restart | 'M' for Menu" if self.game.winner else ''
+
+        # Drawn in this order, so later lines stay on top where they overlap
+        return {
+            'turn': (turn_text, color, (MARGIN, y_offset)),
+            'phase': (phase_text, BLACK, (MARGIN, y_offset + 30)),
+            'goats': (goats_info, BLACK, (MARGIN, y_offset + 60)),
+            'mode': (mode_text, BLUE, (MARGIN + 300, y_offset + 60)), # Mode on right
+            'thinking': (thinking_text, RED, (MARGIN + 300, y_offset + 30)),
+            'restart': (restart_text, BLUE, (MARGIN, y_offset + 90)),
+        }
 
 if __name__ == "__main__":
-    app = BaghChalUI()
+    parser = argparse.ArgumentParser(description="Bagh-Chal (Tiger and Goats)")
+    parser.add_argument('--archive', nargs='?', const=ARCHIVE_PATH, default=None, metavar='PATH',
+                        help=f"append finished games to PATH (default {ARCHIVE_PATH})")
+    args = parser.parse_args()
+    app = BaghChalUI(args.archive)
     app.run()
 
@@ -0,0 +1,324 @@
+"""
+Monte Carlo Tree Search agent (UCT) for either side.
+
+MCTSBot needs no evaluation function: positions are judged by the results
+of fast playouts to the end of the game. The tree is kept between moves,
+so the simulations spent on the reply that was actually played are reused.
+
+Playouts run on bare bitboards (see `playout`) rather than on BaghChal, and
+are sent out in batches. With workers > 1, each batch is split over a
+process pool. Leaves are chosen with a virtual loss, so one batch spreads
+over different lines.
+
+    bot = MCTSBot(simulations=4000)          # or time_limit_ms=1000
+    move = bot.get_best_move(game)           # same interface as TigerBot
+"""
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from game_logic import (ADJACENT, CAPTURES_TO_WIN, DRAW, FULL_MASK, JUMPS, NUM_POINTS,
+                        SQUARE_COORDS, TOTAL_GOATS, iter_bits)
+from position import Position
+from search import SearchStats
+
+DEFAULT_SIMULATIONS = 2000
+DEFAULT_BATCH = 32 # Leaves selected before their playouts are run
+DEFAULT_EXPLORATION = 1.4
+PLAYOUT_LIMIT = 200 # Playouts still running after this many plies count as draws
+SCORE_SCALE = 1000 # stats.score: mean result for the side to move, -1000..1000
+
+
+# JUMP_BITS[sq] -> (over bit, landing bit) of every jump from sq
+JUMP_BITS = [tuple((1 << over, 1 << land) for over, land in JUMPS[sq]) for sq in range(NUM_POINTS)]
+
+
+def playout(goats, tigers, placed, captured, turn, rng, limit=PLAYOUT_LIMIT):
+    """
+    Algorithm: Lightly Guided Random Playout
+    Plays the position out on plain integers with the precomputed board
+    tables, without hashing or incremental bookkeeping:
+    - tigers always jump when they can (a random jump);
+    - goats play a random move among those that leave no goat to be
+      jumped, or any random move if none does;
+    - otherwise moves are uniformly random.
+    Purely random goats lose nearly every playout, which tells the tree
+    nothing; the safety test is what makes results informative.
+    Returns 'T', 'G' or None (draw after `limit` plies).
+    """
+    for _ in range(limit):
+        empty = FULL_MASK ^ (goats | tigers)
+        if turn == 'T':
+            steps = []
+            jumps = []
+            for sq in iter_bits(tigers):
+                for to in iter_bits(ADJACENT[sq] & empty):
+                    steps.append((sq, to, -1))
+                for over, land in JUMPS[sq]:
+                    if (goats >> over) & 1 and (empty >> land) & 1:
+                        jumps.append((sq, land, over))
+            if not steps and not jumps: # Trapped
+                return 'G'
+            frm, to, over = rng.choice(jumps or steps)
+            tigers ^= (1 << frm) | (1 << to)
+            if over >= 0:
+                goats ^= 1 << over
+                captured += 1
+                if captured >= CAPTURES_TO_WIN:
+                    return 'T'
+            turn = 'G'
+        else:
+            if placed < TOTAL_GOATS:
+                moves = [1 << to for to in iter_bits(empty)]
+                placed += 1
+            else:
+                moves = [(1 << sq) | (1 << to)
+                         for sq in iter_bits(goats) for to in iter_bits(ADJACENT[sq] & empty)]
+                if not moves: # Goats unable to move lose, as in the search
+                    return 'T'
+            # Jumps the tigers could make, checked against each candidate
+            jumps = [pair for sq in iter_bits(tigers) for pair in JUMP_BITS[sq]]
+            rng.shuffle(moves)
+            for move in moves:
+                after = goats ^ move
+                occupied = after | tigers
+                for over, land in jumps:
+                    if after & over and not occupied & land:
+                        break
+                else: # No goat left hanging
+                    goats = after
+                    break
+            else:
+                goats ^= moves[0]
+            turn = 'T'
+    return None
+
+
+def run_playouts(packed_positions, seed):
+    """Plays out each packed Position once; returns the winners (pool task)."""
+    rng = random.Random(seed)
+    results = []
+    for packed in packed_positions:
+        position = Position.from_packed(packed)
+        results.append(playout(position.goats, position.tigers, position.goats_placed,
+                               position.goats_captured, position.turn, rng))
+    return results
+
+
+class Node:
+    """One position in the tree; `wins` are counted for the side that moved into it."""
+    __slots__ = ('move', 'parent', 'children', 'untried', 'visits', 'wins', 'mover', 'packed')
+
+    def __init__(self, game, move=None, parent=None):
+        self.move = move          # (from_sq, to_sq) that led here
+        self.parent = parent
+        self.children = []
+        self.untried = game.legal_moves()
+        self.visits = 0
+        self.wins = 0.0
+        self.mover = 'G' if game.turn == 'T' else 'T'
+        self.packed = Position.from_game(game).packed
+
+    def select_child(self, exploration):
+        """UCT: mean result plus an exploration bonus for rarely visited children."""
+        log_visits = math.log(self.visits)
+        best, best_value = None, -math.inf
+        for child in self.children:
+            value = child.wins / child.visits + exploration * math.sqrt(log_visits / child.visits)
+            if value > best_value:
+                best, best_value = child, value
+        return best
+
+
+class MCTSBot:
+    """
+    UCT search for the side to move (tigers or goats).
+
+    simulations: playouts per move when no time limit is given
+    time_limit_ms: per-move budget; overrides `simulations`
+    batch_size: leaves whose playouts are run together
+    workers: > 1 runs each batch in a process pool
+    reuse_tree: keep the subtree of the position that was actually reached
+    """
+
+    def __init__(self, simulations=DEFAULT_SIMULATIONS, time_limit_ms=None,
+                 exploration=DEFAULT_EXPLORATION, batch_size=DEFAULT_BATCH, workers=1, seed=None,
+                 reuse_tree=True):
+        self.simulations = simulations
+        self.time_limit_ms = time_limit_ms
+        self.exploration = exploration
+        self.batch_size = batch_size
+        self.workers = workers
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.reuse_tree = reuse_tree
+        self.root = None
+        self.nodes = 0 # Playouts run by the last get_best_move
+        self.stats = SearchStats()
+        self.reused = 0 # Visits inherited from the previous move's tree
+        self._pool = None
+
+    def get_best_move(self, game, time_limit_ms=None, stop_event=None):
+        """
+        Returns the move with the most visits as (start_pos, end_pos), with
+        start_pos None for a goat placement, or None if there is no move.
+
+        Algorithm: UCT with Batched Playouts
+        1. Select: walk down by UCT, adding a virtual visit to each node, so
+           the next selection of the same batch prefers other lines.
+        2. Expand: add one untried move at the leaf.
+        3. Simulate: run the batch of leaf playouts (in the pool if any).
+        4. Backpropagate: credit every node on each path with its result.
+        """
+        self.stats = stats = SearchStats()
+        stats.source = 'mcts'
+        start_time = time.perf_counter()
+        if game.winner or not game.legal_moves():
+            return None
+
+        # Playout statistics can tie a winning move with a merely good one
+        for move in game.legal_moves():
+            token = game.apply(move)
+            won = game.winner is not None and game.winner != DRAW
+            game.undo(token)
+            if won:
+                stats.pv = [move]
+                stats.score = SCORE_SCALE
+                stats.elapsed_ms = (time.perf_counter() - start_time) * 1000
+                frm, to = move
+                stats.best_move = (None if frm is None else SQUARE_COORDS[frm], SQUARE_COORDS[to])
+                return stats.best_move
+
+        if time_limit_ms is None:
+            time_limit_ms = self.time_limit_ms
+        deadline = start_time + time_limit_ms / 1000 if time_limit_ms else None
+        root = self._find_root(game)
+        self.reused = root.visits
+        self.nodes = 0
+
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                break
+            if deadline is not None:
+                if time.perf_counter() >= deadline and root.children:
+                    break
+            elif self.nodes >= self.simulations:
+                break
+            count = self.batch_size if deadline else min(self.batch_size,
+                                                        self.simulations - self.nodes)
+            self._run_batch(game, root, count)
+
+        self.root = root
+        stats.nodes = self.nodes
+        stats.elapsed_ms = (time.perf_counter() - start_time) * 1000
+        if not root.children:
+            return None
+        best = max(root.children, key=lambda child: child.visits)
+        stats.score = round((2 * best.wins / best.visits - 1) * SCORE_SCALE)
+        stats.pv = self._principal_variation(best)
+        stats.depth = len(stats.pv)
+        frm, to = best.move
+        stats.best_move = (None if frm is None else SQUARE_COORDS[frm], SQUARE_COORDS[to])
+        return stats.best_move
+
+    def ponder(self, game, stop_event):
+        """
+        Grows the tree from `game` (opponent to move) until `stop_event` is
+        set. The reply actually played is then found in the tree by
+        get_best_move, with all the visits gathered here.
+        Returns the number of playouts run.
+        """
+        root = self._find_root(game)
+        self.root = root
+        playouts = 0
+        if game.winner or not game.legal_moves():
+            return playouts
+        while not stop_event.is_set():
+            self.nodes = 0
+            self._run_batch(game, root, self.batch_size)
+            playouts += self.nodes
+        return playouts
+
+    def _find_root(self, game):
+        """
+        Algorithm: Tree Reuse
+        The new position is usually a grandchild of the last root (our move,
+        then the opponent's reply), or a child when the same bot plays both
+        sides. A matching subtree becomes the new root; otherwise a fresh
+        tree is started.
+        """
+        packed = Position.from_game(game).packed
+        if self.reuse_tree and self.root is not None:
+            frontier = [self.root]
+            for _ in range(3): # Root, children, grandchildren
+                for node in frontier:
+                    if node.packed == packed:
+                        node.parent = None # Let the rest of the old tree go
+                        node.move = None
+                        return node
+                frontier = [child for node in frontier for child in node.children]
+        return Node(game)
+
+    def _run_batch(self, game, root, count):
+        leaves = [] # (path, packed leaf position or None, known winner)
+        for _ in range(count):
+            node = root
+            path = [node]
+            tokens = []
+            node.visits += 1 # Virtual visit, made real by backpropagation
+            while not node.untried and node.children:
+                node = node.select_child(self.exploration)
+                tokens.append(game.apply(node.move))
+                node.visits += 1
+                path.append(node)
+            if node.untried and not game.winner:
+                move = node.untried.pop(self.rng.randrange(len(node.untried)))
+                tokens.append(game.apply(move))
+                child = Node(game, move, node)
+                node.children.append(child)
+                child.visits += 1
+                path.append(child)
+            if game.winner: # A draw by repetition counts like a drawn playout
+                leaves.append((path, None, None if game.winner == DRAW else game.winner))
+            else:
+                leaves.append((path, Position.from_game(game).packed, None))
+            while tokens:
+                game.undo(tokens.pop())
+
+        pending = [packed for _, packed, _ in leaves if packed is not None]
+        winners = iter(self._playouts(pending))
+        for path, packed, winner in leaves:
+            if packed is not None:
+                winner = next(winners)
+            for node in path:
+                if winner is None:
+                    node.wins += 0.5
+                elif winner == node.mover:
+                    node.wins += 1
+        self.nodes += len(leaves)
+
+    def _playouts(self, packed_positions):
+        """Winners of the given playouts, in order; split across the pool if there is one."""
+        if self.workers <= 1 or len(packed_positions) < 2 * self.workers:
+            return run_playouts(packed_positions, self.rng.getrandbits(32))
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        size = -(-len(packed_positions) // self.workers)
+        chunks = [packed_positions[i:i + size] for i in range(0, len(packed_positions), size)]
+        futures = [self._pool.submit(run_playouts, chunk, self.rng.getrandbits(32))
+                   for chunk in chunks]
+        return [winner for future in futures for winner in future.result()]
+
+    def _principal_variation(self, node):
+        pv = []
+        while node is not None:
+            pv.append(node.move)
+            node = max(node.children, key=lambda child: child.visits, default=None)
+        return pv
+
+    def close(self):
+        """Shuts down the playout pool used when workers > 1."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
@@ -0,0 +1,203 @@
+"""
+Opening book for the placement phase.
+
+The first placement turns are the same in every game and have the widest
+branching, so their best replies are searched offline and stored in a
+small binary file. Positions are normalised over the 8 board symmetries
+before being keyed by their Zobrist hash, so one entry serves all 8
+orientations of a position.
+
+Usage:
+    python opening_book.py build --out opening.book --plies 6 --depth 5 --workers 8
+    python opening_book.py show --book opening.book
+
+File layout: header (magic, version, entry count) followed by entries
+sorted by key: hash (8 bytes), from point (255 = placement), to point,
+search depth and score (2 bytes).
+"""
+import argparse
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from game_logic import (SQUARE_COORDS, SYMMETRIES, ZOBRIST_CAPTURED, ZOBRIST_GOAT, ZOBRIST_PLACED,
+                        ZOBRIST_TIGER, ZOBRIST_TIGER_TURN, BaghChal, iter_bits, transform_mask)
+
+MAGIC = b'BCOB'
+VERSION = 1
+HEADER = struct.Struct('<4sII')
+ENTRY = struct.Struct('<QBBBh')
+PLACEMENT = 255 # Stored `from` point of a goat placement
+
+# INVERSE_SYMMETRIES[s][sq] maps a point of the canonical image back
+INVERSE_SYMMETRIES = [[perm.index(sq) for sq in range(len(perm))] for perm in SYMMETRIES]
+
+
+def canonical(game):
+    """
+    Algorithm: Symmetry Normalisation
+    Of the 8 images of the position, the one with the smallest
+    (tigers, goats) bitboards is the canonical one.
+    Returns (key, sym): the Zobrist hash of that image and the symmetry
+    that maps `game` onto it.
+    """
+    best = None
+    for sym in range(len(SYMMETRIES)):
+        image = (transform_mask(game.tigers, sym), transform_mask(game.goats, sym))
+        if best is None or image < best[0]:
+            best = (image, sym)
+    (tigers, goats), sym = best
+
+    key = ZOBRIST_PLACED[game.goats_placed] ^ ZOBRIST_CAPTURED[game.goats_captured]
+    for sq in iter_bits(goats):
+        key ^= ZOBRIST_GOAT[sq]
+    for sq in iter_bits(tigers):
+        key ^= ZOBRIST_TIGER[sq]
+    if game.turn == 'T':
+        key ^= ZOBRIST_TIGER_TURN
+    return key, sym
+
+
+class OpeningBook:
+    """In-memory view of a book file: canonical key -> (move, depth, score)."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self.hits = 0
+        if path is not None:
+            self.load(path)
+
+    def load(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a Bagh-Chal opening book (version {VERSION})")
+        for key, frm, to, depth, score in ENTRY.iter_unpack(
+                data[HEADER.size:HEADER.size + count * ENTRY.size]):
+            self.entries[key] = ((None if frm == PLACEMENT else frm, to), depth, score)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(self.entries)))
+            for key in sorted(self.entries):
+                (frm, to), depth, score = self.entries[key]
+                f.write(ENTRY.pack(key, PLACEMENT if frm is None else frm, to, depth, score))
+
+    def add(self, game, move, depth, score):
+        """Stores `move` (square indices, in `game`'s orientation) for `game`."""
+        key, sym = canonical(game)
+        perm = SYMMETRIES[sym]
+        frm, to = move
+        self.entries[key] = ((None if frm is None else perm[frm], perm[to]), depth, score)
+
+    def lookup(self, game):
+        """
+        Returns the book move for `game` as (from_sq, to_sq) in `game`'s own
+        orientation, or None if the position is not in the book.
+        """
+        key, sym = canonical(game)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        inverse = INVERSE_SYMMETRIES[sym]
+        frm, to = entry[0]
+        move = (None if frm is None else inverse[frm], inverse[to])
+        if move not in game.legal_moves(): # Hash collision or a stale book
+            return None
+        self.hits += 1
+        return move
+
+    def __len__(self):
+        return len(self.entries)
+
+
+# --- Builder ---
+
+def _search_position(state, depth, time_limit_ms):
+    """Deep search of one book position in a worker; returns (move, depth, score)."""
+    # Imported here: search.py imports this module for OpeningBook
+    from goat_bot import GoatBot
+    from tiger_bot import TigerBot
+
+    game = BaghChal()
+    game.restore(state)
+    bot_class = TigerBot if game.turn == 'T' else GoatBot
+    bot = bot_class(depth=depth, time_limit_ms=time_limit_ms, seed=0)
+    bot.get_best_move(game)
+    return bot.stats.pv[0], bot.stats.depth, bot.stats.score
+
+
+def build(path, plies, depth, workers=None, time_limit_ms=None, log=print):
+    """
+    Algorithm: Book Expansion
+    Walks the placement tree ply by ply from the start position, one
+    canonical position per symmetry class. Each position is searched to
+    `depth`. A tiger book needs every goat reply but only the tiger's own
+    best move, and vice versa, so every position records which sides'
+    books it belongs to:
+    - the side to move follows only its searched best move;
+    - the other side's book follows every (symmetry-unique) move.
+    """
+    book = OpeningBook()
+    frontier = {canonical(BaghChal())[0]: (BaghChal(), {'T', 'G'})}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for ply in range(plies):
+            start_time = time.perf_counter()
+            items = list(frontier.values())
+            results = pool.map(_search_position, [game.state() for game, _ in items],
+                               [depth] * len(items), [time_limit_ms] * len(items))
+            next_frontier = {}
+            for (game, sides), (move, searched, score) in zip(items, results):
+                book.add(game, move, searched, score)
+                mover = game.turn
+                other = 'G' if mover == 'T' else 'T'
+                followed = {move: {mover}} if mover in sides else {}
+                if other in sides:
+                    for reply in game.legal_moves():
+                        followed.setdefault(reply, set()).add(other)
+                for reply, reply_sides in followed.items():
+                    token = game.apply(reply)
+                    if not game.winner and game.phase == 'PLACEMENT':
+                        key = canonical(game)[0]
+                        if key in next_frontier:
+                            next_frontier[key][1].update(reply_sides)
+                        else:
+                            child = BaghChal()
+                            child.restore(game.state())
+                            next_frontier[key] = (child, set(reply_sides))
+                    game.undo(token)
+            log(f"ply {ply}: {len(items)} positions searched, "
+                f"{time.perf_counter() - start_time:.1f}s")
+            frontier = next_frontier
+    book.save(path)
+    return book
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bagh-Chal placement-phase opening book")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_build = sub.add_parser('build', help="search the early placement tree")
+    p_build.add_argument('--out', default='opening.book')
+    p_build.add_argument('--plies', type=int, default=6)
+    p_build.add_argument('--depth', type=int, default=5)
+    p_build.add_argument('--time-limit-ms', type=int, default=None)
+    p_build.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    p_show = sub.add_parser('show', help="print the book move of the start position")
+    p_show.add_argument('--book', default='opening.book')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        book = build(args.out, args.plies, args.depth, args.workers, args.time_limit_ms)
+        print(f"{len(book)} positions written to {args.out}")
+    elif args.command == 'show':
+        book = OpeningBook(args.book)
+        game = BaghChal()
+        frm, to = book.lookup(game)
+        print(f"{len(book)} positions; first placement: {SQUARE_COORDS[to]}")
+
+
+if __name__ == "__main__":
+    main()
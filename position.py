@@ -0,0 +1,106 @@
+"""
+Immutable, hashable snapshot of a Bagh-Chal position.
+
+A Position packs everything that defines a game into one integer:
+
+    bits  0-24  goats bitboard
+    bits 25-49  tigers bitboard
+    bits 50-54  goats placed (0-20)
+    bits 55-57  goats captured (0-5)
+    bit  58     tiger to move
+
+Phase and winner are derived from these, exactly as `BaghChal.from_board`
+derives them. Positions are cheap dict keys, pickle to a few bytes and
+serialise to a fixed 8-byte string for files and sockets.
+"""
+from game_logic import NUM_POINTS, REPETITION_LIMIT, TOTAL_GOATS, BaghChal
+
+POSITION_BYTES = 8
+
+_TIGER_SHIFT = NUM_POINTS
+_PLACED_SHIFT = 2 * NUM_POINTS
+_CAPTURED_SHIFT = _PLACED_SHIFT + 5
+_TURN_SHIFT = _CAPTURED_SHIFT + 3
+_BOARD_MASK = (1 << NUM_POINTS) - 1
+
+
+class Position:
+    __slots__ = ('packed',)
+
+    def __init__(self, goats, tigers, goats_placed=0, goats_captured=0, turn='G'):
+        packed = (goats | tigers << _TIGER_SHIFT | goats_placed << _PLACED_SHIFT
+                  | goats_captured << _CAPTURED_SHIFT)
+        if turn == 'T':
+            packed |= 1 << _TURN_SHIFT
+        object.__setattr__(self, 'packed', packed)
+
+    @classmethod
+    def from_packed(cls, packed):
+        position = cls.__new__(cls)
+        object.__setattr__(position, 'packed', packed)
+        return position
+
+    @classmethod
+    def from_game(cls, game):
+        return cls(game.goats, game.tigers, game.goats_placed, game.goats_captured, game.turn)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) != POSITION_BYTES:
+            raise ValueError(f"A position is {POSITION_BYTES} bytes, got {len(data)}")
+        return cls.from_packed(int.from_bytes(data, 'little'))
+
+    def to_bytes(self):
+        return self.packed.to_bytes(POSITION_BYTES, 'little')
+
+    def to_game(self, repetition_limit=REPETITION_LIMIT):
+        """A fresh BaghChal in this position (hash, phase, winner and tiger data derived)."""
+        return BaghChal.from_bitboards(self.goats, self.tigers, self.turn, self.goats_placed,
+                                       self.goats_captured, repetition_limit)
+
+    @property
+    def goats(self):
+        return self.packed & _BOARD_MASK
+
+    @property
+    def tigers(self):
+        return self.packed >> _TIGER_SHIFT & _BOARD_MASK
+
+    @property
+    def goats_placed(self):
+        return self.packed >> _PLACED_SHIFT & 31
+
+    @property
+    def goats_captured(self):
+        return self.packed >> _CAPTURED_SHIFT & 7
+
+    @property
+    def turn(self):
+        return 'T' if self.packed >> _TURN_SHIFT else 'G'
+
+    @property
+    def phase(self):
+        return 'MOVEMENT' if self.goats_placed >= TOTAL_GOATS else 'PLACEMENT'
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Position is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Position is immutable")
+
+    def __eq__(self, other):
+        if not isinstance(other, Position):
+            return NotImplemented
+        return self.packed == other.packed
+
+    def __hash__(self):
+        return hash(self.packed)
+
+    def __reduce__(self):
+        # Pickles as one integer instead of the attribute dict
+        return (Position.from_packed, (self.packed,))
+
+    def __repr__(self):
+        return (f"Position(goats={self.goats:#09x}, tigers={self.tigers:#09x}, "
+                f"goats_placed={self.goats_placed}, goats_captured={self.goats_captured}, "
+                f"turn={self.turn!r})")
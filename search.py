@@ -0,0 +1,946 @@
+"""
+Side-agnostic alpha-beta engine shared by TigerBot and GoatBot.
+
+SearchBot runs negamax alpha-beta with a transposition table, iterative
+deepening, move ordering and symmetry reduction. Principal variation
+search (aspiration windows, late-move reductions), quiescence search over
+captures and parallel root splitting are options.
+Subclasses only choose their side and provide `evaluate(game)`, scored
+from that side's point of view.
+"""
+import math
+import multiprocessing
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from game_logic import DRAW as GAME_DRAW, JUMP_OVER, NUM_POINTS, SQUARE_COORDS, SYMMETRIES
+from opening_book import OpeningBook
+from position import Position
+from tablebase import DRAW, WIN, Tablebase
+from transposition import EXACT, LOWER, UPPER, TranspositionTable
+
+MAX_SEARCH_DEPTH = 64
+WIN_SCORE = 10000
+TABLEBASE_HORIZON = 256 # Tablebase wins score above every search mate score
+TIME_CHECK_INTERVAL = 1024 # Nodes between clock checks
+ASPIRATION_WINDOW = 50 # Half-width of the root window around the last score
+LMR_MIN_DEPTH = 3 # Late-move reductions apply from this remaining depth
+LMR_MIN_MOVES = 3 # Moves searched at full depth before reducing
+QUIESCENCE_PLIES = 6 # Longest capture / defence line searched past the horizon
+PONDER_RANK_DEPTH = 2 # Search depth used to guess the opponent's likeliest replies
+
+
+def _move_index(move):
+    """Dense index of a move for history tables; placements use from = 25."""
+    frm, to = move
+    return (NUM_POINTS if frm is None else frm) * NUM_POINTS + to
+
+
+def _is_capture(move):
+    frm, to = move
+    return frm is not None and JUMP_OVER[frm * NUM_POINTS + to] >= 0
+
+
+def _tablebase_score(result, distance):
+    """Score of a decided tablebase entry: win sooner / lose later."""
+    score = WIN_SCORE + TABLEBASE_HORIZON - distance
+    return score if result == WIN else -score
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget runs out."""
+
+
+class SearchStats:
+    """
+    Summary of one get_best_move call.
+    Node and cutoff counters are always kept (they cost an increment on
+    rare branches). `time_ms` is filled only when the bot has profile=True.
+    In parallel mode the cutoff counters cover the main process only.
+    """
+
+    def __init__(self):
+        self.depth = 0          # Deepest fully completed iteration
+        self.nodes = 0
+        self.elapsed_ms = 0.0
+        self.score = None       # From the searching side's point of view
+        self.best_move = None   # (start_pos or None, end_pos)
+        self.pv = []            # Principal variation as (from_sq, to_sq) moves
+        self.timed_out = False
+        self.source = 'search' # 'search', 'book', 'tablebase' or 'ponder'
+
+        self.nodes_per_depth = [] # Nodes searched by iteration 1, 2, ...
+        self.expanded = 0       # Nodes whose moves were searched (not leaves/TT hits)
+        self.quiescence_nodes = 0 # Nodes past the horizon (included in nodes)
+        self.re_searches = 0    # PVS/LMR null-window searches that had to be repeated
+        self.aspiration_fails = 0 # Root windows that failed and were widened
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0 # Cutoffs caused by the first move tried
+        self.time_ms = {}       # Profiling: 'movegen', 'apply_undo', 'evaluate'
+
+    @property
+    def nps(self):
+        return self.nodes / (self.elapsed_ms / 1000) if self.elapsed_ms else 0.0
+
+    @property
+    def cutoff_rate(self):
+        """Share of expanded nodes that failed high."""
+        return self.beta_cutoffs / self.expanded if self.expanded else 0.0
+
+    @property
+    def first_move_cutoff_ratio(self):
+        """Share of cutoffs found by the first move: a measure of move ordering."""
+        return self.first_move_cutoffs / self.beta_cutoffs if self.beta_cutoffs else 0.0
+
+    @property
+    def branching_factor(self):
+        """Effective branching factor: growth of the last iteration over the one before."""
+        counts = self.nodes_per_depth
+        return counts[-1] / counts[-2] if len(counts) >= 2 and counts[-2] else 0.0
+
+    def as_dict(self):
+        """Plain-data copy for logging or JSON."""
+        return {
+            'depth': self.depth, 'nodes': self.nodes, 'elapsed_ms': self.elapsed_ms,
+            'nps': self.nps, 'score': self.score, 'best_move': self.best_move,
+            'pv': list(self.pv), 'timed_out': self.timed_out, 'source': self.source,
+            'nodes_per_depth': list(self.nodes_per_depth),
+            'branching_factor': self.branching_factor, 'expanded': self.expanded,
+            'beta_cutoffs': self.beta_cutoffs, 'cutoff_rate': self.cutoff_rate,
+            'first_move_cutoff_ratio': self.first_move_cutoff_ratio,
+            'quiescence_nodes': self.quiescence_nodes, 're_searches': self.re_searches,
+            'aspiration_fails': self.aspiration_fails,
+            'time_ms': dict(self.time_ms),
+        }
+
+    def __repr__(self):
+        return (f"SearchStats(depth={self.depth}, nodes={self.nodes}, "
+                f"nps={self.nps:.0f}, elapsed_ms={self.elapsed_ms:.1f}, score={self.score}, "
+                f"source={self.source!r})")
+
+
+class SearchBot:
+    side = None # 'T' or 'G', set by subclasses
+
+    def __init__(self, depth=3, tt_size=1 << 18, time_limit_ms=None, workers=1, seed=None,
+                 fast=False, tablebase=None, book=None, profile=False, on_stats=None,
+                 pruning=False, quiescence=False, repetition=True):
+        self.depth = depth
+        # Fast mode samples 5 goat placements per node instead of searching all
+        self.fast = fast
+        # PVS null windows, aspiration windows and late-move reductions;
+        # off by default, so the search is plain full-window alpha-beta
+        self.pruning = pruning
+        # Extend leaves through pending captures before evaluating (off by
+        # default: on the benchmark fixtures it costs more nodes than it saves)
+        self.quiescence = quiescence
+        # Score a position already seen in the game or the line as a draw
+        self.repetition = repetition
+        # Default per-move budget; None searches exactly to `depth`
+        self.time_limit_ms = time_limit_ms
+        # Transposition table shared across moves; tt_size=0 disables it
+        self.tt = TranspositionTable(tt_size) if tt_size else None
+        self.tt_size = tt_size
+        # Solved movement phase (tablebase.Tablebase or the path of a built table)
+        if isinstance(tablebase, str):
+            tablebase = Tablebase(tablebase)
+        self.tablebase = tablebase
+        # Placement-phase opening book (opening_book.OpeningBook or a path)
+        if isinstance(book, str):
+            book = OpeningBook(book)
+        self.book = book
+        self.nodes = 0 # Nodes visited by the last get_best_move
+        self.stats = SearchStats() # Statistics of the last get_best_move
+        # Profiling times move generation, apply/undo and evaluation
+        self.profile = profile
+        # Called with a stats.as_dict() snapshot after every completed iteration:
+        # best_move in (r, c) coordinates, pv as (from_sq, to_sq) square indices
+        self.on_stats = on_stats
+
+        # Parallel root search: workers > 1 spreads root moves over processes
+        self.workers = workers
+        # Fixed seed makes move choice reproducible, and the same for any
+        # worker count (root moves are then searched independently)
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        self._deadline = None
+        self._stop_event = None
+        self._abort_flag = None # multiprocessing.Value, set inside pool workers
+        self._pv_hint = {} # position hash -> PV move from the last iteration
+        self._iteration_depth = 0 # Depth of the running iteration (ply = this - depth)
+        self._path_draws = 0 # Repetition draws scored so far; see negamax
+        self.killers = [[None, None] for _ in range(MAX_SEARCH_DEPTH + 1)]
+        self.history = [0] * ((NUM_POINTS + 1) * NUM_POINTS)
+        self._pool = None
+        self._shared_abort = None
+        self._brother_bot = None # In-process stand-in for a pool worker (seeded, workers=1)
+        self._ponder_results = {} # position hash -> (Position, SearchStats) from ponder()
+
+    def evaluate(self, game):
+        """Heuristic score of a non-terminal position; positive is good for self.side."""
+        raise NotImplementedError
+
+    def capture_value(self):
+        """What one captured goat is worth in `evaluate` units (always positive)."""
+        raise NotImplementedError
+
+    def worker_options(self):
+        """Constructor keywords that parallel-search workers need to search like this bot."""
+        return {'pruning': self.pruning, 'quiescence': self.quiescence,
+                'repetition': self.repetition}
+
+    def get_best_move(self, game, time_limit_ms=None, stop_event=None):
+        """
+        Returns the best move for the side to move as a tuple: (start_pos, end_pos)
+        start_pos: (r, c), or None for a goat placement
+        end_pos: (r, c)
+
+        Algorithm: Iterative Deepening
+        Searches depth 1, 2, 3, ... and keeps the result of the last completed
+        iteration. With a time limit (argument or constructor default) it
+        deepens until the budget runs out; without one it stops at self.depth.
+        The search runs on `game` itself via apply/undo and leaves it unchanged.
+
+        stop_event: optional threading.Event; setting it from another thread
+        aborts the search, which then returns None if no iteration finished.
+
+        If ponder() already searched this position to completion, its result
+        is returned at once (stats.source == 'ponder').
+        """
+        pondered = self._ponder_results.get(game.hash)
+        self._ponder_results = {}
+        if pondered is not None and pondered[0] == Position.from_game(game):
+            self.stats = pondered[1]
+            self.stats.source = 'ponder'
+            return self.stats.best_move
+
+        self.stats = SearchStats()
+        if not self.profile:
+            return self._search(game, time_limit_ms, stop_event)
+        remove = self._install_timers(game)
+        try:
+            return self._search(game, time_limit_ms, stop_event)
+        finally:
+            remove()
+
+    def ponder(self, game, stop_event):
+        """
+        Algorithm: Pondering
+        Uses the opponent's thinking time; `game` has the opponent to move.
+        1. A shallow search (PONDER_RANK_DEPTH) ranks their replies.
+        2. Best-guess reply first, each resulting position is searched just
+           as get_best_move would search it (same depth / time limit).
+        3. Completed results are kept by position. get_best_move answers a
+           ponder hit at once; after any other reply it still starts from
+           the transposition table warmed here.
+        Runs until every reply is searched or `stop_event` is set. The bot
+        must not be used for anything else meanwhile (run get_best_move
+        after the ponder call has returned). Each search counts into its
+        own SearchStats; once pondering returns, `self.stats` and
+        `self.nodes` are those of the last get_best_move again.
+        Returns the number of replies searched to completion.
+        """
+        last_stats, last_nodes = self.stats, self.nodes
+        results = {}
+        self._ponder_results = results
+        try:
+            self.stats = SearchStats()
+            for reply in self._rank_replies(game, stop_event):
+                if stop_event.is_set():
+                    break
+                token = game.apply(reply)
+                if not game.winner and game.legal_moves():
+                    self.stats = SearchStats()
+                    move = self._search(game, None, stop_event)
+                    if move is not None and not stop_event.is_set():
+                        results[game.hash] = (Position.from_game(game), self.stats)
+                game.undo(token)
+        finally:
+            self.stats, self.nodes = last_stats, last_nodes
+        return len(results)
+
+    def _rank_replies(self, game, stop_event):
+        """The opponent's moves in `game`, most dangerous for us first."""
+        replies = game.legal_moves()
+        if self.tt:
+            self.tt.new_search()
+        self.nodes = 0
+        self._deadline = None
+        self._stop_event = stop_event
+        self._pv_hint = {}
+        self._iteration_depth = PONDER_RANK_DEPTH
+        root_state = game.state()
+        root_history = len(game.history)
+        scores = {}
+        for reply in replies:
+            token = game.apply(reply)
+            try:
+                # Our score after the reply: the opponent picks the lowest
+                scores[reply] = self.negamax(game, PONDER_RANK_DEPTH - 1, -math.inf, math.inf)
+            except SearchTimeout:
+                game.restore(root_state, root_history) # Unwind the half-finished line
+                break
+            game.undo(token)
+        replies.sort(key=lambda reply: scores.get(reply, math.inf))
+        return replies
+
+    def _install_timers(self, game):
+        """
+        Algorithm: Method Shadowing
+        Profiling replaces the hot methods with timed wrappers stored as
+        instance attributes, and deletes them afterwards. The unprofiled
+        search therefore runs exactly the normal code path.
+        """
+        timings = self.stats.time_ms
+        clock = time.perf_counter
+
+        def timed(name, fn):
+            timings.setdefault(name, 0.0)
+
+            def wrapper(*args):
+                start = clock()
+                try:
+                    return fn(*args)
+                finally:
+                    timings[name] += (clock() - start) * 1000
+            return wrapper
+
+        game.legal_moves = timed('movegen', game.legal_moves)
+        game.apply = timed('apply_undo', game.apply)
+        game.undo = timed('apply_undo', game.undo)
+        self.evaluate = timed('evaluate', self.evaluate)
+
+        def remove():
+            del game.legal_moves, game.apply, game.undo, self.evaluate
+        return remove
+
+    def _search(self, game, time_limit_ms, stop_event):
+        if time_limit_ms is None:
+            time_limit_ms = self.time_limit_ms
+        max_depth = MAX_SEARCH_DEPTH if time_limit_ms else self.depth
+
+        stats = self.stats
+        start_time = time.perf_counter()
+        self.nodes = 0
+        self._deadline = None
+        self._stop_event = stop_event
+        self._pv_hint = {}
+
+        possible_moves = game.legal_moves()
+
+        # If no moves available, we lost (or the game is already over)
+        if not possible_moves:
+            return None
+
+        # Book positions are answered without searching
+        if self.book is not None and game.phase == 'PLACEMENT':
+            move = self.book.lookup(game)
+            if move is not None:
+                stats.source = 'book'
+                stats.pv = [move]
+                stats.elapsed_ms = (time.perf_counter() - start_time) * 1000
+                frm, to = move
+                stats.best_move = (None if frm is None else SQUARE_COORDS[frm], SQUARE_COORDS[to])
+                return stats.best_move
+
+        if self.tt:
+            self.tt.new_search()
+
+        # Fresh killers per move; history is halved so old cutoffs fade
+        self.killers = [[None, None] for _ in range(MAX_SEARCH_DEPTH + 1)]
+        self.history = [h >> 1 for h in self.history]
+
+        # Shuffle to add a bit of randomness for equal-value moves,
+        # then drop symmetric duplicates and put captures first
+        self.rng.shuffle(possible_moves)
+        possible_moves = self.unique_moves(game, possible_moves)
+        possible_moves.sort(key=_is_capture, reverse=True)
+
+        if self.tablebase and game.phase == 'MOVEMENT':
+            move = self.tablebase_move(game, possible_moves)
+            if move is not None:
+                stats.elapsed_ms = (time.perf_counter() - start_time) * 1000
+                stats.best_move = (SQUARE_COORDS[move[0]], SQUARE_COORDS[move[1]])
+                return stats.best_move
+
+        # Seeded searches split the root the same way with any worker count,
+        # so workers=1 and workers=N return the same move and score
+        split = self.workers > 1 or self.seed is not None
+        search_root = self.search_root_split if split else self.search_root
+        root_state = game.state()
+        root_history = len(game.history)
+        for depth in range(1, max_depth + 1):
+            self._iteration_depth = depth
+            try:
+                if not split and self.pruning:
+                    score, move, pv = self.search_aspiration(game, depth, possible_moves)
+                else:
+                    score, move, pv = search_root(game, depth, possible_moves)
+            except SearchTimeout:
+                game.restore(root_state, root_history) # Unwind the half-finished line
+                stats.timed_out = True
+                break
+
+            stats.depth, stats.score, stats.pv = depth, score, pv
+            stats.best_move = (None if move[0] is None else SQUARE_COORDS[move[0]],
+                               SQUARE_COORDS[move[1]])
+            stats.nodes_per_depth.append(self.nodes - sum(stats.nodes_per_depth))
+            if self.on_stats is not None:
+                stats.nodes = self.nodes
+                stats.elapsed_ms = (time.perf_counter() - start_time) * 1000
+                self.on_stats(stats.as_dict())
+            self._pv_hint = self._build_pv_hint(game, stats.pv)
+
+            # Previous best goes first in the next iteration
+            possible_moves.remove(move)
+            possible_moves.insert(0, move)
+
+            # Timeouts are armed only once an iteration has a move to return
+            if time_limit_ms and self._deadline is None:
+                self._deadline = start_time + time_limit_ms / 1000
+            if self._out_of_time():
+                break
+            if abs(score) >= WIN_SCORE: # Forced result found, deeper adds nothing
+                break
+
+        stats.nodes = self.nodes
+        stats.elapsed_ms = (time.perf_counter() - start_time) * 1000
+        return stats.best_move # None if stopped before depth 1 finished
+
+    def tablebase_move(self, game, moves):
+        """
+        Picks the root move straight from the tablebase when the position is
+        decided: the fastest win, or the slowest loss if every move loses.
+        Returns None for drawn positions, which are left to the search (it
+        still probes the table, so it never walks into a lost line).
+        """
+        best_score = -math.inf
+        best_move = None
+        for move in moves:
+            token = game.apply(move)
+            if game.winner == GAME_DRAW:
+                score = 0
+            elif game.winner:
+                score = WIN_SCORE + TABLEBASE_HORIZON # Wins on the spot
+            else:
+                result, distance = self.tablebase.probe(game)
+                score = 0 if result == DRAW else -_tablebase_score(result, distance)
+            game.undo(token)
+            if score > best_score:
+                best_score = score
+                best_move = move
+        if best_score == 0:
+            return None
+        stats = self.stats
+        stats.source = 'tablebase'
+        stats.score = best_score
+        stats.pv = [best_move]
+        return best_move
+
+    def _out_of_time(self):
+        if self._stop_event is not None and self._stop_event.is_set():
+            return True
+        if self._abort_flag is not None and self._abort_flag.value:
+            return True
+        return self._deadline is not None and time.perf_counter() >= self._deadline
+
+    def search_aspiration(self, game, depth, moves):
+        """
+        Algorithm: Aspiration Windows
+        Iterations rarely change the score much, so the root is searched with
+        a narrow window around the previous iteration's score. A result
+        outside it is only a bound: that side of the window is opened
+        (x4 wider, then to infinity) and the root searched again.
+        """
+        previous = self.stats.score
+        if depth < 2 or previous is None or abs(previous) >= WIN_SCORE:
+            return self.search_root(game, depth, moves)
+        window = ASPIRATION_WINDOW
+        alpha, beta = previous - window, previous + window
+        while True:
+            score, move, pv = self.search_root(game, depth, moves, alpha, beta)
+            if alpha < score < beta:
+                return score, move, pv
+            self.stats.aspiration_fails += 1
+            window *= 4
+            if score <= alpha:
+                alpha = previous - window if window <= 16 * ASPIRATION_WINDOW else -math.inf
+            else:
+                beta = previous + window if window <= 16 * ASPIRATION_WINDOW else math.inf
+
+    def search_root(self, game, depth, moves, alpha=-math.inf, beta=math.inf):
+        """
+        One fixed-depth pass over the root moves; returns (score, move, pv).
+        The first move gets the full window, the rest a null window around
+        the best so far (re-searched only if they beat it). With a finite
+        window the score may be a bound; search_aspiration handles that.
+        """
+        best_score = -math.inf
+        best_move = None
+        for move in moves:
+            self.rng_for(depth, move)
+            # Simulate move
+            token = game.apply(move)
+
+            if best_move is None or not self.pruning:
+                score = -self.negamax(game, depth - 1, -beta, -max(alpha, best_score))
+            else:
+                # Moves that cannot beat the best so far get cut early
+                bound = max(alpha, best_score)
+                score = -self.negamax(game, depth - 1, -bound - 1, -bound)
+                if bound < score < beta:
+                    self.stats.re_searches += 1
+                    score = -self.negamax(game, depth - 1, -beta, -bound)
+            game.undo(token)
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if best_score >= beta:
+                break
+        return best_score, best_move, self._extract_pv(game, best_move, depth)
+
+    def search_root_split(self, game, depth, moves):
+        """
+        Algorithm: Root Splitting (Young Brothers Wait)
+        The first (PV) root move is searched here to get a bound. Each
+        remaining move is then searched on its own with the window
+        (bound - 1, +inf): in pool workers when workers > 1, otherwise in
+        this process. The window is fixed before any of them starts, so
+        no score depends on which moves finished first.
+
+        Every move that ties or beats the bound gets an exact score, and
+        ties are broken by root order. With a seed, each move also starts
+        from an empty table and fresh move-ordering heuristics, so the
+        result is the same for any worker count and any scheduling.
+        """
+        first, rest = moves[0], moves[1:]
+
+        # 1. Eldest brother: establishes the bound for everyone else
+        self.rng_for(depth, first)
+        token = game.apply(first)
+        bound = -self.negamax(game, depth - 1, -math.inf, math.inf)
+        game.undo(token)
+        results = {first: (bound, self._extract_pv(game, first, depth))}
+
+        # 2. Younger brothers
+        if self.workers > 1:
+            results.update(self._search_brothers_parallel(game, depth, rest, bound))
+        else:
+            bot = self._get_brother_bot()
+            bot._deadline, bot._stop_event = self._deadline, self._stop_event
+            for move in rest:
+                try:
+                    score, pv = _search_brother(bot, game, move, depth, bound, self.seed,
+                                                self.fast)
+                finally:
+                    self.nodes += bot.nodes
+                results[move] = (score, pv)
+
+        best_score = max(score for score, _ in results.values())
+        for move in moves:
+            score, pv = results[move]
+            if score == best_score:
+                return score, move, pv
+
+    def _search_brothers_parallel(self, game, depth, moves, bound):
+        """Searches `moves` in the worker pool; returns {move: (score, pv)}."""
+        pool = self._get_pool()
+        self._shared_abort.value = 0
+        deadline = None
+        if self._deadline is not None:
+            deadline = time.time() + (self._deadline - time.perf_counter())
+        position = Position.from_game(game) # Pickles as one integer
+        history = game.history # Workers need it to see repetitions of earlier positions
+        pending = {pool.submit(_search_root_move, position, history, game.repetition_limit,
+                               move, depth, bound, deadline, self.seed, self.fast)
+                   for move in moves}
+
+        results = {}
+        timed_out = False
+        while pending:
+            done, pending = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.cancelled():
+                    continue
+                move, score, pv, nodes = future.result()
+                self.nodes += nodes
+                if score is None:
+                    timed_out = True
+                    continue
+                results[move] = (score, pv)
+            if not timed_out and self._out_of_time():
+                timed_out = True
+            if timed_out:
+                self._shared_abort.value = 1 # Running workers stop at their next check
+                for future in pending:
+                    future.cancel()
+        if timed_out:
+            raise SearchTimeout()
+        return results
+
+    def rng_for(self, depth, move):
+        """Reseeds the goat sampler per root move so seeded runs repeat exactly."""
+        if self.seed is not None:
+            self.rng.seed(f"{self.seed}:{depth}:{move}")
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._shared_abort = multiprocessing.Value('b', 0)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker,
+                initargs=(type(self), self.tt_size, self._shared_abort,
+                          self.tablebase.path if self.tablebase else None,
+                          self.worker_options()))
+        return self._pool
+
+    def _get_brother_bot(self):
+        """A bot set up like a pool worker's, for root splitting in this process."""
+        if self._brother_bot is None:
+            self._brother_bot = type(self)(tt_size=self.tt_size, tablebase=self.tablebase,
+                                           **self.worker_options())
+        return self._brother_bot
+
+    def close(self):
+        """Shuts down the worker pool used by parallel mode."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _extract_pv(self, game, first_move, depth):
+        """Follows best moves stored in the transposition table from the root."""
+        pv = [first_move]
+        tokens = [game.apply(first_move)]
+        seen = {game.hash}
+        while self.tt and len(pv) < depth and not game.winner:
+            entry = self.tt.probe(game.hash)
+            if not entry or entry[3] not in game.legal_moves():
+                break
+            pv.append(entry[3])
+            tokens.append(game.apply(entry[3]))
+            if game.hash in seen: # Cycle in the movement phase
+                break
+            seen.add(game.hash)
+        while tokens:
+            game.undo(tokens.pop())
+        return pv
+
+    def _build_pv_hint(self, game, pv):
+        """Maps each position along the PV to the move the PV plays there."""
+        hint = {}
+        tokens = []
+        for move in pv:
+            hint[game.hash] = move
+            tokens.append(game.apply(move))
+        while tokens:
+            game.undo(tokens.pop())
+        return hint
+
+    def negamax(self, game, depth, alpha, beta):
+        """
+        Algorithm: Principal Variation Search (Negamax Alpha-Beta)
+        Returns the score of `game` from the point of view of the side to
+        move (game.turn). A child's score is the negation of its own.
+
+        With good ordering the first move is usually best, so the others are
+        only tested with a null window (alpha, alpha + 1); one that turns out
+        better is searched again with the full window.
+        Late-move reductions: quiet moves ordered late are first searched
+        one ply shallower (two when very late) and re-searched at full
+        depth only if they beat alpha.
+        """
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_INTERVAL == 0 and self._out_of_time():
+            raise SearchTimeout()
+
+        # Terminal states: win sooner / lose later
+        if game.winner and game.winner != GAME_DRAW:
+            won = game.winner == game.turn
+            return WIN_SCORE + depth if won else -WIN_SCORE - depth
+
+        # A repeated position is a draw: the side that could do better will
+        # deviate, so the cycle need not be searched again. (This includes a
+        # game drawn by its repetition limit.) The score depends on the path,
+        # so it is counted and nothing above it goes into the table.
+        if game.winner or self.repetition and game.position_counts[game.hash] > 1:
+            self._path_draws += 1
+            return 0
+
+        # Solved movement-phase positions need no search
+        if self.tablebase and game.phase == 'MOVEMENT':
+            result, distance = self.tablebase.probe(game)
+            if result != DRAW:
+                return _tablebase_score(result, distance)
+
+        if depth <= 0:
+            if self.quiescence:
+                return self.quiesce(game, alpha, beta, QUIESCENCE_PLIES)
+            score = self.evaluate(game)
+            return score if game.turn == self.side else -score
+
+        # Transposition table: reuse a previous result for this position
+        alpha_orig, beta_orig = alpha, beta
+        path_draws = self._path_draws
+        tt_move = None
+        if self.tt:
+            entry = self.tt.probe(game.hash)
+            if entry:
+                tt_depth, flag, tt_score, tt_move = entry
+                if tt_depth >= depth:
+                    if flag == EXACT:
+                        return tt_score
+                    if flag == LOWER:
+                        alpha = max(alpha, tt_score)
+                    else:
+                        beta = min(beta, tt_score)
+                    if beta <= alpha:
+                        return tt_score
+
+        # Previous iteration's principal variation is searched first
+        tt_move = self._pv_hint.get(game.hash, tt_move)
+        ply = self._iteration_depth - depth
+
+        moves = game.legal_moves()
+        if not moves: # Side to move cannot move: it has lost
+            return -WIN_SCORE - depth
+
+        # Fast mode: in placement phase there are too many moves (empty spots),
+        # so only a random subset of goat moves is analysed. Not a sound search.
+        if self.fast and game.phase == 'PLACEMENT' and game.turn == 'G':
+            if len(moves) > 5:
+                moves = self.rng.sample(moves, 5)
+
+        if depth >= 2:
+            moves = self.unique_moves(game, moves)
+        moves = self.order_moves(moves, tt_move, ply)
+        self.stats.expanded += 1
+
+        killers = self.killers[ply]
+        reduce = self.pruning and depth >= LMR_MIN_DEPTH
+        best_score = -math.inf
+        best_move = None
+        for i, move in enumerate(moves):
+            token = game.apply(move)
+            if i == 0 or not self.pruning:
+                score = -self.negamax(game, depth - 1, -beta, -alpha)
+            else:
+                reduction = 0
+                if (reduce and i >= LMR_MIN_MOVES and not _is_capture(move)
+                        and move != killers[0] and move != killers[1]):
+                    reduction = 2 if i >= 4 * LMR_MIN_MOVES and depth > LMR_MIN_DEPTH else 1
+                score = -self.negamax(game, depth - 1 - reduction, -alpha - 1, -alpha)
+                if reduction and score > alpha: # Not as bad as it looked: full depth
+                    self.stats.re_searches += 1
+                    score = -self.negamax(game, depth - 1, -alpha - 1, -alpha)
+                if alpha < score < beta:
+                    self.stats.re_searches += 1
+                    score = -self.negamax(game, depth - 1, -beta, -alpha)
+            game.undo(token)
+            if score > best_score:
+                best_score = score
+                best_move = move
+            alpha = max(alpha, score)
+            if beta <= alpha:
+                self._record_cutoff(move, depth, ply)
+                stats = self.stats
+                stats.beta_cutoffs += 1
+                if move is moves[0]:
+                    stats.first_move_cutoffs += 1
+                break
+
+        if self._path_draws == path_draws: # No repetition draw below: the score is cacheable
+            self._store(game, depth, best_score, alpha_orig, beta_orig, best_move)
+        return best_score
+
+    def quiesce(self, game, alpha, beta, plies):
+        """
+        Algorithm: Quiescence Search
+        The horizon is pushed past pending captures, so a goat that is about
+        to be taken is not scored as if it were safe:
+        - Tiger to move: stand pat on the evaluation, or try every jump.
+        - Goat to move with a goat en prise: stand pat on the evaluation
+          minus one capture (giving the goat up), or try the defences
+          (occupy a landing point or move a threatened goat away).
+        - Goat to move with nothing en prise: the position is quiet.
+        Lines stop after `plies` extra moves, where the static score is
+        used whatever is pending.
+        """
+        self.nodes += 1
+        self.stats.quiescence_nodes += 1
+        if self.nodes % TIME_CHECK_INTERVAL == 0 and self._out_of_time():
+            raise SearchTimeout()
+        if game.winner == GAME_DRAW:
+            self._path_draws += 1
+            return 0
+        if game.winner:
+            return WIN_SCORE if game.winner == game.turn else -WIN_SCORE
+
+        captures = game.tiger_captures()
+        score = self.evaluate(game)
+        if game.turn != self.side:
+            score = -score
+        if not captures or plies == 0:
+            return score
+
+        if game.turn == 'T':
+            best_score = score # Stand pat: a quiet move is always available
+            if best_score >= beta:
+                return best_score
+            alpha = max(alpha, best_score)
+            moves = captures
+        else:
+            landing = 0
+            hanging = 0
+            for frm, to in captures:
+                landing |= 1 << to
+                hanging |= 1 << JUMP_OVER[frm * NUM_POINTS + to]
+            moves = [move for move in game.goat_moves()
+                     if (landing >> move[1]) & 1
+                     or (move[0] is not None and (hanging >> move[0]) & 1)]
+            # Giving up the goat is always an option, worth about the static
+            # score minus one capture; defences are searched to beat that
+            best_score = score - self.capture_value()
+            if best_score >= beta:
+                return best_score
+            alpha = max(alpha, best_score)
+
+        for move in moves:
+            token = game.apply(move)
+            score = -self.quiesce(game, -beta, -alpha, plies - 1)
+            game.undo(token)
+            if score > best_score:
+                best_score = score
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+        return best_score
+
+    def order_moves(self, moves, tt_move, ply):
+        """
+        Algorithm: Move Ordering
+        1. PV / transposition-table move
+        2. Captures (tiger jumps)
+        3. Killer moves: quiet moves that caused a cutoff at this ply
+        4. Everything else by history score (cutoffs weighted by depth^2)
+        """
+        killers = self.killers[ply]
+        history = self.history
+
+        def priority(move):
+            if move == tt_move:
+                return 1 << 40
+            if _is_capture(move):
+                return 1 << 30
+            if move == killers[0] or move == killers[1]:
+                return 1 << 20
+            return history[_move_index(move)]
+
+        moves.sort(key=priority, reverse=True)
+        return moves
+
+    def _record_cutoff(self, move, depth, ply):
+        """Updates killer and history tables for a quiet move that failed high."""
+        if _is_capture(move):
+            return # Captures are already ordered first
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self.history[_move_index(move)] += depth * depth
+
+    def unique_moves(self, game, moves):
+        """
+        Algorithm: Symmetry Reduction
+        If the position maps onto itself under some of the 8 board symmetries,
+        moves that are images of each other lead to equivalent positions with
+        the same value, so only the first of each class is kept.
+        """
+        symmetries = game.symmetries()
+        if not symmetries:
+            return moves
+        seen = set()
+        unique = []
+        for move in moves:
+            frm, to = move
+            key = _move_index(move)
+            for sym in symmetries:
+                perm = SYMMETRIES[sym]
+                image = (None if frm is None else perm[frm], perm[to])
+                key = min(key, _move_index(image))
+            if key not in seen:
+                seen.add(key)
+                unique.append(move)
+        return unique
+
+    def _store(self, game, depth, score, alpha, beta, move):
+        """Records a search result with its bound type relative to the original window."""
+        if not self.tt:
+            return
+        if score <= alpha:
+            flag = UPPER
+        elif score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.store(game.hash, depth, flag, score, move)
+
+
+# --- Parallel search worker side ---
+# Each pool process keeps one bot (and its transposition table) alive
+# between root moves.
+_worker_bot = None
+
+
+def _init_worker(bot_class, tt_size, shared_abort, tablebase_path, options):
+    global _worker_bot
+    _worker_bot = bot_class(tt_size=tt_size, tablebase=tablebase_path, **options)
+    _worker_bot._abort_flag = shared_abort
+
+
+def _search_root_move(position, history, repetition_limit, move, depth, bound, deadline, seed,
+                      fast):
+    """
+    Searches one root move of `position` (reached through the position
+    hashes `history`, drawn at `repetition_limit`) in a worker process.
+    Returns (move, score, pv, nodes); score is None if the search was cut off.
+    """
+    game = position.to_game(repetition_limit)
+    game.load_history(history)
+    bot = _worker_bot
+    bot._deadline = None
+    if deadline is not None:
+        bot._deadline = time.perf_counter() + (deadline - time.time())
+    try:
+        score, pv = _search_brother(bot, game, move, depth, bound, seed, fast)
+    except SearchTimeout:
+        return move, None, [], bot.nodes
+    return move, score, pv, bot.nodes
+
+
+def _search_brother(bot, game, move, depth, bound, seed, fast):
+    """
+    Searches root `move` of `game` with `bot` and the window (bound - 1, +inf);
+    returns (score, pv). Ties with the bound come back exact. Raises
+    SearchTimeout (with `game` left mid-line) when the bot runs out of time.
+    """
+    bot.nodes = 0
+    bot.seed = seed
+    bot.fast = fast
+    bot._pv_hint = {}
+    bot._iteration_depth = depth
+    if seed is not None:
+        # Table and heuristics would depend on which moves came before; start clean
+        bot.killers = [[None, None] for _ in range(MAX_SEARCH_DEPTH + 1)]
+        bot.history = [0] * len(bot.history)
+        if bot.tt:
+            bot.tt.clear()
+    if bot.tt:
+        bot.tt.new_search()
+    bot.rng_for(depth, move)
+
+    token = game.apply(move)
+    score = -bot.negamax(game, depth - 1, -math.inf, -(bound - 1))
+    game.undo(token)
+    return score, bot._extract_pv(game, move, depth)
@@ -0,0 +1,197 @@
+"""
+Headless batch self-play.
+
+Plays N games between a tiger agent and a goat agent in a process pool,
+streams one JSON line per finished game and prints aggregate statistics.
+Does not import pygame.
+
+Usage:
+    python self_play.py --games 100 --tiger tiger:3 --goat random --out games.jsonl
+    python self_play.py --games 10000 --out /dev/null --archive games.bca   # binary archive
+
+Agent specs:
+    random        uniformly random legal moves (either side)
+    tiger:DEPTH   TigerBot searching to DEPTH plies
+    goat:DEPTH    GoatBot searching to DEPTH plies
+    mcts:N        MCTSBot with N playouts per move (either side)
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from archive import GameArchive, append_self_play
+from game_logic import DRAW, REPETITION_LIMIT, SQUARE_COORDS, BaghChal
+from goat_bot import GoatBot
+from mcts import MCTSBot
+from tiger_bot import TigerBot
+
+DEFAULT_MAX_PLIES = 300 # Games still running after this many plies are drawn
+
+
+class RandomAgent:
+    """Plays a uniformly random legal move for whichever side is to move."""
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def get_best_move(self, game):
+        moves = game.legal_moves()
+        if not moves:
+            return None
+        frm, to = self.rng.choice(moves)
+        return (None if frm is None else SQUARE_COORDS[frm]), SQUARE_COORDS[to]
+
+
+def make_agent(spec, side, seed=None, tablebase=None, book=None):
+    """Builds an agent from a spec string such as 'random', 'tiger:3', 'goat:3' or 'mcts:2000'."""
+    name, _, arg = spec.partition(':')
+    if name == 'random':
+        return RandomAgent(seed)
+    if name == 'tiger':
+        if side != 'T':
+            raise ValueError("tiger:DEPTH agents can only play the tigers")
+        return TigerBot(depth=int(arg or 3), seed=seed, tablebase=tablebase, book=book)
+    if name == 'goat':
+        if side != 'G':
+            raise ValueError("goat:DEPTH agents can only play the goats")
+        return GoatBot(depth=int(arg or 3), seed=seed, tablebase=tablebase, book=book)
+    if name == 'mcts':
+        return MCTSBot(simulations=int(arg or 2000), seed=seed)
+    raise ValueError(f"Unknown agent spec: {spec!r}")
+
+
+def play_game(index, tiger_spec, goat_spec, seed, max_plies=DEFAULT_MAX_PLIES, tablebase=None,
+              book=None, repetition_limit=REPETITION_LIMIT):
+    """Plays one game and returns its record as a JSON-serialisable dict."""
+    agents = {
+        'T': make_agent(tiger_spec, 'T', seed, tablebase, book),
+        'G': make_agent(goat_spec, 'G', None if seed is None else seed + 1, tablebase, book),
+    }
+    game = BaghChal(repetition_limit)
+    moves = []
+    move_ms = {'T': [], 'G': []}
+    reason = 'win'
+
+    while not game.winner:
+        if len(moves) >= max_plies:
+            reason = 'max-plies'
+            break
+        side = game.turn
+        start_time = time.perf_counter()
+        move = agents[side].get_best_move(game)
+        move_ms[side].append((time.perf_counter() - start_time) * 1000)
+        if move is None:
+            reason = 'no-moves'
+            break
+        start, end = move
+        ok = game.place_goat(*end) if start is None else game.make_move(start, end)
+        if not ok:
+            raise RuntimeError(f"Agent {side} played an illegal move {move}")
+        moves.append([start, end])
+    if game.winner == DRAW:
+        reason = 'repetition'
+
+    return {
+        'game': index,
+        'tiger': tiger_spec,
+        'goat': goat_spec,
+        'seed': seed,
+        'result': 'draw' if game.winner in (None, DRAW) else game.winner,
+        'reason': reason,
+        'plies': len(moves),
+        'goats_captured': game.goats_captured,
+        'moves': moves,
+        'move_ms': {side: [round(ms, 3) for ms in times] for side, times in move_ms.items()},
+    }
+
+
+def summarize(records):
+    """Aggregate win rates, game lengths and time per move."""
+    total = len(records)
+    results = [r['result'] for r in records]
+    plies = [r['plies'] for r in records]
+    summary = {
+        'games': total,
+        'tiger_win_rate': results.count('T') / total if total else 0.0,
+        'goat_win_rate': results.count('G') / total if total else 0.0,
+        'draw_rate': results.count('draw') / total if total else 0.0,
+        'mean_plies': statistics.mean(plies) if plies else 0.0,
+        'median_plies': statistics.median(plies) if plies else 0.0,
+    }
+    for side, label in (('T', 'tiger'), ('G', 'goat')):
+        times = [ms for r in records for ms in r['move_ms'][side]]
+        summary[f'{label}_mean_move_ms'] = statistics.mean(times) if times else 0.0
+        summary[f'{label}_max_move_ms'] = max(times) if times else 0.0
+    return summary
+
+
+def run(games, tiger_spec, goat_spec, workers, seed, out, max_plies=DEFAULT_MAX_PLIES,
+        tablebase=None, book=None, repetition_limit=REPETITION_LIMIT, archive=None):
+    """
+    Plays `games` games across `workers` processes, writing JSONL to `out`
+    (and appending to the GameArchive `archive`, if any) as they finish.
+    """
+    records = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_game, i, tiger_spec, goat_spec,
+                               None if seed is None else seed + 2 * i, max_plies, tablebase,
+                               book, repetition_limit)
+                   for i in range(games)]
+        for future in as_completed(futures):
+            record = future.result()
+            out.write(json.dumps(record, separators=(',', ':')) + '\n')
+            out.flush()
+            if archive is not None:
+                append_self_play(archive, record)
+            records.append(record)
+    return summarize(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Bagh-Chal self-play")
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--tiger', default='tiger:3', help="tiger agent spec")
+    parser.add_argument('--goat', default='random', help="goat agent spec")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--max-plies', type=int, default=DEFAULT_MAX_PLIES)
+    parser.add_argument('--repetition-limit', type=int, default=REPETITION_LIMIT,
+                        help="occurrences of a position that draw the game (0 = never)")
+    parser.add_argument('--out', default='-', help="JSONL output file ('-' for stdout)")
+    parser.add_argument('--tablebase', default=None, help="movement-phase table for the bots")
+    parser.add_argument('--book', default=None, help="placement-phase opening book for the bots")
+    parser.add_argument('--archive', default=None, help="also append games to this binary archive")
+    args = parser.parse_args()
+
+    # Validate specs before starting any workers
+    make_agent(args.tiger, 'T')
+    make_agent(args.goat, 'G')
+
+    out = sys.stdout if args.out == '-' else open(args.out, 'w')
+    archive = GameArchive(args.archive, 'a') if args.archive else None
+    try:
+        summary = run(args.games, args.tiger, args.goat, args.workers, args.seed, out,
+                      args.max_plies, args.tablebase, args.book, args.repetition_limit, archive)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if archive is not None:
+            archive.close()
+
+    print(f"Games: {summary['games']}", file=sys.stderr)
+    print(f"Tiger wins: {summary['tiger_win_rate']:.1%}  Goat wins: {summary['goat_win_rate']:.1%}"
+          f"  Draws: {summary['draw_rate']:.1%}", file=sys.stderr)
+    print(f"Game length: mean {summary['mean_plies']:.1f} plies, median {summary['median_plies']}",
+          file=sys.stderr)
+    print(f"Time per move: tiger {summary['tiger_mean_move_ms']:.1f} ms "
+          f"(max {summary['tiger_max_move_ms']:.1f}), goat {summary['goat_mean_move_ms']:.1f} ms",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
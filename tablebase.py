@@ -0,0 +1,461 @@
+"""
+Retrograde-analysis tablebase for the MOVEMENT phase.
+
+Once all 20 goats are placed a position is fully described by the 4 tiger
+points, the goat points, the number of captured goats (0-4) and the side to
+move. Every such position is solved offline and stored as one byte
+(win / loss with distance in plies, or draw) in a memory-mapped file, so
+a probe is an index computation plus one byte read.
+
+Usage:
+    python tablebase.py build --out baghchal.tb --workers 8
+    python tablebase.py verify --table baghchal.tb --samples 100000
+
+Layout: a small header followed by one slice per capture count. Within the
+slice for `c` captures there are always c + 1 empty points among the 21
+points not occupied by tigers, so a position is indexed by
+(rank of the tiger set, rank of the empty set, side to move).
+"""
+import argparse
+import itertools
+import math
+import mmap
+import os
+import random
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from game_logic import ADJACENT, CAPTURES_TO_WIN, FULL_MASK, JUMPS, NUM_POINTS, iter_bits
+
+MAGIC = b'BCTB'
+VERSION = 1
+NUM_SLICES = CAPTURES_TO_WIN # Capture counts 0..4; 5 captures is a finished game
+HEADER = struct.Struct('<4sI' + 'QQI' * NUM_SLICES)
+
+# Result of a probe, from the side to move's point of view
+WIN, LOSS, DRAW = 'W', 'L', 'D'
+
+# One byte per position:
+#   0         unresolved (a draw once the build is complete)
+#   1..127    side to move wins in (code - 1) plies
+#   128..255  side to move loses in (code - 128) plies
+MAX_WIN_DISTANCE = 126
+MAX_LOSS_DISTANCE = 127
+CHUNK = 1 << 18 # Positions per work unit
+
+NUM_TIGERS = 4
+BINOM = [[math.comb(n, k) for k in range(NUM_SLICES + 2)] for n in range(NUM_POINTS + 1)]
+
+# Tiger sets in a fixed order; FREE_POINTS[t] lists the 21 other points
+TIGER_SETS = [sum(1 << sq for sq in combo)
+              for combo in itertools.combinations(range(NUM_POINTS), NUM_TIGERS)]
+TIGER_RANK = {mask: i for i, mask in enumerate(TIGER_SETS)}
+FREE_POINTS = [tuple(sq for sq in range(NUM_POINTS) if not (mask >> sq) & 1)
+               for mask in TIGER_SETS]
+NUM_FREE = NUM_POINTS - NUM_TIGERS
+
+
+def win_code(distance):
+    if distance > MAX_WIN_DISTANCE:
+        raise ValueError(f"Win distance {distance} does not fit in one byte")
+    return 1 + distance
+
+
+def loss_code(distance):
+    if distance > MAX_LOSS_DISTANCE:
+        raise ValueError(f"Loss distance {distance} does not fit in one byte")
+    return 128 + distance
+
+
+def decode(code):
+    """Returns (result, distance) for a stored byte."""
+    if code == 0:
+        return DRAW, 0
+    if code < 128:
+        return WIN, code - 1
+    return LOSS, code - 128
+
+
+def empties_per_slice(captured):
+    return captured + 1
+
+
+def slice_size(captured):
+    return len(TIGER_SETS) * BINOM[NUM_FREE][empties_per_slice(captured)] * 2
+
+
+def index_of(tigers, goats, tiger_to_move):
+    """
+    Algorithm: Combinatorial Ranking
+    The empty points are ranked as a k-subset of the 21 non-tiger points in
+    colex order: rank = sum C(p_i, i) for the i-th smallest position p_i.
+    Only k = captured + 1 <= 5 points are visited.
+    """
+    empties = FULL_MASK ^ (tigers | goats)
+    rank = 0
+    i = 1
+    while empties:
+        low = empties & -empties
+        empties ^= low
+        p = low.bit_length() - 1 - bin(tigers & (low - 1)).count('1')
+        rank += BINOM[p][i]
+        i += 1
+    per_tiger = BINOM[NUM_FREE][i - 1]
+    return ((TIGER_RANK[tigers] * per_tiger + rank) << 1) | tiger_to_move
+
+
+def position_of(index, captured):
+    """Inverse of index_of: returns (tigers, goats, tiger_to_move)."""
+    k = empties_per_slice(captured)
+    tiger_to_move = index & 1
+    t, rank = divmod(index >> 1, BINOM[NUM_FREE][k])
+    tigers = TIGER_SETS[t]
+    free = FREE_POINTS[t]
+    empties = 0
+    for i in range(k, 0, -1):
+        p = i - 1
+        while p + 1 < NUM_FREE and BINOM[p + 1][i] <= rank:
+            p += 1
+        rank -= BINOM[p][i]
+        empties |= 1 << free[p]
+    goats = FULL_MASK ^ tigers ^ empties
+    return tigers, goats, tiger_to_move
+
+
+def _tiger_mobility(tigers, goats):
+    empty = FULL_MASK ^ (tigers | goats)
+    for sq in iter_bits(tigers):
+        if ADJACENT[sq] & empty:
+            return True
+        for over, land in JUMPS[sq]:
+            if (goats >> over) & 1 and (empty >> land) & 1:
+                return True
+    return False
+
+
+def _children(tigers, goats, tiger_to_move):
+    """Yields (tigers, goats, is_capture) for every move of the side to move."""
+    empty = FULL_MASK ^ (tigers | goats)
+    if tiger_to_move:
+        for sq in iter_bits(tigers):
+            for to in iter_bits(ADJACENT[sq] & empty):
+                yield tigers ^ (1 << sq) ^ (1 << to), goats, False
+            for over, land in JUMPS[sq]:
+                if (goats >> over) & 1 and (empty >> land) & 1:
+                    yield tigers ^ (1 << sq) ^ (1 << land), goats ^ (1 << over), True
+    else:
+        for sq in iter_bits(goats):
+            for to in iter_bits(ADJACENT[sq] & empty):
+                yield tigers, goats ^ (1 << sq) ^ (1 << to), False
+
+
+def _unmoves(tigers, goats, tiger_to_move):
+    """
+    Positions (same capture count) whose side to move could have made a
+    plain step to reach this one. The mover is the side NOT to move now.
+    """
+    empty = FULL_MASK ^ (tigers | goats)
+    if tiger_to_move: # Goats just moved
+        for sq in iter_bits(goats):
+            for back in iter_bits(ADJACENT[sq] & empty):
+                yield tigers, goats ^ (1 << sq) ^ (1 << back)
+    else: # Tigers just moved (steps only; jumps change the capture count)
+        for sq in iter_bits(tigers):
+            for back in iter_bits(ADJACENT[sq] & empty):
+                yield tigers ^ (1 << sq) ^ (1 << back), goats
+
+
+def _uncaptures(tigers, goats):
+    """Positions with one capture fewer (tiger to move) whose jump leads here."""
+    empty = FULL_MASK ^ (tigers | goats)
+    for sq in iter_bits(tigers):
+        # A jump frm -> sq over `over` is the mirror of the jump sq -> frm
+        for over, frm in JUMPS[sq]:
+            if (empty >> over) & 1 and (empty >> frm) & 1:
+                yield tigers ^ (1 << sq) ^ (1 << frm), goats | (1 << over)
+
+
+def _header_layout():
+    offsets, offset = [], HEADER.size
+    for captured in range(NUM_SLICES):
+        offsets.append(offset)
+        offset += slice_size(captured)
+    return offsets, offset
+
+
+SLICE_OFFSETS, TABLE_SIZE = _header_layout()
+
+
+class Tablebase:
+    """Read-only, memory-mapped view of a built table."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        fields = HEADER.unpack_from(self._mm, 0)
+        if fields[0] != MAGIC or fields[1] != VERSION:
+            raise ValueError(f"{path} is not a Bagh-Chal tablebase (version {VERSION})")
+        self.offsets = list(fields[2::3])
+        self.max_distances = list(fields[4::3])
+        self.probes = 0
+
+    def probe(self, game):
+        """
+        Returns (result, distance) for the side to move, or None when the
+        table does not cover the position (placement phase or game over).
+        """
+        if game.phase != 'MOVEMENT' or game.winner:
+            return None
+        self.probes += 1
+        captured = game.goats_captured
+        index = index_of(game.tigers, game.goats, 1 if game.turn == 'T' else 0)
+        return decode(self._mm[self.offsets[captured] + index])
+
+    def code_at(self, captured, index):
+        return self._mm[self.offsets[captured] + index]
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __getstate__(self):
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+
+# --- Builder (runs in worker processes) ---
+_table = None   # Writable mmap of the table being built
+_flags = None   # Candidate flags for the slice being solved, 1 byte per position
+
+
+def _open_maps(table_path, flags_path):
+    global _table, _flags
+    with open(table_path, 'r+b') as f:
+        _table = mmap.mmap(f.fileno(), 0)
+    with open(flags_path, 'r+b') as f:
+        _flags = mmap.mmap(f.fileno(), 0)
+
+
+def _code(captured, tigers, goats, tiger_to_move):
+    if captured == NUM_SLICES: # Fifth capture: tigers have won, goat to move
+        return loss_code(0)
+    return _table[SLICE_OFFSETS[captured] + index_of(tigers, goats, tiger_to_move)]
+
+
+def _init_chunk(captured, start, end):
+    """Round 0: terminal positions, plus (last slice) every position with a capture."""
+    base = SLICE_OFFSETS[captured]
+    resolved = 0
+    for index in range(start, end):
+        tigers, goats, tiger_to_move = position_of(index, captured)
+        if not _tiger_mobility(tigers, goats):
+            # Tigers trapped: goats have won, whoever is to move
+            _table[base + index] = loss_code(0) if tiger_to_move else win_code(0)
+            resolved += 1
+        elif not tiger_to_move and next(_children(tigers, goats, 0), None) is None:
+            _table[base + index] = loss_code(0) # Goats cannot move
+            resolved += 1
+        elif tiger_to_move and captured == NUM_SLICES - 1:
+            if any(capture for _, _, capture in _children(tigers, goats, 1)):
+                _flags[index] = 1 # Winning capture, solved in round 1
+    return resolved
+
+
+def _scan_codes(base, start, end, codes):
+    """Yields slice indices in [start, end) whose byte is one of `codes`."""
+    for code in codes:
+        needle = bytes([code])
+        pos = _table.find(needle, base + start, base + end)
+        while pos != -1:
+            yield pos - base
+            pos = _table.find(needle, pos + 1, base + end)
+
+
+def _mark_chunk(captured, distance, from_next_slice, start, end):
+    """
+    Marks as candidates the unresolved predecessors of positions resolved at
+    `distance`: plain unmoves inside this slice, or uncaptures from the next.
+    """
+    base = SLICE_OFFSETS[captured]
+    codes = []
+    if distance <= MAX_WIN_DISTANCE:
+        codes.append(win_code(distance))
+    codes.append(loss_code(distance))
+    marked = 0
+    if from_next_slice:
+        source = captured + 1
+        for index in _scan_codes(SLICE_OFFSETS[source], start, end, codes):
+            tigers, goats, tiger_to_move = position_of(index, source)
+            if tiger_to_move:
+                continue # After a capture it is always the goats' turn
+            for ptigers, pgoats in _uncaptures(tigers, goats):
+                pred = index_of(ptigers, pgoats, 1)
+                if not _table[base + pred]:
+                    _flags[pred] = 1
+                    marked += 1
+    else:
+        for index in _scan_codes(base, start, end, codes):
+            tigers, goats, tiger_to_move = position_of(index, captured)
+            mover = 1 - tiger_to_move
+            for ptigers, pgoats in _unmoves(tigers, goats, tiger_to_move):
+                pred = index_of(ptigers, pgoats, mover)
+                if not _table[base + pred]:
+                    _flags[pred] = 1
+                    marked += 1
+    return marked
+
+
+def _solve_chunk(captured, round_no, start, end):
+    """
+    Algorithm: Retrograde Round
+    A flagged, unresolved position is a WIN if some child is a LOSS found
+    in an earlier round, and a LOSS if every child is a WIN found in an
+    earlier round. Distances therefore grow by exactly one per round.
+    """
+    base = SLICE_OFFSETS[captured]
+    resolved = 0
+    pos = _flags.find(b'\x01', start, end)
+    while pos != -1:
+        _flags[pos] = 0
+        if not _table[base + pos]:
+            tigers, goats, tiger_to_move = position_of(pos, captured)
+            best_loss = None
+            worst_win = -1
+            all_wins = True
+            for ctigers, cgoats, capture in _children(tigers, goats, tiger_to_move):
+                result, dist = decode(_code(captured + capture, ctigers, cgoats, 1 - tiger_to_move))
+                if dist >= round_no or result == DRAW:
+                    all_wins = False
+                    continue
+                if result == LOSS:
+                    if best_loss is None or dist < best_loss:
+                        best_loss = dist
+                    all_wins = False
+                elif dist > worst_win:
+                    worst_win = dist
+            if best_loss is not None:
+                _table[base + pos] = win_code(best_loss + 1)
+                resolved += 1
+            elif all_wins:
+                _table[base + pos] = loss_code(worst_win + 1)
+                resolved += 1
+        pos = _flags.find(b'\x01', pos + 1, end)
+    return resolved
+
+
+def _run(pool, fn, captured, *args, size=None):
+    size = slice_size(captured) if size is None else size
+    jobs = [pool.submit(fn, captured, *args, start, min(start + CHUNK, size))
+            for start in range(0, size, CHUNK)]
+    return sum(job.result() for job in jobs)
+
+
+def build(path, workers=None, log=print):
+    """
+    Solves every slice from 4 captures down to 0 and writes the table to
+    `path`. Memory use is bounded by the two memory-mapped files (table and
+    a one-byte-per-position flag file), independent of the worker count.
+    """
+    with open(path, 'wb') as f:
+        f.truncate(TABLE_SIZE)
+    flags_path = path + '.flags'
+    with open(flags_path, 'wb') as f:
+        f.truncate(max(slice_size(c) for c in range(NUM_SLICES)))
+
+    max_distances = [0] * NUM_SLICES
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_open_maps,
+                                 initargs=(path, flags_path)) as pool:
+            for captured in range(NUM_SLICES - 1, -1, -1):
+                start_time = time.perf_counter()
+                resolved = _run(pool, _init_chunk, captured)
+                # Capture children live in the next slice (already solved)
+                next_max = max_distances[captured + 1] if captured + 1 < NUM_SLICES else 0
+                round_no = 1
+                while True:
+                    _run(pool, _mark_chunk, captured, round_no - 1, False)
+                    if captured + 1 < NUM_SLICES and round_no - 1 <= next_max:
+                        _run(pool, _mark_chunk, captured, round_no - 1, True,
+                             size=slice_size(captured + 1))
+                    newly = _run(pool, _solve_chunk, captured, round_no)
+                    resolved += newly
+                    if newly:
+                        max_distances[captured] = round_no
+                    if not newly and round_no > next_max:
+                        break
+                    round_no += 1
+                log(f"captures={captured}: {slice_size(captured)} positions, {resolved} decided, "
+                    f"max distance {max_distances[captured]}, "
+                    f"{time.perf_counter() - start_time:.0f}s")
+    finally:
+        os.remove(flags_path)
+
+    fields = [MAGIC, VERSION]
+    for captured in range(NUM_SLICES):
+        fields += [SLICE_OFFSETS[captured], slice_size(captured), max_distances[captured]]
+    with open(path, 'r+b') as f:
+        f.write(HEADER.pack(*fields))
+
+
+def verify(path, samples, seed=0):
+    """
+    Checks random entries against their children: a win needs a losing
+    child one ply closer, a loss needs every child to be a win.
+    Returns the number of inconsistent entries.
+    """
+    table = Tablebase(path)
+    rng = random.Random(seed)
+    bad = 0
+    for _ in range(samples):
+        captured = rng.randrange(NUM_SLICES)
+        index = rng.randrange(slice_size(captured))
+        tigers, goats, tiger_to_move = position_of(index, captured)
+        result, dist = decode(table.code_at(captured, index))
+        children = []
+        for ctigers, cgoats, capture in _children(tigers, goats, tiger_to_move):
+            c = captured + capture
+            if c == NUM_SLICES:
+                children.append((LOSS, 0))
+            else:
+                children.append(decode(table.code_at(c, index_of(ctigers, cgoats, 1 - tiger_to_move))))
+        if dist == 0 and result != DRAW:
+            continue # Terminal entries
+        if result == WIN:
+            ok = min((d for r, d in children if r == LOSS), default=None) == dist - 1
+        elif result == LOSS:
+            ok = all(r == WIN for r, _ in children) and max(d for _, d in children) == dist - 1
+        else:
+            ok = not any(r == LOSS for r, _ in children) and not all(r == WIN for r, _ in children)
+        bad += not ok
+    table.close()
+    return bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bagh-Chal movement-phase tablebase")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_build = sub.add_parser('build', help="solve all movement-phase positions")
+    p_build.add_argument('--out', default='baghchal.tb')
+    p_build.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    p_verify = sub.add_parser('verify', help="spot-check a built table")
+    p_verify.add_argument('--table', default='baghchal.tb')
+    p_verify.add_argument('--samples', type=int, default=100000)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        total = sum(slice_size(c) for c in range(NUM_SLICES))
+        print(f"Building {total} positions ({TABLE_SIZE / 2**20:.0f} MiB) into {args.out}")
+        build(args.out, args.workers)
+    elif args.command == 'verify':
+        bad = verify(args.table, args.samples)
+        print(f"{args.samples} samples, {bad} inconsistent")
+        if bad:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import random
+
+import pytest
+
+from archive import GameArchive, build_index, decode_move, encode_move
+from game_logic import BaghChal
+from position import Position
+
+
+def random_game(rng, start=None):
+    """Moves and winner of a random game from `start` (a Position) or the initial position."""
+    game = BaghChal(None) if start is None else start.to_game(None)
+    moves = []
+    while not game.winner and game.legal_moves() and len(moves) < 200:
+        move = rng.choice(game.legal_moves())
+        moves.append(move)
+        game.apply(move)
+    return moves, game.winner
+
+
+@pytest.fixture
+def games():
+    """(moves, winner, start) of 30 games from the initial position and 5 from a later one."""
+    rng = random.Random(0)
+    played = [random_game(rng) + (None,) for _ in range(30)]
+    start_game = BaghChal(None)
+    for move in played[0][0][:25]:
+        start_game.apply(move)
+    start = Position.from_game(start_game)
+    return played + [random_game(rng, start) + (start,) for _ in range(5)]
+
+
+def test_every_legal_move_fits_one_byte():
+    rng = random.Random(1)
+    for _ in range(20):
+        game = BaghChal(None)
+        while not game.winner and game.legal_moves():
+            for move in game.legal_moves():
+                code = encode_move(move)
+                assert 0 <= code < 256
+                assert decode_move(game, code) == move
+            game.apply(rng.choice(game.legal_moves()))
+
+
+def test_append_and_replay(tmp_path, games):
+    path = str(tmp_path / 'games.bca')
+    with GameArchive(path, 'a') as archive:
+        offsets = [archive.append(moves, winner, {'n': i}, start)
+                   for i, (moves, winner, start) in enumerate(games)]
+    with GameArchive(path) as archive:
+        assert len(archive) == len(games)
+        for record, offset, (moves, winner, start) in zip(archive, offsets, games):
+            assert record.offset == offset
+            assert record.result == winner
+            assert record.start == start
+            assert GameArchive.decoded_moves(record) == moves
+            final = None
+            for final in GameArchive.replay(record):
+                pass
+            assert final.winner == winner
+        assert archive.read_game(offsets[3]).metadata == {'n': 3}
+
+
+def test_reopen_appends_after_existing_games(tmp_path, games):
+    path = str(tmp_path / 'games.bca')
+    for moves, winner, start in games[:3]:
+        with GameArchive(path, 'a') as archive:
+            archive.append(moves, winner, None, start)
+    with GameArchive(path) as archive:
+        assert [record.plies for record in archive] == [len(g[0]) for g in games[:3]]
+
+
+def test_corrupt_move_is_rejected():
+    with pytest.raises(ValueError):
+        decode_move(BaghChal(), 0) # Goats cannot step during placement
+
+
+def test_index_matches_a_full_scan(tmp_path, games):
+    path = str(tmp_path / 'games.bca')
+    with GameArchive(path, 'a') as archive:
+        for moves, winner, start in games[:20]:
+            archive.append(moves, winner, None, start)
+    with GameArchive(path) as archive:
+        build_index(archive, run_entries=100) # Forces spilled runs
+    with GameArchive(path, 'a') as archive: # Unindexed tail
+        for moves, winner, start in games[20:]:
+            archive.append(moves, winner, None, start)
+
+    rng = random.Random(2)
+    with GameArchive(path) as archive:
+        records = list(archive)
+        for _ in range(50):
+            record = rng.choice(records)
+            ply = rng.randrange(record.plies + 1)
+            for i, game in enumerate(GameArchive.replay(record)):
+                if i == ply:
+                    target = game.hash
+                    break
+            expected = [r.offset for r in records
+                        if any(g.hash == target for g in GameArchive.replay(r))]
+            probe = BaghChal()
+            probe.hash = target
+            assert archive.games_reaching(probe) == expected
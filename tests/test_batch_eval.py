@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from batch_eval import boards_from_games, boards_from_packed, evaluate_batch # noqa: E402
+from game_logic import BaghChal # noqa: E402
+from goat_bot import GoatBot # noqa: E402
+from position import Position # noqa: E402
+from tiger_bot import DEFAULT_WEIGHTS, TigerBot # noqa: E402
+
+TUNED = {'capture': 900, 'mobility': 12, 'threat': 35, 'trapped': -60}
+
+
+@pytest.fixture(scope='module')
+def games():
+    """Positions from random games, all phases, a few decided."""
+    rng = random.Random(0)
+    games = []
+    while len(games) < 600:
+        game = BaghChal(None)
+        while not game.winner and len(games) < 600:
+            game.apply(rng.choice(game.legal_moves()))
+            games.append(Position.from_game(game).to_game(None))
+    return games
+
+
+@pytest.mark.parametrize('weights', [DEFAULT_WEIGHTS, TUNED], ids=['default', 'tuned'])
+def test_batch_matches_evaluate(games, weights):
+    boards, captured = boards_from_games(games)
+    result = evaluate_batch(boards, captured, chunk_size=128, tiger_weights=weights)
+    tiger, goat = TigerBot(weights=weights), GoatBot()
+    for i, game in enumerate(games):
+        moves, trapped, vulnerable = game.tiger_mobility()
+        assert result['mobility'][i] == moves
+        assert result['trapped'][i] == trapped
+        assert result['threats'][i] == bin(vulnerable).count('1')
+        assert result['tiger_score'][i] == tiger.evaluate(game)
+        assert result['goat_score'][i] == goat.evaluate(game)
+
+
+def test_packed_positions_give_the_same_boards(games):
+    boards, captured = boards_from_games(games)
+    packed = np.array([Position.from_game(game).packed for game in games], dtype=np.uint64)
+    packed_boards, packed_captured = boards_from_packed(packed)
+    assert (packed_boards == boards).all()
+    assert (packed_captured == captured).all()
+    assert (boards == np.array([sum(game.board, []) for game in games])).all()
@@ -0,0 +1,75 @@
+import copy
+import random
+from collections import Counter
+
+import pytest
+
+from game_logic import BaghChal
+
+
+def snapshot(game):
+    """Everything apply/undo must put back: board, counters, hash, history, tiger data."""
+    return (game.state(), list(game.history), dict(game.position_counts),
+            game.tiger_mobility(), list(game.tiger_move_counts), list(game.tiger_threats))
+
+
+def assert_consistent(game):
+    """Incremental bookkeeping equals a full recomputation."""
+    assert game.hash == game.compute_hash()
+    fresh = copy.deepcopy(game)
+    fresh._rescan_tigers()
+    assert game.tiger_mobility() == fresh.tiger_mobility()
+    assert game.tiger_move_counts == fresh.tiger_move_counts
+    assert game.tiger_threats == fresh.tiger_threats
+    assert game.history[-1] == game.hash
+    assert game.position_counts == dict(Counter(game.history))
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_apply_undo_round_trip(seed):
+    rng = random.Random(seed)
+    game = BaghChal()
+    snapshots, tokens = [], []
+    for _ in range(120):
+        moves = game.legal_moves()
+        if not moves:
+            break
+        assert_consistent(game)
+        snapshots.append(snapshot(game))
+        tokens.append(game.apply(rng.choice(moves)))
+    assert_consistent(game)
+    while tokens:
+        game.undo(tokens.pop())
+        assert snapshot(game) == snapshots.pop()
+        assert_consistent(game)
+
+
+def test_undo_restores_initial_position():
+    game = BaghChal()
+    start = snapshot(game)
+    token = game.apply(game.legal_moves()[0])
+    assert snapshot(game) != start
+    game.undo(token)
+    assert snapshot(game) == start
+
+
+def test_blocked_goats_lose():
+    # One empty point, (0, 1), and only tigers next to it
+    board = [[1] * 5 for _ in range(5)]
+    board[0][1] = 0
+    for r, c in [(0, 0), (0, 2), (1, 1), (4, 4)]:
+        board[r][c] = -1
+    assert BaghChal.from_board(board, 'G', 20, 0).winner == 'T'
+    assert BaghChal.from_board(board, 'T', 20, 0).winner is None
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_undecided_games_have_moves(seed):
+    rng = random.Random(seed)
+    game = BaghChal(None)
+    for _ in range(300):
+        if game.winner:
+            assert game.legal_moves() == []
+            break
+        assert game.legal_moves()
+        game.apply(rng.choice(game.legal_moves()))
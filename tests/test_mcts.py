@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from game_logic import BaghChal, square
+from mcts import MCTSBot
+
+
+def to_move(best_move):
+    """(start_pos, end_pos) coordinates back to a (from_sq, to_sq) move."""
+    start, end = best_move
+    return (None if start is None else square(*start), square(*end))
+
+
+def random_game(rng, plies):
+    game = BaghChal()
+    for _ in range(plies):
+        moves = game.legal_moves()
+        if game.winner or not moves:
+            break
+        game.apply(rng.choice(moves))
+    return game
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_best_move_is_legal(seed):
+    rng = random.Random(seed)
+    game = random_game(rng, rng.randrange(0, 40))
+    assert game.winner is None
+    bot = MCTSBot(simulations=64, batch_size=8, seed=seed)
+    best = bot.get_best_move(game)
+    assert to_move(best) in game.legal_moves()
+    assert bot.stats.best_move == best
+
+
+def test_decided_game_has_no_move():
+    rng = random.Random(1)
+    game = BaghChal()
+    while game.winner is None:
+        game.apply(rng.choice(game.legal_moves()))
+    assert MCTSBot(simulations=16, seed=0).get_best_move(game) is None
+
+
+def test_reply_subtree_becomes_root():
+    game = random_game(random.Random(3), 10)
+    bot = MCTSBot(simulations=400, batch_size=8, seed=3)
+    game.apply(to_move(bot.get_best_move(game)))
+    ours = max(bot.root.children, key=lambda child: child.visits)
+    # The opponent answers with a reply the tree already explored
+    reply = max(ours.children, key=lambda child: child.visits)
+    game.apply(reply.move)
+    visits = reply.visits
+    assert visits > 0
+
+    best = bot.get_best_move(game)
+    assert bot.root is reply
+    assert reply.parent is None and reply.move is None
+    assert bot.reused == visits
+    assert reply.visits == visits + bot.nodes
+    assert to_move(best) in game.legal_moves()
+
+
+def test_reuse_off_starts_fresh_tree():
+    game = random_game(random.Random(3), 10)
+    bot = MCTSBot(simulations=200, batch_size=8, seed=3, reuse_tree=False)
+    game.apply(to_move(bot.get_best_move(game)))
+    ours = max(bot.root.children, key=lambda child: child.visits)
+    game.apply(max(ours.children, key=lambda child: child.visits).move)
+    bot.get_best_move(game)
+    assert bot.reused == 0
+    assert bot.root.visits == bot.nodes
@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from game_logic import SYMMETRIES, BaghChal, transform_mask
+from opening_book import OpeningBook, canonical
+
+
+def random_game(seed, plies):
+    rng = random.Random(seed)
+    game = BaghChal()
+    for _ in range(plies):
+        game.apply(rng.choice(game.legal_moves()))
+    return game
+
+
+def image(game, sym):
+    """`game` seen through symmetry `sym`."""
+    return BaghChal.from_bitboards(transform_mask(game.goats, sym), transform_mask(game.tigers, sym),
+                                   game.turn, game.goats_placed, game.goats_captured)
+
+
+def map_move(move, sym):
+    frm, to = move
+    perm = SYMMETRIES[sym]
+    return (None if frm is None else perm[frm], perm[to])
+
+
+@pytest.mark.parametrize('seed,plies', [(0, 3), (1, 6), (2, 9), (3, 44), (4, 47)])
+def test_entry_serves_every_image(seed, plies):
+    game = random_game(seed, plies)
+    move = random.Random(seed).choice(game.legal_moves())
+    book = OpeningBook()
+    book.add(game, move, 5, 42)
+    assert len(book) == 1
+    for sym in range(len(SYMMETRIES)):
+        seen = image(game, sym)
+        assert canonical(seen)[0] == canonical(game)[0]
+        assert book.lookup(seen) == map_move(move, sym)
+
+
+@pytest.mark.parametrize('sym', range(len(SYMMETRIES)))
+def test_entry_added_from_an_image_maps_back(sym):
+    game = random_game(5, 7)
+    move = game.legal_moves()[0]
+    book = OpeningBook()
+    book.add(image(game, sym), map_move(move, sym), 5, 0)
+    assert book.lookup(game) == move
+
+
+def test_symmetric_position_returns_legal_move():
+    game = BaghChal() # Every symmetry leaves the start position unchanged
+    book = OpeningBook()
+    book.add(game, (None, 1), 5, 0)
+    for sym in range(len(SYMMETRIES)):
+        move = book.lookup(image(game, sym))
+        assert move in game.legal_moves()
+
+
+def test_missing_or_stale_entry_is_none():
+    game = random_game(6, 4)
+    book = OpeningBook()
+    assert book.lookup(game) is None
+    key, sym = canonical(game)
+    occupied = transform_mask(game.goats, sym) # Placing on a goat, in the book's orientation
+    book.entries[key] = ((None, occupied.bit_length() - 1), 5, 0)
+    assert book.lookup(game) is None
+    assert book.hits == 0
+
+
+def test_save_and_load_keep_entries(tmp_path):
+    book = OpeningBook()
+    for seed, plies in [(0, 3), (3, 44)]:
+        game = random_game(seed, plies)
+        book.add(game, game.legal_moves()[-1], 6, -17)
+    path = tmp_path / 'test.book'
+    book.save(path)
+    assert OpeningBook(path).entries == book.entries
@@ -0,0 +1,31 @@
+import pytest
+
+from benchmark import FIXTURES, load_fixture
+from goat_bot import GoatBot
+from position import Position
+from tiger_bot import TigerBot
+
+# Random placement-phase positions where splitting the root once changed the result
+SPLIT_SENSITIVE = ['250002001a009600', '2044202520019804', 'ad04078102402900',
+                   '06e3a080000eb001', '3537d0801002b604']
+POSITIONS = [load_fixture(name) for name in FIXTURES]
+POSITIONS += [Position.from_bytes(bytes.fromhex(data)).to_game() for data in SPLIT_SENSITIVE]
+
+
+def search(game, workers, options):
+    bot = (TigerBot if game.turn == 'T' else GoatBot)(depth=4, seed=7, workers=workers,
+                                                      **options)
+    try:
+        move = bot.get_best_move(game)
+    finally:
+        bot.close()
+    return move, bot.stats.score
+
+
+@pytest.mark.parametrize('options', [{}, {'pruning': True, 'quiescence': True}],
+                         ids=['plain', 'pruning'])
+def test_seeded_search_ignores_worker_count(options):
+    for game in POSITIONS:
+        serial = search(game, 1, options)
+        assert search(game, 2, options) == serial
+        assert search(game, 3, options) == serial
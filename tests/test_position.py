@@ -0,0 +1,74 @@
+import pickle
+import random
+
+import pytest
+
+from game_logic import BaghChal
+from position import POSITION_BYTES, Position
+
+
+def random_games(count, seed):
+    """Positions from random play, one per ply, as independent games."""
+    rng = random.Random(seed)
+    games = []
+    game = BaghChal()
+    while len(games) < count:
+        moves = game.legal_moves()
+        if not moves:
+            game = BaghChal()
+            continue
+        game.apply(rng.choice(moves))
+        games.append(Position.from_game(game).to_game())
+    return games
+
+
+@pytest.mark.parametrize('game', random_games(200, 0))
+def test_to_game_round_trip(game):
+    position = Position.from_game(game)
+    rebuilt = position.to_game()
+    assert rebuilt.state() == game.state()
+    assert rebuilt.hash == rebuilt.compute_hash()
+    assert rebuilt.tiger_mobility() == game.tiger_mobility()
+    assert Position.from_game(rebuilt) == position
+
+
+def test_to_game_history_starts_at_the_position():
+    game = random_games(30, 1)[-1]
+    rebuilt = Position.from_game(game).to_game()
+    assert rebuilt.history == [rebuilt.hash]
+    assert rebuilt.position_counts == {rebuilt.hash: 1}
+    assert rebuilt.repetitions() == 1
+
+
+def test_to_game_repetition_limit():
+    position = Position.from_game(random_games(30, 2)[-1])
+    assert position.to_game().repetition_limit == 3
+    assert position.to_game(None).repetition_limit is None
+    assert position.to_game(5).repetition_limit == 5
+
+
+def test_from_bitboards_matches_from_board():
+    for game in random_games(50, 3):
+        rebuilt = BaghChal.from_bitboards(game.goats, game.tigers, game.turn, game.goats_placed,
+                                          game.goats_captured)
+        board = BaghChal.from_board(game.board, game.turn, game.goats_placed, game.goats_captured)
+        assert rebuilt.state() == board.state() == game.state()
+        assert rebuilt.tiger_move_counts == board.tiger_move_counts
+
+
+def test_bytes_and_pickle_round_trip():
+    for game in random_games(50, 2):
+        position = Position.from_game(game)
+        data = position.to_bytes()
+        assert len(data) == POSITION_BYTES
+        assert Position.from_bytes(data) == position
+        assert pickle.loads(pickle.dumps(position)) == position
+        assert hash(Position.from_packed(position.packed)) == hash(position)
+
+
+def test_position_is_immutable():
+    position = Position.from_game(BaghChal())
+    with pytest.raises(AttributeError):
+        position.packed = 0
+    with pytest.raises(ValueError):
+        Position.from_bytes(b'\x00' * (POSITION_BYTES - 1))
@@ -0,0 +1,43 @@
+import math
+
+import pytest
+
+from benchmark import load_fixture
+from game_logic import BaghChal
+from goat_bot import GoatBot
+from tiger_bot import TigerBot
+
+
+def hanging_goat_position():
+    """Goat to move after the quiet tiger step (3,1)-(3,2); the goat on (2,2) hangs."""
+    board = [[0] * 5 for _ in range(5)]
+    for r, c in [(2, 2), (0, 2), (4, 2)]:
+        board[r][c] = 1
+    for r, c in [(0, 0), (0, 4), (3, 2), (3, 3)]:
+        board[r][c] = -1
+    return BaghChal.from_board(board, 'G', 3, 0)
+
+
+def plain_score(bot_class, game, depth):
+    bot = bot_class(depth=depth, seed=0, pruning=False, quiescence=False)
+    bot.get_best_move(game)
+    return bot.stats.score
+
+
+def test_goat_may_give_up_a_hanging_goat():
+    game = hanging_goat_position()
+    bot = TigerBot(seed=0)
+    # Tiger's view of a goat-to-move position
+    score = -bot.quiesce(game, -math.inf, math.inf, 6)
+    deep = -plain_score(GoatBot, game, 6)
+    assert abs(score - deep) < bot.capture_value() // 2
+
+
+@pytest.mark.parametrize('name', ['opening', 'midgame'])
+def test_quiescence_agrees_with_a_deeper_plain_search(name):
+    game = load_fixture(name)
+    bot_class = TigerBot if game.turn == 'T' else GoatBot
+    bot = bot_class(depth=5, seed=0, pruning=False, quiescence=True)
+    bot.get_best_move(game)
+    deep = plain_score(bot_class, game, 7)
+    assert abs(bot.stats.score - deep) < bot.capture_value() // 2
@@ -0,0 +1,89 @@
+import pytest
+
+from benchmark import load_fixture
+from game_logic import DRAW
+from goat_bot import GoatBot
+from position import Position
+from tiger_bot import TigerBot
+
+
+def find_cycle(game):
+    """Four moves that bring `game` back to its current position."""
+    root = game.hash
+    for a in game.legal_moves():
+        ta = game.apply(a)
+        for b in game.legal_moves():
+            tb = game.apply(b)
+            for c in game.legal_moves():
+                tc = game.apply(c)
+                for d in game.legal_moves():
+                    td = game.apply(d)
+                    back = game.hash == root
+                    game.undo(td)
+                    if back:
+                        game.undo(tc)
+                        game.undo(tb)
+                        game.undo(ta)
+                        return [a, b, c, d]
+                game.undo(tc)
+            game.undo(tb)
+        game.undo(ta)
+    raise AssertionError("no four-move cycle")
+
+
+def test_threefold_repetition_draws_and_undo_reverts_it():
+    game = load_fixture('fortress')
+    cycle = find_cycle(game)
+    tokens = []
+    for _ in range(2):
+        for move in cycle:
+            assert game.winner is None
+            tokens.append(game.apply(move))
+    assert game.repetitions() == 3
+    assert game.winner == DRAW
+    assert game.legal_moves() == []
+
+    game.undo(tokens.pop())
+    assert game.winner is None
+    assert game.repetitions() == 2 # The position before the last move, seen in both cycles
+
+
+def test_no_limit_never_draws():
+    game = load_fixture('fortress')
+    game.repetition_limit = None
+    cycle = find_cycle(game)
+    for _ in range(3):
+        for move in cycle:
+            game.apply(move)
+    assert game.repetitions() == 4
+    assert game.winner is None
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_search_sees_repeated_root(workers):
+    game = load_fixture('fortress')
+    for move in find_cycle(game):
+        game.apply(move)
+    assert game.repetitions() == 2
+    bot_class = GoatBot if game.turn == 'G' else TigerBot
+    bot = bot_class(depth=6, workers=workers, seed=0)
+    try:
+        bot.get_best_move(game)
+    finally:
+        bot.close()
+    assert bot.stats.score == 0
+
+
+@pytest.mark.parametrize('depth', [6, 8])
+def test_table_keeps_no_repetition_draws(depth):
+    game = load_fixture('fortress')
+    for move in find_cycle(game)[:2]: # Halfway round: going on repeats the fixture
+        game.apply(move)
+    fresh = Position.from_game(game).to_game() # Same position, no earlier occurrences
+    bot_class = GoatBot if game.turn == 'G' else TigerBot
+    bot = bot_class(depth=depth)
+    bot.get_best_move(game)
+    bot.get_best_move(fresh) # Same table, which must not hold the draws seen above
+    clean = bot_class(depth=depth)
+    clean.get_best_move(fresh)
+    assert bot.stats.score == clean.stats.score
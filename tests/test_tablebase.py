@@ -0,0 +1,96 @@
+"""
+The builder's worker functions run in-process on a sparse table file, over
+only the few indices each check needs, so no full build is required.
+"""
+import pytest
+
+import tablebase
+from tablebase import (DRAW, LOSS, MAX_LOSS_DISTANCE, MAX_WIN_DISTANCE, NUM_SLICES, WIN,
+                       decode, index_of, loss_code, position_of, slice_size, win_code)
+
+
+@pytest.fixture
+def table(tmp_path):
+    """Opens an empty (sparse) table and flag file as the builder's worker maps."""
+    path = str(tmp_path / 'small.tb')
+    with open(path, 'wb') as f:
+        f.truncate(tablebase.TABLE_SIZE)
+    with open(path + '.flags', 'wb') as f:
+        f.truncate(max(slice_size(c) for c in range(NUM_SLICES)))
+    tablebase._open_maps(path, path + '.flags')
+    yield tablebase
+    tablebase._table.close()
+    tablebase._flags.close()
+    tablebase._table = tablebase._flags = None
+
+
+def capture_position(captured):
+    """The first tiger-to-move index in slice `captured` with a capture, and one capture child."""
+    for index in range(1, slice_size(captured), 2):
+        tigers, goats, tiger_to_move = position_of(index, captured)
+        for ctigers, cgoats, capture in tablebase._children(tigers, goats, tiger_to_move):
+            if capture:
+                return index, index_of(ctigers, cgoats, 0)
+    raise AssertionError(f"no capture in slice {captured}")
+
+
+def code(captured, index):
+    return tablebase._table[tablebase.SLICE_OFFSETS[captured] + index]
+
+
+def test_codes_round_trip():
+    for distance in range(MAX_WIN_DISTANCE + 1):
+        assert decode(win_code(distance)) == (WIN, distance)
+    for distance in range(MAX_LOSS_DISTANCE + 1):
+        assert decode(loss_code(distance)) == (LOSS, distance)
+
+
+def test_codes_at_the_byte_limits():
+    assert win_code(MAX_WIN_DISTANCE) == 127
+    assert loss_code(MAX_LOSS_DISTANCE) == 255
+    assert decode(0) == (DRAW, 0)
+    with pytest.raises(ValueError):
+        win_code(MAX_WIN_DISTANCE + 1)
+    with pytest.raises(ValueError):
+        loss_code(MAX_LOSS_DISTANCE + 1)
+
+
+def test_winning_capture_in_last_slice(table):
+    captured = NUM_SLICES - 1
+    index, _ = capture_position(captured)
+    table._init_chunk(captured, index, index + 1)
+    assert table._flags[index] == 1
+    assert table._solve_chunk(captured, 1, index, index + 1) == 1
+    assert decode(code(captured, index)) == (WIN, 1)
+
+
+@pytest.mark.parametrize('captured', range(1, NUM_SLICES))
+@pytest.mark.parametrize('distance', [0, 7, MAX_WIN_DISTANCE - 1])
+def test_capture_into_a_lost_position_wins(table, captured, distance):
+    # A goat-to-move loss in slice `captured` makes the tiger-to-move
+    # position that captured into it a win in the slice below
+    parent, child = capture_position(captured - 1)
+    table._table[table.SLICE_OFFSETS[captured] + child] = loss_code(distance)
+    assert table._mark_chunk(captured - 1, distance, True, child, child + 1) >= 1
+    assert table._flags[parent] == 1
+    assert table._solve_chunk(captured - 1, distance + 1, parent, parent + 1) == 1
+    assert decode(code(captured - 1, parent)) == (WIN, distance + 1)
+
+
+def test_capture_into_a_long_loss_does_not_fit(table):
+    parent, child = capture_position(0)
+    table._table[table.SLICE_OFFSETS[1] + child] = loss_code(MAX_LOSS_DISTANCE)
+    # Past MAX_WIN_DISTANCE only loss codes are scanned, and still found
+    assert table._mark_chunk(0, MAX_LOSS_DISTANCE, True, child, child + 1) >= 1
+    assert table._flags[parent] == 1
+    with pytest.raises(ValueError):
+        table._solve_chunk(0, MAX_LOSS_DISTANCE + 1, parent, parent + 1)
+
+
+def test_capture_child_not_yet_resolved_is_skipped(table):
+    # A loss found in the same round it is looked up in is not used yet
+    parent, child = capture_position(2)
+    table._table[table.SLICE_OFFSETS[3] + child] = loss_code(5)
+    table._flags[parent] = 1
+    assert table._solve_chunk(2, 5, parent, parent + 1) == 0
+    assert code(2, parent) == 0
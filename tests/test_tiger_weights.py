@@ -0,0 +1,45 @@
+import json
+import os
+
+import pytest
+
+import tiger_bot
+from tiger_bot import DEFAULT_WEIGHTS, TigerBot
+
+
+@pytest.fixture
+def weights_file(tmp_path, monkeypatch):
+    """A path TigerBot reads its tuned weights from, with nothing loaded yet."""
+    path = tmp_path / 'tiger_weights.json'
+    monkeypatch.setattr(tiger_bot, 'WEIGHTS_PATH', str(path))
+    monkeypatch.setattr(tiger_bot, '_tuned_weights', None)
+    return path
+
+
+def test_weights_path_is_next_to_the_module():
+    assert os.path.isabs(tiger_bot.WEIGHTS_PATH)
+    assert os.path.dirname(tiger_bot.WEIGHTS_PATH) == os.path.dirname(tiger_bot.__file__)
+
+
+def test_missing_file_uses_defaults(weights_file):
+    assert TigerBot().weights == DEFAULT_WEIGHTS
+
+
+def test_tuned_file_is_read_on_first_use(weights_file):
+    weights_file.write_text(json.dumps({'mobility': 12, 'threat': 30}))
+    assert TigerBot().weights == dict(DEFAULT_WEIGHTS, mobility=12, threat=30)
+    weights_file.write_text(json.dumps({'mobility': 99}))
+    assert TigerBot().weights['mobility'] == 12 # Read once per process
+
+
+def test_explicit_weights_win(weights_file):
+    weights_file.write_text(json.dumps({'mobility': 12}))
+    assert TigerBot(weights=DEFAULT_WEIGHTS).weights == DEFAULT_WEIGHTS
+
+
+@pytest.mark.parametrize('content', ['{"mobility": ', '[1, 2]', '{"mobility": "fast"}',
+                                     '{"mobility": 12, "speed": 3}'])
+def test_bad_file_warns_and_uses_defaults(weights_file, content):
+    weights_file.write_text(content)
+    with pytest.warns(UserWarning):
+        assert TigerBot().weights == DEFAULT_WEIGHTS
@@ -0,0 +1,54 @@
+from transposition import EXACT, LOWER, UPPER, TranspositionTable
+
+
+def test_size_is_rounded_down_to_a_power_of_two():
+    assert TranspositionTable(1000).size == 512
+    assert TranspositionTable(1 << 10).size == 1 << 10
+
+
+def test_store_and_probe():
+    tt = TranspositionTable(64)
+    assert tt.probe(12345) is None
+    tt.store(12345, 4, LOWER, 170, (3, 8))
+    assert tt.probe(12345) == (4, LOWER, 170, (3, 8))
+    assert tt.probe(12345 + 64) is None # Same slot, other key
+    assert (tt.probes, tt.hits, tt.stores) == (3, 1, 1)
+
+
+def test_same_position_is_always_overwritten():
+    tt = TranspositionTable(64)
+    tt.store(7, 6, EXACT, 10, (0, 1))
+    tt.store(7, 2, UPPER, -5, (1, 2))
+    assert tt.probe(7) == (2, UPPER, -5, (1, 2))
+
+
+def test_deeper_entry_survives_in_the_same_search():
+    tt = TranspositionTable(64)
+    tt.store(7, 6, EXACT, 10, (0, 1))
+    tt.store(7 + 64, 3, EXACT, 20, (1, 2)) # Shallower: kept out
+    assert tt.probe(7) == (6, EXACT, 10, (0, 1))
+    assert tt.probe(7 + 64) is None
+    tt.store(7 + 64, 6, EXACT, 20, (1, 2)) # As deep: replaces
+    assert tt.probe(7 + 64) == (6, EXACT, 20, (1, 2))
+
+
+def test_entries_from_an_older_search_are_replaceable_but_still_probed():
+    tt = TranspositionTable(64)
+    tt.store(7, 6, EXACT, 10, (0, 1))
+    tt.new_search()
+    assert tt.probe(7) == (6, EXACT, 10, (0, 1))
+    tt.store(7 + 64, 1, LOWER, 20, (1, 2))
+    assert tt.probe(7) is None
+    assert tt.probe(7 + 64) == (1, LOWER, 20, (1, 2))
+
+
+def test_clear_forgets_every_entry():
+    tt = TranspositionTable(64)
+    for key in range(40):
+        tt.store(key, 3, EXACT, key, None)
+    assert tt.usage() == 40 / 64
+    tt.clear()
+    assert tt.usage() == 0
+    assert all(tt.probe(key) is None for key in range(40))
+    tt.store(5, 1, EXACT, 99, None) # A cleared slot takes any new entry
+    assert tt.probe(5) == (1, EXACT, 99, None)
@@ -1,145 +1,98 @@
-import copy
-import math
-import random
+import json
+import os
+import warnings
 
-class TigerBot:
-    def __init__(self, depth=3):
-        self.depth = depth
+from game_logic import SQUARE_COORDS
+from search import SearchBot
+
+# Written by `python tune.py fit`; used if present. Next to this module, not the working directory
+WEIGHTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tiger_weights.json')
+
+# Evaluation terms and their hand-picked weights (threat/trapped start unused)
+DEFAULT_WEIGHTS = {
+    'capture': 1000,  # per goat captured
+    'mobility': 10,   # per tiger step or jump available
+    'threat': 0,      # per goat that a tiger can jump right now
+    'trapped': 0,     # per tiger with no move
+}
+
+
+def load_weights(path=WEIGHTS_PATH):
+    """
+    DEFAULT_WEIGHTS, overridden by the JSON file at `path` if it exists.
+    A file that cannot be read or names unknown terms is ignored with a warning.
+    """
+    weights = dict(DEFAULT_WEIGHTS)
+    if not path or not os.path.exists(path):
+        return weights
+    try:
+        with open(path) as f:
+            tuned = json.load(f)
+        if not isinstance(tuned, dict):
+            raise ValueError("expected a JSON object")
+        unknown = set(tuned) - set(DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f"unknown evaluation terms {sorted(unknown)}")
+        weights.update({term: int(value) for term, value in tuned.items()})
+    except (OSError, TypeError, ValueError) as exc: # json.JSONDecodeError is a ValueError
+        warnings.warn(f"Ignoring {path} ({exc}); using the built-in weights")
+        return dict(DEFAULT_WEIGHTS)
+    return weights
+
+
+_tuned_weights = None
+
+
+def tuned_weights():
+    """The weights from WEIGHTS_PATH, read on first use and shared by every TigerBot."""
+    global _tuned_weights
+    if _tuned_weights is None:
+        _tuned_weights = load_weights(WEIGHTS_PATH)
+    return _tuned_weights
 
-    def get_best_move(self, game):
-        """
-        Returns the best move for the Tiger as a tuple: (start_pos, end_pos)
-        start_pos: (r, c)
-        end_pos: (r, c)
-        """
-        # We maximize for Tiger ('T')
-        best_score = -math.inf
-        best_move = None
-        
-        # Get all possible moves for all tigers
-        possible_moves = self.get_all_tiger_moves(game)
-        
-        # If no moves available, we lost (or will lose)
-        if not possible_moves:
-            return None
-
-        # Shuffle to add a bit of randomness for equal-value moves
-        random.shuffle(possible_moves)
-
-        for start, end in possible_moves:
-            # Simulate move
-            game_copy = copy.deepcopy(game)
-            game_copy.make_move(start, end)
-            
-            # Call Minimax
-            score = self.minimax(game_copy, self.depth - 1, False, -math.inf, math.inf)
-            
-            if score > best_score:
-                best_score = score
-                best_move = (start, end)
-                
-        return best_move
-
-    def minimax(self, game, depth, is_maximizing, alpha, beta):
-        # Terminal states
-        if game.winner == 'T':
-            return 10000 + depth # Prefer winning sooner
-        if game.winner == 'G':
-            return -10000
-        
-        if depth == 0:
-            return self.evaluate(game)
-
-        if is_maximizing: # Tiger's Turn
-            max_eval = -math.inf
-            moves = self.get_all_tiger_moves(game)
-            
-            if not moves: # No moves = Trap = Loss
-                return -10000
-                
-            for start, end in moves:
-                game_copy = copy.deepcopy(game)
-                game_copy.make_move(start, end)
-                eval = self.minimax(game_copy, depth - 1, False, alpha, beta)
-                max_eval = max(max_eval, eval)
-                alpha = max(alpha, eval)
-                if beta <= alpha:
-                    break
-            return max_eval
-        else: # Goat's Turn
-            min_eval = math.inf
-            moves = self.get_all_goat_moves(game)
-            
-            # If goat has no moves (rare in movement, but possible), skip turn or game over logic?
-            # In Baghchal, if goats are blocked, they usually win, but here we just check moves.
-            # For simplicity in placement phase, we sample a few moves to save time.
-            
-            if not moves:
-                return 10000 # If Goat can't move, Tiger might have won or it's a weird state
-                
-            # Optimization: If in placement phase, there are too many moves (empty spots).
-            # We just pick a subset to analyze to keep it fast.
-            if game.phase == 'PLACEMENT':
-                if len(moves) > 5:
-                    moves = random.sample(moves, 5)
-
-            for start, end in moves:
-                game_copy = copy.deepcopy(game)
-                if game.phase == 'PLACEMENT':
-                    game_copy.place_goat(end[0], end[1])
-                else:
-                    game_copy.make_move(start, end)
-                    
-                eval = self.minimax(game_copy, depth - 1, True, alpha, beta)
-                min_eval = min(min_eval, eval)
-                beta = min(beta, eval)
-                if beta <= alpha:
-                    break
-            return min_eval
+
+class TigerBot(SearchBot):
+    """Alpha-beta bot for the tigers (see search.SearchBot for the options)."""
+
+    side = 'T'
+
+    def __init__(self, *args, weights=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Evaluation weights: tuned ones from WEIGHTS_PATH unless given
+        self.weights = dict(tuned_weights() if weights is None else weights)
+
+    def worker_options(self):
+        return dict(super().worker_options(), weights=self.weights)
+
+    def capture_value(self):
+        return self.weights['capture']
 
     def evaluate(self, game):
         """
         Heuristic Evaluation Function.
         Positive is good for Tiger.
         """
+        weights = self.weights
         score = 0
-        
+
         # 1. Captures (Most Important)
-        score += game.goats_captured * 1000
-        
-        # 2. Mobility (Avoid Traps)
-        tiger_moves = self.get_all_tiger_moves(game)
-        score += len(tiger_moves) * 10
-        
-        # 3. Position (Slight preference for center or key spots? Optional)
-        # For now, mobility is the best proxy for "good position"
-        
+        score += game.goats_captured * weights['capture']
+
+        # 2. Mobility (Avoid Traps), tracked incrementally by the game
+        score += game.tiger_move_total * weights['mobility']
+
+        # 3. Threats and trapped tigers, only read when tuning gave them weight
+        if weights['threat'] or weights['trapped']:
+            _, trapped, vulnerable = game.tiger_mobility()
+            score += bin(vulnerable).count('1') * weights['threat']
+            score += trapped * weights['trapped']
+
         return score
 
     def get_all_tiger_moves(self, game):
-        moves = []
-        for r in range(5):
-            for c in range(5):
-                if game.board[r][c] == -1: # Tiger
-                    valid_destinations = game.get_valid_moves(r, c, check_turn=False)
-                    for dest in valid_destinations:
-                        moves.append(((r, c), dest))
-        return moves
+        return [(SQUARE_COORDS[frm], SQUARE_COORDS[to]) for frm, to in game.tiger_moves()]
 
     def get_all_goat_moves(self, game):
-        moves = []
-        if game.phase == 'PLACEMENT':
-            # In placement, "start" is None, "end" is the board position
-            # But to keep format consistent, we'll use start=None
-            for r in range(5):
-                for c in range(5):
-                    if game.board[r][c] == 0:
-                        moves.append((None, (r, c)))
-        else:
-            for r in range(5):
-                for c in range(5):
-                    if game.board[r][c] == 1: # Goat
-                        valid_destinations = game.get_valid_moves(r, c, check_turn=False)
-                        for dest in valid_destinations:
-                            moves.append(((r, c), dest))
-        return moves
+        # In placement, "start" is None, "end" is the board position
+        return [(SQUARE_COORDS[frm] if frm is not None else None, SQUARE_COORDS[to])
+                for frm, to in game.goat_moves()]
@@ -0,0 +1,78 @@
+"""
+Fixed-size transposition table for the alpha-beta search.
+
+Entries are keyed by the Zobrist hash kept by `BaghChal` and stored in
+parallel lists indexed by `hash & mask`, so the table never grows.
+"""
+
+# Bound types for stored scores
+EXACT = 0   # Score is the true minimax value
+LOWER = 1   # Search failed high: true value >= score
+UPPER = 2   # Search failed low: true value <= score
+
+
+class TranspositionTable:
+    def __init__(self, size=1 << 18):
+        # Round down to a power of two so the index is a cheap mask
+        size = 1 << max(size, 1).bit_length() - 1
+        self.size = size
+        self.mask = size - 1
+        self.keys = [None] * size
+        self.depths = [0] * size
+        self.flags = [EXACT] * size
+        self.scores = [0] * size
+        self.moves = [None] * size
+        self.generations = [0] * size
+
+        self.generation = 0
+        self.first_valid = 0 # Entries stored before this generation were cleared
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self):
+        """Ages existing entries so the next search may overwrite them."""
+        self.generation += 1
+
+    def clear(self):
+        """Empties the table in O(1): every entry stored so far stops matching."""
+        self.generation += 1
+        self.first_valid = self.generation
+        self.probes = self.hits = self.stores = 0
+
+    def probe(self, key):
+        """Returns (depth, flag, score, move) for `key`, or None on a miss."""
+        self.probes += 1
+        i = key & self.mask
+        if self.keys[i] != key or self.generations[i] < self.first_valid:
+            return None
+        self.hits += 1
+        return self.depths[i], self.flags[i], self.scores[i], self.moves[i]
+
+    def store(self, key, depth, flag, score, move):
+        """
+        Algorithm: Depth-Preferred Replacement
+        A slot is overwritten only by an entry searched at least as deep, by
+        the same position, or when the resident entry is from an older search.
+        """
+        i = key & self.mask
+        if (self.keys[i] is not None and self.keys[i] != key
+                and self.generations[i] == self.generation
+                and self.depths[i] > depth):
+            return
+        self.keys[i] = key
+        self.depths[i] = depth
+        self.flags[i] = flag
+        self.scores[i] = score
+        self.moves[i] = move
+        self.generations[i] = self.generation
+        self.stores += 1
+
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+    def usage(self):
+        """Fraction of slots holding an entry."""
+        first_valid, generations = self.first_valid, self.generations
+        return sum(1 for i, k in enumerate(self.keys)
+                   if k is not None and generations[i] >= first_valid) / self.size
@@ -0,0 +1,294 @@
+"""
+Offline tuning of the TigerBot evaluation weights (requires NumPy).
+
+    python tune.py generate --games 2000 --out positions.tdata --workers 8
+    python tune.py generate --games 500 --out positions.tdata --label-depth 4
+    python tune.py fit --data positions.tdata                 # writes tiger_weights.json
+
+`generate` plays headless self-play games across a process pool and
+appends every non-terminal position to a dataset file, labelled with the
+final result and, with --label-depth, a deeper search score. Records are
+written as games finish, so a run can be stopped, resumed or extended.
+
+`fit` reads the dataset through a memory map in fixed-size chunks and
+fits the evaluation terms by Texel-style logistic regression, then writes
+the weights to the file TigerBot loads on first use (tiger_bot.WEIGHTS_PATH).
+
+File layout: header (magic, version) followed by 16-byte records: packed
+Position (see position.py), result for the tigers (1 win, 0.5 draw,
+0 loss) and search score for the tigers (NaN when unlabelled).
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from batch_eval import boards_from_packed, evaluate_batch
+from game_logic import REPETITION_LIMIT, BaghChal
+from position import Position
+from self_play import DEFAULT_MAX_PLIES, RandomAgent, make_agent
+from tiger_bot import WEIGHTS_PATH, TigerBot, tuned_weights
+
+MAGIC = b'BCTD'
+VERSION = 1
+HEADER = struct.Struct('<4sI')
+RECORD = np.dtype([('packed', '<u8'), ('result', '<f4'), ('score', '<f4')])
+RESULTS = {'T': 1.0, 'G': 0.0} # Anything else (draw, max plies) is 0.5
+
+DEFAULT_CHUNK = 1 << 16 # Records read per block during a fitting pass
+DEFAULT_RANDOM_PLIES = 8 # Random opening moves, so seeded games do not repeat
+# Scaling constants tried when fitting the sigmoid to the current weights
+K_GRID = np.logspace(1, 4, 121)
+TERMS = ('capture', 'mobility', 'threat', 'trapped') # Order of the feature columns
+
+
+# --- Dataset ---
+
+def open_dataset(path):
+    """Read-only memory map of the records in `path` (an empty array if there are none)."""
+    with open(path, 'rb') as f:
+        magic, version = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a Bagh-Chal tuning dataset (version {VERSION})")
+    count = (os.path.getsize(path) - HEADER.size) // RECORD.itemsize
+    if count == 0:
+        return np.empty(0, dtype=RECORD)
+    return np.memmap(path, dtype=RECORD, mode='r', offset=HEADER.size, shape=(count,))
+
+
+def _open_for_append(path):
+    """Opens `path` for appending records, writing the header if the file is new."""
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        open_dataset(path) # Check the header before adding to the file
+        out = open(path, 'ab')
+        # Drop a partial record left by an interrupted run
+        out.truncate(HEADER.size + (out.tell() - HEADER.size) // RECORD.itemsize * RECORD.itemsize)
+        return out
+    out = open(path, 'wb')
+    out.write(HEADER.pack(MAGIC, VERSION))
+    return out
+
+
+def play_positions(tiger_spec, goat_spec, seed, random_plies=DEFAULT_RANDOM_PLIES,
+                   label_depth=None, max_plies=DEFAULT_MAX_PLIES,
+                   repetition_limit=REPETITION_LIMIT):
+    """
+    Plays one game and returns its non-terminal positions as RECORD bytes
+    (pool task). The first `random_plies` moves are random; with
+    `label_depth` each position is also searched by a TigerBot.
+    """
+    opening = RandomAgent(seed)
+    agents = {'T': make_agent(tiger_spec, 'T', seed), 'G': make_agent(goat_spec, 'G', seed + 1)}
+    game = BaghChal(repetition_limit)
+    positions = []
+    while not game.winner and len(positions) < max_plies:
+        if not game.legal_moves():
+            break
+        positions.append(Position.from_game(game).packed)
+        agent = opening if len(positions) <= random_plies else agents[game.turn]
+        move = agent.get_best_move(game)
+        if move is None:
+            break
+        start, end = move
+        ok = game.place_goat(*end) if start is None else game.make_move(start, end)
+        if not ok:
+            raise RuntimeError(f"Agent {game.turn} played an illegal move {move}")
+
+    if game.winner in ('T', 'G'):
+        result = RESULTS[game.winner]
+    else: # DRAW or max plies
+        result = 0.5
+    records = np.empty(len(positions), dtype=RECORD)
+    records['packed'] = positions
+    records['result'] = result
+    records['score'] = np.nan
+    if label_depth:
+        bot = TigerBot(depth=label_depth, seed=seed)
+        for i, packed in enumerate(positions):
+            position = Position.from_packed(packed)
+            bot.get_best_move(position.to_game())
+            # stats.score is for the side to move
+            score = bot.stats.score
+            records['score'][i] = score if position.turn == 'T' else -score
+    return records.tobytes()
+
+
+def generate(path, games, tiger_spec, goat_spec, workers=None, seed=0,
+             random_plies=DEFAULT_RANDOM_PLIES, label_depth=None, log=print):
+    """
+    Algorithm: Streamed Self-Play Dataset
+    Games run in a process pool; each finished game's records are
+    appended to `path` straight away, so memory holds only the games in
+    flight and an interrupted run keeps every finished game.
+    Returns the number of records written.
+    """
+    written = 0
+    start_time = time.perf_counter()
+    with _open_for_append(path) as out, ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_positions, tiger_spec, goat_spec, seed + 2 * i,
+                               random_plies, label_depth)
+                   for i in range(games)]
+        for done, future in enumerate(as_completed(futures), 1):
+            data = future.result()
+            out.write(data)
+            out.flush()
+            written += len(data) // RECORD.itemsize
+            if done % 100 == 0 or done == games:
+                log(f"{done}/{games} games, {written} positions, "
+                    f"{time.perf_counter() - start_time:.1f}s")
+    return written
+
+
+# --- Fitting ---
+
+def features(packed):
+    """(N, 4) float64 matrix of the evaluation terms, in TERMS order."""
+    boards, captured = boards_from_packed(packed)
+    result = evaluate_batch(boards, captured)
+    columns = (captured, result['mobility'], result['threats'], result['trapped'])
+    return np.column_stack(columns).astype(np.float64)
+
+
+def _chunks(records, target, k, chunk_size):
+    """Yields (features, soft label) blocks; search targets are squashed with scale k."""
+    for start in range(0, len(records), chunk_size):
+        block = records[start:start + chunk_size]
+        if target == 'search':
+            scores = np.asarray(block['score'], dtype=np.float64)
+            known = np.isfinite(scores)
+            block, labels = block[known], _sigmoid(scores[known] / k)
+        else:
+            labels = np.asarray(block['result'], dtype=np.float64)
+        if len(block):
+            yield features(block['packed']), labels
+
+
+def _sigmoid(x):
+    return 1 / (1 + np.exp(-np.clip(x, -500, 500)))
+
+
+def _log_loss(p, labels):
+    """Summed cross-entropy of predictions p against soft labels."""
+    p = np.clip(p, 1e-12, 1 - 1e-12)
+    return -(labels * np.log(p) + (1 - labels) * np.log(1 - p)).sum(axis=0)
+
+
+def weight_vector(weights):
+    return np.array([weights[term] for term in TERMS], dtype=np.float64)
+
+
+def fit_scale(records, weights, chunk_size=DEFAULT_CHUNK):
+    """
+    Algorithm: Sigmoid Scale Search
+    Finds the K for which sigmoid(eval / K) best predicts the game results
+    under the given weights. Every candidate of K_GRID is scored in the
+    same pass as an (N, len(K_GRID)) block. Returns (K, mean loss).
+    """
+    w = weight_vector(weights)
+    losses = np.zeros(len(K_GRID))
+    count = 0
+    for x, labels in _chunks(records, 'result', None, chunk_size):
+        scores = x @ w
+        losses += _log_loss(_sigmoid(scores[:, None] / K_GRID), labels[:, None])
+        count += len(labels)
+    best = int(np.argmin(losses))
+    return float(K_GRID[best]), losses[best] / max(count, 1)
+
+
+def mean_loss(records, weights, k, target='result', chunk_size=DEFAULT_CHUNK):
+    w = weight_vector(weights) / k
+    total, count = 0.0, 0
+    for x, labels in _chunks(records, target, k, chunk_size):
+        total += _log_loss(_sigmoid(x @ w), labels)
+        count += len(labels)
+    return total / max(count, 1)
+
+
+def fit_weights(records, k, target='result', iterations=10, l2=1e-3, chunk_size=DEFAULT_CHUNK,
+                log=print):
+    """
+    Algorithm: Streamed Newton Logistic Regression (Texel Tuning)
+    Models P(tigers win) = sigmoid(eval / K) with eval = x . w over the
+    evaluation terms x, as TigerBot.evaluate computes it (no intercept),
+    against game results (or squashed search scores) as soft labels.
+    Starting from the current weights, each iteration is one pass over the
+    data that adds up the gradient and the 4x4 Hessian of the
+    cross-entropy chunk by chunk, then takes a full Newton step; the small
+    L2 term keeps rarely seen terms (trapped tigers) finite. The result is
+    scaled back by K into the integer units of TigerBot.evaluate.
+    Returns the new weights dict.
+    """
+    w = weight_vector(tuned_weights()) / k
+    penalty = np.full(len(w), l2)
+    for iteration in range(iterations):
+        gradient = penalty * w
+        hessian = np.diag(penalty)
+        count = 0
+        for x, labels in _chunks(records, target, k, chunk_size):
+            p = _sigmoid(x @ w)
+            gradient += x.T @ (p - labels)
+            hessian += (x * (p * (1 - p))[:, None]).T @ x
+            count += len(labels)
+        step = np.linalg.solve(hessian + 1e-9 * np.eye(len(w)), gradient)
+        w -= step
+        log(f"iteration {iteration + 1}: step {np.abs(step * k).max():.3f}")
+        if np.abs(step * k).max() < 0.5: # Below the rounding of integer weights
+            break
+    return {term: int(round(value * k)) for term, value in zip(TERMS, w)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bagh-Chal evaluation weight tuning")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_gen = sub.add_parser('generate', help="append self-play positions to a dataset")
+    p_gen.add_argument('--out', default='positions.tdata')
+    p_gen.add_argument('--games', type=int, default=1000)
+    p_gen.add_argument('--tiger', default='tiger:2', help="tiger agent spec (see self_play.py)")
+    p_gen.add_argument('--goat', default='goat:2', help="goat agent spec")
+    p_gen.add_argument('--random-plies', type=int, default=DEFAULT_RANDOM_PLIES)
+    p_gen.add_argument('--label-depth', type=int, default=None,
+                       help="also store a TigerBot search score of this depth")
+    p_gen.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    p_gen.add_argument('--seed', type=int, default=0)
+    p_fit = sub.add_parser('fit', help="fit the weights and write them for TigerBot")
+    p_fit.add_argument('--data', default='positions.tdata')
+    p_fit.add_argument('--target', choices=('result', 'search'), default='result')
+    p_fit.add_argument('--iterations', type=int, default=10)
+    p_fit.add_argument('--l2', type=float, default=1e-3)
+    p_fit.add_argument('--chunk', type=int, default=DEFAULT_CHUNK)
+    p_fit.add_argument('--out', default=WEIGHTS_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        make_agent(args.tiger, 'T') # Validate specs before starting any workers
+        make_agent(args.goat, 'G')
+        written = generate(args.out, args.games, args.tiger, args.goat, args.workers, args.seed,
+                           args.random_plies, args.label_depth)
+        print(f"{written} positions appended to {args.out}")
+    elif args.command == 'fit':
+        records = open_dataset(args.data)
+        if not len(records):
+            raise SystemExit(f"{args.data} holds no positions")
+        start = tuned_weights()
+        k, before = fit_scale(records, start, args.chunk)
+        print(f"{len(records)} positions; K = {k:.1f}")
+        if args.target == 'search':
+            before = mean_loss(records, start, k, 'search', args.chunk)
+        weights = fit_weights(records, k, args.target, args.iterations, args.l2, args.chunk)
+        after = mean_loss(records, weights, k, args.target, args.chunk)
+        print(f"loss {before:.5f} -> {after:.5f}")
+        for term in TERMS:
+            print(f"  {term:9} {start[term]:6} -> {weights[term]:6}")
+        with open(args.out, 'w') as f:
+            json.dump(weights, f, indent=2)
+            f.write('\n')
+        print(f"Weights written to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()